@@ -6,7 +6,7 @@ and management actions."""
 # checkout/admin.py
 
 from django.contrib import admin
-from .models import Order, OrderLineItem
+from .models import Order, OrderLineItem, WebhookEvent
 
 
 class OrderLineItemInline(admin.TabularInline):
@@ -81,3 +81,15 @@ class OrderAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         return qs.prefetch_related("lineitems", "lineitems__car")
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = (
+        "event_id", "event_type", "status", "attempts",
+        "received_at", "processed_at",
+    )
+    list_filter = ("status", "event_type")
+    search_fields = ("event_id",)
+    readonly_fields = ("received_at", "processed_at", "payload")
+    ordering = ("-received_at",)
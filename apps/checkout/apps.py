@@ -8,3 +8,6 @@ from django.apps import AppConfig
 class CheckoutConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.checkout"
+
+    def ready(self):
+        from . import signals  # noqa: F401
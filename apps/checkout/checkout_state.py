@@ -0,0 +1,37 @@
+"""Checkout-state cache for the checkout app.
+
+Holds what the checkout page shows for one order (totals, line items and
+the PaymentIntent client secret and status) for a short while, so page
+refreshes and back-navigation skip the database writes and the Stripe
+round-trip. Entries are keyed on the ``order:<pk>`` generation, which is
+bumped whenever the order's line items, totals, delivery or payment
+fields change."""
+
+from django.core.cache import cache
+
+from apps.common.caching import bump_on_commit, versioned_key
+
+# Short enough that a payment completed elsewhere shows up quickly even
+# if the webhook that bumps the generation is delayed.
+CHECKOUT_STATE_TIMEOUT = 60
+
+
+def order_namespace(order_id):
+    return f"order:{order_id}"
+
+
+def _state_key(order):
+    return versioned_key(
+        f"checkout:{order.pk}", [order_namespace(order.pk)])
+
+
+def get_checkout_state(order):
+    return cache.get(_state_key(order))
+
+
+def store_checkout_state(order, state):
+    cache.set(_state_key(order), state, CHECKOUT_STATE_TIMEOUT)
+
+
+def invalidate_checkout_state(order_id):
+    bump_on_commit(order_namespace(order_id))
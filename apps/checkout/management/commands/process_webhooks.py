@@ -0,0 +1,23 @@
+"""Management command that drains the Stripe webhook inbox.
+
+Run it as a worker process (see the Procfile); it claims due events in
+batches, runs their handlers and sleeps briefly when the inbox is empty.
+Use ``--once`` to process a single batch, e.g. from a scheduler."""
+
+from apps.checkout.webhook_inbox import BATCH_SIZE, process_pending
+from apps.common.leased_queue import QueueWorkerCommand
+
+
+class Command(QueueWorkerCommand):
+    help = "Process queued Stripe webhook events."
+    batch_size = BATCH_SIZE
+    idle_sleep = 1.0
+    items = "Events"
+
+    def process_batch(self, batch_size):
+        return process_pending(batch_size)
+
+    def report(self, processed, failed, elapsed):
+        self.stdout.write(
+            f"Processed {processed} webhook event(s), "
+            f"{failed} failed, in {elapsed:.2f}s.")
@@ -6,6 +6,8 @@ import uuid
 from decimal import Decimal
 from django.conf import settings
 from django.db import models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 try:
@@ -62,16 +64,57 @@ class Order(models.Model):
     class Meta:
         ordering = ["-date"]
 
+    # Saving any of these (or a full save) re-derives the totals.
+    TOTAL_FIELDS = frozenset({"order_total", "delivery_cost", "grand_total"})
+
     def _calculate_totals(self):
-        self.order_total = sum(
-            item.lineitem_total for item in self.lineitems.all())
+        """Set ``order_total``/``grand_total`` from the line items.
+
+        Prefetched line items are summed in memory; otherwise a single
+        aggregate query is used.
+        """
+        prefetched = getattr(self, "_prefetched_objects_cache", {})
+        if "lineitems" in prefetched:
+            self.order_total = sum(
+                (item.lineitem_total for item in prefetched["lineitems"]),
+                Decimal("0.00"))
+        else:
+            self.order_total = self.lineitems.aggregate(
+                total=Sum("lineitem_total"))["total"] or Decimal("0.00")
         self.grand_total = self.order_total + self.delivery_cost
 
     def save(self, *args, **kwargs):
-        new = self.pk is None
+        update_fields = kwargs.get("update_fields")
+        if self._state.adding:
+            # No line items can exist yet; keep the totals we were given.
+            self.grand_total = self.order_total + self.delivery_cost
+        elif update_fields is None:
+            self._calculate_totals()
+        elif self.TOTAL_FIELDS.intersection(update_fields):
+            self._calculate_totals()
+            kwargs["update_fields"] = {
+                *update_fields, "order_total", "grand_total"}
         super().save(*args, **kwargs)
-        self._calculate_totals()
-        super().save(update_fields=["order_total", "grand_total"])
+
+    @classmethod
+    def refresh_totals(cls, order_id):
+        """Re-derive one order's totals in a single UPDATE statement."""
+        line_sum = Coalesce(
+            Subquery(
+                OrderLineItem.objects
+                .filter(order_id=OuterRef("pk"))
+                .values("order_id")
+                .annotate(total=Sum("lineitem_total"))
+                .values("total")
+            ),
+            Value(Decimal("0.00")),
+            output_field=models.DecimalField(
+                max_digits=10, decimal_places=2),
+        )
+        cls.objects.filter(pk=order_id).update(
+            order_total=line_sum,
+            grand_total=line_sum + F("delivery_cost"),
+        )
 
     def __str__(self):
         return str(self.order_number)
@@ -101,6 +144,66 @@ class OrderLineItem(models.Model):
     def save(self, *args, **kwargs):
         self.lineitem_total = self.unit_price * self.quantity
         super().save(*args, **kwargs)
+        Order.refresh_totals(self.order_id)
+
+    def delete(self, *args, **kwargs):
+        order_id = self.order_id
+        result = super().delete(*args, **kwargs)
+        Order.refresh_totals(order_id)
+        return result
 
     def __str__(self):
         return f"{self.quantity} × {self.car}"
+
+
+class WebhookEvent(models.Model):
+    """A verified Stripe event waiting for (or done with) processing.
+
+    The webhook view only inserts rows; ``process_webhooks`` claims them
+    with a lease and runs the handlers, so Stripe gets its 200 before any
+    slow work happens.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        PROCESSING = "processing", "Processing"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=100)
+    payload = JSONField()
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["received_at"]
+        indexes = [
+            models.Index(
+                fields=["status", "available_at"],
+                name="webhook_status_available"),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} {self.event_id} ({self.status})"
+
+
+class ProcessedWebhookEvent(models.Model):
+    """Marks a Stripe event whose side effects have been committed.
+
+    Written in the same transaction as those side effects, so the unique
+    ``event_id`` lets exactly one delivery of an event win.
+    """
+
+    event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=100)
+    processed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.event_id
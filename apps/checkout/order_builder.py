@@ -0,0 +1,64 @@
+"""Order builder for the checkout app.
+
+Turns a cart into an Order and its line items from a single read of the
+cart, with the snapshot and every total worked out in memory, so the
+number of statements does not grow with the number of items."""
+
+from decimal import Decimal
+
+from .models import Order, OrderLineItem
+from .utils import compute_delivery
+
+
+def snapshot_line(cart_item):
+    """The ``original_trailer`` entry recorded for one cart item."""
+    car = cart_item.car
+    return {
+        "car_id": cart_item.car_id,
+        "name": str(car),
+        "qty": cart_item.quantity,
+        "unit": float(car.price),
+        "total": float(car.price * cart_item.quantity),
+    }
+
+
+class OrderBuilder:
+    """Builds an Order from one read of a cart's items.
+
+    ``builder.items`` is empty for an empty cart; check it before
+    calling ``create()``, which callers should wrap in a transaction.
+    """
+
+    def __init__(self, cart):
+        self.items = list(
+            cart.items.select_related("car__make", "car__model"))
+
+    def create(self, user, **order_fields):
+        lines = [
+            OrderLineItem(
+                car=ci.car,
+                quantity=ci.quantity,
+                unit_price=ci.car.price,
+                # bulk_create skips OrderLineItem.save(), which sets this
+                lineitem_total=ci.car.price * ci.quantity,
+            )
+            for ci in self.items
+        ]
+        order_total = sum(
+            (line.lineitem_total for line in lines), Decimal("0.00"))
+        delivery_cost = compute_delivery(order_total)
+
+        # New orders keep the totals they are created with, so nothing
+        # has to be re-read once the line items are in.
+        order = Order.objects.create(
+            user=user,
+            original_trailer={
+                "items": [snapshot_line(ci) for ci in self.items]},
+            order_total=order_total,
+            delivery_cost=delivery_cost,
+            **order_fields,
+        )
+        for line in lines:
+            line.order = order
+        OrderLineItem.objects.bulk_create(lines)
+        return order
@@ -0,0 +1,329 @@
+"""Payment gateway for the checkout app.
+
+Wraps the Stripe SDK behind one long-lived client so every call reuses a
+pooled keep-alive session, is bounded by connect/read timeouts, retries
+transient failures a few times with jittered backoff, and stops calling
+Stripe at all while a circuit breaker is open. Call latencies are kept
+per operation for the ``payment_metrics`` view and the logs.
+
+Views and webhooks go through ``get_gateway()``; errors reach them as
+``PaymentGatewayError`` instead of whatever the SDK raised."""
+
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import deque
+
+import requests
+import stripe
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Latency samples kept per operation for the percentiles.
+LATENCY_WINDOW = 200
+
+# SDK errors that say nothing about the request itself, so a retry (and
+# the breaker) is the right response.
+TRANSIENT_ERRORS = (
+    stripe.error.APIConnectionError,
+    stripe.error.APIError,
+    stripe.error.RateLimitError,
+)
+
+
+class PaymentGatewayError(Exception):
+    """A payment API call failed; ``retryable`` marks transient causes."""
+
+    def __init__(self, message, retryable=False, original=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.original = original
+
+    @property
+    def not_found(self):
+        """Stripe answered that the requested object doesn't exist."""
+        return (not self.retryable
+                and getattr(self.original, "http_status", None) == 404)
+
+
+class CircuitOpenError(PaymentGatewayError):
+    """Raised without calling Stripe while the breaker is open."""
+
+    def __init__(self, message="Payment service temporarily unavailable."):
+        super().__init__(message, retryable=True)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker shared by every thread in the process.
+
+    After ``threshold`` transient failures in a row the breaker opens and
+    calls fail fast for ``reset_timeout`` seconds; then a single trial
+    call is let through, closing the breaker on success.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                if self.opened_at is None:
+                    logger.error(
+                        "Payment gateway: circuit opened after %s failures",
+                        self.failures)
+                self.opened_at = self.clock()
+
+    def release(self):
+        """End a trial call that failed for a non-transient reason."""
+        with self._lock:
+            self.trial_running = False
+
+
+class LatencyStats:
+    """Per-operation call counts, errors and recent latencies (ms)."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._ops = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation, elapsed_ms, ok):
+        with self._lock:
+            op = self._ops.setdefault(operation, {
+                "calls": 0,
+                "errors": 0,
+                "max_ms": 0.0,
+                "samples": deque(maxlen=self.window),
+            })
+            op["calls"] += 1
+            if not ok:
+                op["errors"] += 1
+            op["max_ms"] = max(op["max_ms"], elapsed_ms)
+            op["samples"].append(elapsed_ms)
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for name, op in self._ops.items():
+                samples = sorted(op["samples"])
+                result[name] = {
+                    "calls": op["calls"],
+                    "errors": op["errors"],
+                    "max_ms": round(op["max_ms"], 1),
+                    "p50_ms": _percentile(samples, 50),
+                    "p95_ms": _percentile(samples, 95),
+                }
+            return result
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return None
+    index = min(len(samples) - 1, int(len(samples) * pct / 100))
+    return round(samples[index], 1)
+
+
+def build_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class PaymentGateway:
+    """Stripe calls with timeouts, retries, a breaker and latency stats.
+
+    ``timeout`` is a ``(connect, read)`` pair applied to every HTTP
+    attempt; ``deadline`` caps the whole call including backoff sleeps.
+    Writes carry one idempotency key across their retries, so a retried
+    create never makes a second PaymentIntent.
+    """
+
+    def __init__(self, api_key, api_base=None, timeout=(3.0, 10.0),
+                 max_retries=2, backoff=0.25, max_backoff=2.0,
+                 deadline=20.0, pool_size=10, breaker=None, sleep=time.sleep):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = LatencyStats()
+        self.sleep = sleep
+        self.session = build_session(pool_size)
+        base_addresses = {"api": api_base} if api_base else {}
+        self.client = stripe.StripeClient(
+            api_key,
+            base_addresses=base_addresses,
+            # Retries happen here, where the breaker can see them.
+            max_network_retries=0,
+            http_client=stripe.RequestsClient(
+                timeout=timeout, session=self.session),
+        )
+
+    def create_intent(self, **params):
+        return self._call(
+            "payment_intents.create",
+            self.client.payment_intents.create,
+            params,
+            idempotent=True,
+        )
+
+    def retrieve_intent(self, intent_id):
+        return self._call(
+            "payment_intents.retrieve",
+            lambda params, options: self.client.payment_intents.retrieve(
+                intent_id, params, options),
+            {},
+        )
+
+    def modify_intent(self, intent_id, **params):
+        return self._call(
+            "payment_intents.update",
+            lambda params, options: self.client.payment_intents.update(
+                intent_id, params, options),
+            params,
+            idempotent=True,
+        )
+
+    @staticmethod
+    def construct_event(payload, sig_header, secret):
+        """Verify a webhook signature; raises the SDK's errors unchanged.
+
+        This is local work, so it bypasses the breaker and retries.
+        """
+        return stripe.Webhook.construct_event(payload, sig_header, secret)
+
+    def _call(self, operation, method, params, idempotent=False):
+        options = {}
+        if idempotent:
+            options["idempotency_key"] = str(uuid.uuid4())
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.metrics.record(operation, 0.0, ok=False)
+                raise CircuitOpenError()
+
+            call_started = time.monotonic()
+            try:
+                result = method(params, options)
+            except TRANSIENT_ERRORS as err:
+                self._record(operation, call_started, ok=False)
+                self.breaker.record_failure()
+                delay = self._backoff(attempt)
+                elapsed = time.monotonic() - started
+                if (attempt >= self.max_retries
+                        or elapsed + delay > self.deadline):
+                    raise PaymentGatewayError(
+                        str(err), retryable=True, original=err) from err
+                logger.warning(
+                    "Payment gateway: %s failed (%s); retry %s in %.2fs",
+                    operation, err, attempt + 1, delay)
+                self.sleep(delay)
+                attempt += 1
+            except stripe.error.StripeError as err:
+                self._record(operation, call_started, ok=False)
+                # Stripe answered, so the service itself is reachable.
+                self.breaker.record_success()
+                raise PaymentGatewayError(str(err), original=err) from err
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                self._record(operation, call_started, ok=True)
+                self.breaker.record_success()
+                return result
+
+    def _backoff(self, attempt):
+        # "Full jitter": spread retries from many workers apart.
+        cap = min(self.max_backoff, self.backoff * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def _record(self, operation, call_started, ok):
+        elapsed_ms = (time.monotonic() - call_started) * 1000
+        self.metrics.record(operation, elapsed_ms, ok)
+        logger.debug(
+            "Payment gateway: %s took %.1fms (ok=%s)",
+            operation, elapsed_ms, ok)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def build_gateway():
+    return PaymentGateway(
+        settings.STRIPE_SECRET_KEY,
+        api_base=settings.STRIPE_API_BASE or None,
+        timeout=(settings.STRIPE_CONNECT_TIMEOUT, settings.STRIPE_TIMEOUT),
+        max_retries=settings.STRIPE_MAX_RETRIES,
+        deadline=settings.STRIPE_DEADLINE,
+        pool_size=settings.STRIPE_POOL_SIZE,
+        breaker=CircuitBreaker(
+            threshold=settings.STRIPE_BREAKER_THRESHOLD,
+            reset_timeout=settings.STRIPE_BREAKER_RESET,
+        ),
+    )
+
+
+def get_gateway():
+    """The process-wide gateway, built from settings on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = build_gateway()
+    return _gateway
+
+
+def reset_gateway():
+    global _gateway
+    with _gateway_lock:
+        if _gateway is not None:
+            _gateway.session.close()
+        _gateway = None
@@ -0,0 +1,40 @@
+"""Signal receivers for the checkout app.
+
+Drops cached checkout state when an order or its line items change, and
+rebuilds the payment gateway when its settings are overridden."""
+
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .checkout_state import invalidate_checkout_state
+from .models import Order, OrderLineItem
+from .payments import reset_gateway
+
+# Order fields the cached checkout page depends on.
+CHECKOUT_STATE_FIELDS = frozenset({
+    "order_total", "delivery_cost", "grand_total", "stripe_pid", "status",
+})
+
+
+@receiver(post_save, sender=Order)
+def invalidate_order_checkout_state(sender, instance, created,
+                                    update_fields=None, raw=False, **kwargs):
+    if raw or created:
+        return
+    if update_fields is None or CHECKOUT_STATE_FIELDS & set(update_fields):
+        invalidate_checkout_state(instance.pk)
+
+
+@receiver(post_save, sender=OrderLineItem)
+@receiver(post_delete, sender=OrderLineItem)
+def invalidate_line_item_checkout_state(sender, instance, raw=False,
+                                        **kwargs):
+    if not raw:
+        invalidate_checkout_state(instance.order_id)
+
+
+@receiver(setting_changed)
+def reset_payment_gateway(sender, setting, **kwargs):
+    if setting.startswith("STRIPE_"):
+        reset_gateway()
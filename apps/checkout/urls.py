@@ -26,5 +26,11 @@ urlpatterns = [
         "success/<int:order_id>/", CheckoutSuccessView.as_view(),
         name="success"),
     path("stripe/webhook/", stripe_webhook, name="stripe-webhook"),
+    path(
+        "stripe/webhook/metrics/", views.webhook_metrics,
+        name="webhook_metrics"),
+    path(
+        "payments/metrics/", views.payment_metrics,
+        name="payment_metrics"),
     path('list/', OrderHistoryView.as_view(), name='list'),
 ]
@@ -7,16 +7,14 @@ and returns rendered responses."""
 
 # Python first
 import json
-import stripe
 from decimal import Decimal
 
 # Django second
 from django.conf import settings
 from django.contrib import messages
-from django.contrib.auth.decorators import login_required
-from django.core.mail import send_mail
+from django.contrib.auth.decorators import login_required, user_passes_test
 from django.db import transaction
-from django.http import HttpResponse, HttpResponseBadRequest
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.template.loader import render_to_string
 from django.urls import reverse
@@ -27,16 +25,20 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 
 # Own files last
+from .checkout_state import get_checkout_state, store_checkout_state
+from .order_builder import OrderBuilder
+from .payments import PaymentGatewayError, get_gateway
+from .webhook_inbox import inbox_metrics
 from .utils import compute_delivery
 from apps.showroom.models import Car
 from ..trailer.models import Cart
 from .webhooks import stripe_webhook
 from .forms import OrderForm
-from .models import Order, OrderLineItem
+from .models import Order
 from apps.common.auth_mixins import login_required_with_message
 from apps.common.auth_mixins import LoginRequiredMessageMixin
-
-stripe.api_key = settings.STRIPE_SECRET_KEY
+from apps.common.mailqueue import enqueue_email
+from apps.common.pagination import CursorPaginationMixin
 
 
 # ---------- FBVs ----------
@@ -49,7 +51,7 @@ def cache_checkout_data(request):
     try:
         data = json.loads(request.body or "{}")
         pid = data["client_secret"].split("_secret")[0]
-        stripe.PaymentIntent.modify(
+        get_gateway().modify_intent(
             pid,
             metadata={
                 "order_id":  data.get("order_id"),
@@ -57,10 +59,25 @@ def cache_checkout_data(request):
             }
         )
         return HttpResponse(status=200)
-    except Exception as e:
+    except (ValueError, KeyError, TypeError, AttributeError,
+            PaymentGatewayError) as e:
         return HttpResponseBadRequest(str(e))
 
 
+@login_required
+@user_passes_test(lambda user: user.is_superuser)
+def webhook_metrics(request):
+    """Webhook inbox depth, lag and throughput as JSON."""
+    return JsonResponse(inbox_metrics())
+
+
+@login_required
+@user_passes_test(lambda user: user.is_superuser)
+def payment_metrics(request):
+    """Stripe call counts, errors and latencies seen by this process."""
+    return JsonResponse(get_gateway().metrics.snapshot())
+
+
 @require_POST
 @login_required_with_message          # << and here too
 @transaction.atomic
@@ -71,30 +88,12 @@ def create_order(request):
     """
     cart = get_object_or_404(Cart, user=request.user)
 
-    if not cart.items.exists():
+    builder = OrderBuilder(cart)
+    if not builder.items:
         messages.error(request, "Your cart is empty.")
         return redirect("trailer:cart_detail")
 
-    order = Order.objects.create(
-        user=request.user,
-        original_trailer={"items": [
-            {
-                "car_id": ci.car_id,
-                "name":   str(ci.car),
-                "qty":    ci.quantity,
-                "unit":   float(ci.car.price),
-                "total":  float(ci.car.price * ci.quantity),
-            } for ci in cart.items.select_related("car")
-        ]},
-    )
-
-    for ci in cart.items.select_related("car"):
-        OrderLineItem.objects.create(
-            order=order,
-            car=ci.car,
-            quantity=ci.quantity,
-            unit_price=ci.car.price,
-        )
+    order = builder.create(request.user)
 
     # Optionally keep cart until payment succeeds via webhook; or clear now:
     # cart.items.all().delete()
@@ -108,7 +107,8 @@ class CreateOrderView(LoginRequiredMessageMixin, View):
     @transaction.atomic
     def post(self, request, *args, **kwargs):
         cart = get_object_or_404(Cart, user=request.user)
-        if not cart.items.exists():
+        builder = OrderBuilder(cart)
+        if not builder.items:
             messages.error(request, "Your cart is empty.")
             return redirect("trailer:cart_detail")
 
@@ -117,20 +117,8 @@ class CreateOrderView(LoginRequiredMessageMixin, View):
             status=Order.PaymentStatus.PENDING,
         ).delete()
 
-        order = Order.objects.create(
-            user=request.user,
-            original_trailer={
-                "items": [
-                    {
-                        "car_id": ci.car_id,
-                        "name": str(ci.car),
-                        "qty": ci.quantity,
-                        "unit": float(ci.car.price),
-                        "total": float(ci.car.price * ci.quantity),
-                    }
-                    for ci in cart.items.select_related("car")
-                ]
-            },
+        order = builder.create(
+            request.user,
             full_name=request.user.get_full_name(),
             email=request.user.email or "",
             phone_number=request.user.phone_number or "",
@@ -141,16 +129,6 @@ class CreateOrderView(LoginRequiredMessageMixin, View):
             street_address2=request.user.address_line2 or "",
             county="",
         )
-
-        for ci in cart.items.select_related("car"):
-            OrderLineItem.objects.create(
-                order=order,
-                car=ci.car,
-                quantity=ci.quantity,
-                unit_price=ci.car.price,
-            )
-
-        order.save()
         return redirect("checkout:checkout", order_id=order.pk)
 
 
@@ -159,18 +137,63 @@ class CheckoutView(LoginRequiredMessageMixin, View):
 
     def get(self, request, order_id, *args, **kwargs):
         order = get_object_or_404(Order, pk=order_id, user=request.user)
+        if order.is_paid:
+            return redirect("checkout:success", order_id=order.pk)
 
-        order.save()  # recompute order_total from lineitems
-        order.delivery_cost = compute_delivery(order.order_total)
-        order.save(update_fields=["delivery_cost"])
-        order.save()  # recalculates grand_total
+        # Refreshes within the cache window need no writes and no Stripe
+        # call; any change to the order bumps its generation first.
+        state = get_checkout_state(order)
+        if state is None:
+            try:
+                state = self.build_state(order)
+            except PaymentGatewayError:
+                messages.error(
+                    request,
+                    "Payments are unavailable right now. "
+                    "Please try again shortly.")
+                return redirect("trailer:cart_detail")
+            if state is None:
+                return redirect("checkout:success", order_id=order.pk)
+            # Queued after the bumps from our own writes, so the state is
+            # stored under the generation it reflects.
+            transaction.on_commit(
+                lambda: store_checkout_state(order, state))
+
+        ctx = {
+            "order":         order,
+            "order_form":    OrderForm(instance=order),
+            "line_items":    state["line_items"],
+            "total":         state["total"],
+            "delivery":      state["delivery"],
+            "grand_total":   state["grand_total"],
+            "client_secret": state["client_secret"],
+            "stripe_public": settings.STRIPE_PUBLISHABLE_KEY,
+        }
+        return render(request, self.template_name, ctx)
+
+    @staticmethod
+    def build_state(order):
+        """Settle delivery and the PaymentIntent for ``order``.
+
+        Returns the values the checkout page shows, or ``None`` once the
+        intent turns out to have succeeded (the order is then marked paid).
+        """
+        # Line items keep the stored totals current; only write when the
+        # delivery policy gives a different figure.
+        delivery_cost = compute_delivery(order.order_total)
+        if delivery_cost != order.delivery_cost:
+            order.delivery_cost = delivery_cost
+            order.save(update_fields=["delivery_cost"])
 
         intent = None
         if order.stripe_pid:
             try:
-                intent = stripe.PaymentIntent.retrieve(order.stripe_pid)
-            except Exception:
-                intent = None
+                intent = get_gateway().retrieve_intent(order.stripe_pid)
+            except PaymentGatewayError as err:
+                # Only replace an intent Stripe says is gone; after any
+                # other failure the customer may still be paying it.
+                if not err.not_found:
+                    raise
 
         if intent and intent.get("status") == "succeeded":
             order.status = Order.PaymentStatus.PAID
@@ -187,10 +210,10 @@ class CheckoutView(LoginRequiredMessageMixin, View):
                 "paid_amount",
                 "currency",
                 "paid_at"])
-            return redirect("checkout:success", order_id=order.pk)
+            return None
 
         if not intent:
-            intent = stripe.PaymentIntent.create(
+            intent = get_gateway().create_intent(
                 amount=int(order.grand_total * Decimal("100")),
                 currency="gbp",
                 metadata={
@@ -207,24 +230,26 @@ class CheckoutView(LoginRequiredMessageMixin, View):
                 "unit":     li.unit_price,
                 "subtotal": li.lineitem_total,
             }
-            for li in order.lineitems.select_related("car")
+            for li in order.lineitems.select_related(
+                "car__make", "car__model")
         ]
 
         client_secret = getattr(intent, "client_secret", None)
         if client_secret is None and hasattr(intent, "get"):
             client_secret = intent.get("client_secret", "")
+        status = (
+            intent.get("status") if isinstance(intent, dict)
+            else getattr(intent, "status", "")
+        )
 
-        ctx = {
-            "order":         order,
-            "order_form":    OrderForm(instance=order),
+        return {
             "line_items":    line_items,
             "total":         order.order_total,
             "delivery":      order.delivery_cost,
             "grand_total":   order.grand_total,
             "client_secret": client_secret,
-            "stripe_public": settings.STRIPE_PUBLISHABLE_KEY,
+            "intent_status": status if isinstance(status, str) else "",
         }
-        return render(request, self.template_name, ctx)
 
     def post(self, request, order_id, *args, **kwargs):
         order = get_object_or_404(Order, pk=order_id, user=request.user)
@@ -238,7 +263,8 @@ class CheckoutView(LoginRequiredMessageMixin, View):
                     "unit":     li.unit_price,
                     "subtotal": li.lineitem_total,
                 }
-                for li in order_obj.lineitems.select_related("car")
+                for li in order_obj.lineitems.select_related(
+                    "car__make", "car__model")
             ]
             return {
                 "order":         order_obj,
@@ -271,8 +297,8 @@ class CheckoutView(LoginRequiredMessageMixin, View):
             return render(request, self.template_name, ctx)
 
         try:
-            intent = stripe.PaymentIntent.retrieve(pid)
-        except Exception:
+            intent = get_gateway().retrieve_intent(pid)
+        except PaymentGatewayError:
             intent = None
 
         if not intent or intent.get("status") != "succeeded":
@@ -310,8 +336,9 @@ class OrderDetailView(LoginRequiredMessageMixin, View):
 class CheckoutSuccessView(LoginRequiredMessageMixin, TemplateView):
     template_name = "checkout/success.html"
 
+    @transaction.atomic
     def send_receipt(self, order):
-        """Send the same receipt the webhook used to send."""
+        """Queue the same receipt the webhook used to send."""
         if getattr(order, "status", None) != Order.PaymentStatus.PAID:
             return False
 
@@ -337,13 +364,7 @@ class CheckoutSuccessView(LoginRequiredMessageMixin, TemplateView):
             {"order": order, "contact_email": settings.DEFAULT_FROM_EMAIL},
         )
 
-        send_mail(
-            subject=subject,
-            message=body,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[to_email],
-            fail_silently=False,
-        )
+        enqueue_email(subject, body, [to_email], category="receipt")
 
         # Mark all cars in this order as is_sold=True
         for line_item in order.lineitems.select_related("car"):
@@ -371,7 +392,8 @@ class CheckoutSuccessView(LoginRequiredMessageMixin, TemplateView):
         return render(request, self.template_name, {"order": order})
 
 
-class OrderHistoryView(LoginRequiredMessageMixin, ListView):
+class OrderHistoryView(
+        LoginRequiredMessageMixin, CursorPaginationMixin, ListView):
     model = Order
     template_name = "checkout/order_list.html"
     context_object_name = "orders"
@@ -3,20 +3,54 @@
 Contains event-specific handler methods used by webhook views."""
 
 # apps/checkout/webhook_handler.py
+import functools
 import logging
 from decimal import Decimal
 
 from django.conf import settings
-from django.core.mail import send_mail
+from django.db import IntegrityError, transaction
 from django.http import HttpResponse
 from django.template.loader import render_to_string
 from django.utils import timezone
 
-from .models import Order
+from apps.common.mailqueue import enqueue_email
+from .models import Order, ProcessedWebhookEvent
 
 logger = logging.getLogger(__name__)
 
 
+def idempotent_event(handler):
+    """Run a handler at most once per Stripe event id.
+
+    The handler runs in a transaction that also records the event in
+    ``ProcessedWebhookEvent``. A repeat is answered after one indexed
+    lookup; a concurrent delivery blocks on the unique index and then
+    backs off, so side effects happen exactly once. Events without an
+    id (hand-made test payloads) just run in the transaction.
+    """
+    @functools.wraps(handler)
+    def wrapper(self, event):
+        event_id = event.get("id")
+        if event_id and ProcessedWebhookEvent.objects.filter(
+                event_id=event_id).exists():
+            logger.info("Webhook %s already processed; skipping", event_id)
+            return HttpResponse(status=200)
+        with transaction.atomic():
+            if event_id:
+                try:
+                    with transaction.atomic():
+                        ProcessedWebhookEvent.objects.create(
+                            event_id=event_id,
+                            event_type=event.get("type") or "")
+                except IntegrityError:
+                    logger.info(
+                        "Webhook %s processed concurrently; skipping",
+                        event_id)
+                    return HttpResponse(status=200)
+            return handler(self, event)
+    return wrapper
+
+
 class StripeWH_Handler:
     """
     Handle Stripe webhooks for the Modern Classics checkout app.
@@ -28,9 +62,9 @@ class StripeWH_Handler:
 
     # ----------------------------- helpers -----------------------------
 
-    def _send_confirmation_email(self, order: Order) -> None:
+    def _queue_confirmation_email(self, order: Order) -> None:
         """
-        Send a simple text receipt using:
+        Queue a simple text receipt using:
         templates/checkout/confirmation_emails/{subject.txt, body.txt}
         """
         to_email = order.email or (order.user.email if order.user else "")
@@ -48,13 +82,23 @@ class StripeWH_Handler:
             {"order": order, "contact_email": settings.DEFAULT_FROM_EMAIL},
         )
 
-        send_mail(
-            subject=subject,
-            message=body,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[to_email],
-            fail_silently=False,
-        )
+        enqueue_email(subject, body, [to_email], category="receipt")
+
+    # ----------------------------- dispatch ----------------------------
+
+    def dispatch(self, event, event_type=None):
+        """Run the handler for ``event_type`` (default: the event's own)."""
+        event_map = {
+            "payment_intent.succeeded": self.handle_payment_intent_succeeded,
+            "payment_intent.payment_failed": (
+                self.handle_payment_intent_payment_failed
+            ),
+            "checkout.session.completed": (
+                self.handle_checkout_session_completed
+            ),
+        }
+        event_type = event_type or event.get("type")
+        return event_map.get(event_type, self.handle_event)(event)
 
     # -------------------------- generic fallback -----------------------
 
@@ -68,6 +112,7 @@ class StripeWH_Handler:
 
     # key events
 
+    @idempotent_event
     def handle_payment_intent_succeeded(self, event):
         intent = event["data"]["object"]
         pid = intent.get("id")
@@ -78,11 +123,12 @@ class StripeWH_Handler:
             return HttpResponse(status=200)
 
         try:
-            order = Order.objects.get(pk=order_id)
+            # Serialise with anything else settling this order right now.
+            order = Order.objects.select_for_update().get(pk=order_id)
         except Order.DoesNotExist:
             return HttpResponse(status=200)
 
-        # Stripe may retry the same event; avoid duplicate side effects.
+        # Already settled, e.g. by CheckoutView.post; don't mail again.
         if (
             hasattr(order, "status")
             and order.status == Order.PaymentStatus.PAID
@@ -121,9 +167,12 @@ class StripeWH_Handler:
         # (Optional) mark cars sold & clear from other carts here
         # Only if logic is added
 
-        self._send_confirmation_email(order)
+        # Queued in the same transaction as the payment and the event
+        # marker, so the receipt goes out exactly when they commit.
+        self._queue_confirmation_email(order)
         return HttpResponse(status=200)
 
+    @idempotent_event
     def handle_payment_intent_payment_failed(self, event):
         intent = event["data"]["object"]
         metadata = intent.get("metadata") or {}
@@ -142,6 +191,7 @@ class StripeWH_Handler:
 
     # optional: Checkout Session
 
+    @idempotent_event
     def handle_checkout_session_completed(self, event):
         """
         Only used if you switch to Stripe Checkout Sessions (hosted page).
@@ -158,7 +208,9 @@ class StripeWH_Handler:
         except Order.DoesNotExist:
             return HttpResponse(status=200)
 
-        self._send_confirmation_email(order)
+        # Queued with the event marker, so a redelivery can't resend it.
+        self._queue_confirmation_email(order)
         logger.info(
-            "Receipt sent for order %s (checkout.session.completed)", order.pk)
+            "Receipt queued for order %s (checkout.session.completed)",
+            order.pk)
         return HttpResponse(status=200)
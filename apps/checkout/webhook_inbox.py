@@ -0,0 +1,134 @@
+"""Webhook inbox for the checkout app.
+
+The webhook view stores each verified event with ``ingest()`` and
+returns at once; ``process_webhooks`` then claims due rows under a lease
+and runs the handlers. Delivery is at-least-once: a worker that dies
+mid-event leaves a lease that expires, and the row is claimed again.
+Failed events are retried with backoff until ``MAX_ATTEMPTS`` (see
+``apps.common.leased_queue``)."""
+
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Min
+from django.utils import timezone
+
+from apps.common.leased_queue import LeasedQueue
+
+from .models import WebhookEvent
+from .webhook_handler import StripeWH_Handler
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+
+# A claimed event not finished within this many seconds is re-queued.
+LEASE_SECONDS = 120
+
+MAX_ATTEMPTS = 8
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60
+
+queue = LeasedQueue(
+    WebhookEvent, claimed=WebhookEvent.Status.PROCESSING,
+    batch_size=BATCH_SIZE, lease_seconds=LEASE_SECONDS,
+    max_attempts=MAX_ATTEMPTS, retry_base_seconds=RETRY_BASE_SECONDS,
+    retry_max_seconds=RETRY_MAX_SECONDS)
+claim_batch = queue.claim
+
+
+def event_id_for(event, payload):
+    """Stripe's event id, or a digest of the raw body if it has none."""
+    event_id = event.get("id")
+    if event_id:
+        return event_id
+    return "sha256:" + hashlib.sha256(payload).hexdigest()
+
+
+def ingest(event, payload, data):
+    """Store a verified event; redeliveries of the same id are ignored.
+
+    ``data`` is the decoded JSON body kept for the handlers.
+    """
+    WebhookEvent.objects.bulk_create(
+        [WebhookEvent(
+            event_id=event_id_for(event, payload),
+            event_type=event.get("type") or "",
+            payload=data,
+        )],
+        ignore_conflicts=True,
+    )
+
+
+def process_event(event, handler=None):
+    """Run the handler for one claimed event and record the outcome."""
+    handler = handler or StripeWH_Handler(None)
+    try:
+        with transaction.atomic():
+            handler.dispatch(event.payload, event.event_type)
+    except Exception as err:
+        logger.exception(
+            "Webhook %s (%s) failed on attempt %s",
+            event.event_id, event.event_type, event.attempts)
+        queue.record_failure(event, err)
+        return False
+
+    event.status = WebhookEvent.Status.DONE
+    event.processed_at = timezone.now()
+    event.locked_until = None
+    event.last_error = ""
+    event.save(update_fields=[
+        "status", "processed_at", "locked_until", "last_error"])
+    return True
+
+
+def process_pending(limit=BATCH_SIZE):
+    """Claim and process one batch; returns ``(processed, failed)``."""
+    handler = StripeWH_Handler(None)
+    processed = failed = 0
+    for event in claim_batch(limit):
+        if process_event(event, handler):
+            processed += 1
+        else:
+            failed += 1
+    return processed, failed
+
+
+def inbox_metrics(window=timedelta(minutes=5)):
+    """Queue depth, lag and throughput for the metrics endpoint."""
+    now = timezone.now()
+    since = now - window
+    by_status = {
+        row["status"]: row["n"]
+        for row in WebhookEvent.objects.order_by().values("status")
+        .annotate(n=Count("pk"))
+    }
+    due = queue.due(now).aggregate(
+        depth=Count("pk"), oldest=Min("received_at"))
+    recent = WebhookEvent.objects.filter(
+        status=WebhookEvent.Status.DONE, processed_at__gte=since,
+    ).aggregate(
+        n=Count("pk"),
+        lag=Avg(F("processed_at") - F("received_at")),
+    )
+    return {
+        "counts": {
+            status: by_status.get(status, 0)
+            for status in WebhookEvent.Status.values
+        },
+        "due": due["depth"],
+        "oldest_due_seconds": (
+            round((now - due["oldest"]).total_seconds(), 1)
+            if due["oldest"] else 0.0
+        ),
+        "window_seconds": int(window.total_seconds()),
+        "processed_in_window": recent["n"],
+        "per_minute": round(
+            recent["n"] / (window.total_seconds() / 60), 2),
+        "avg_lag_seconds": (
+            round(recent["lag"].total_seconds(), 3)
+            if recent["lag"] is not None else None
+        ),
+    }
@@ -1,8 +1,10 @@
 """Webhook endpoint handlers for the checkout app.
 
-Accepts external service callbacks and delegates event processing."""
+Accepts external service callbacks and queues them in the webhook inbox
+for the ``process_webhooks`` worker."""
 
 # apps/checkout/webhooks.py
+import json
 import logging
 import stripe
 
@@ -10,11 +12,11 @@ from django.conf import settings
 from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
-from .webhook_handler import StripeWH_Handler
+from .payments import get_gateway
+from .webhook_inbox import ingest
 
 logger = logging.getLogger(__name__)
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
 WH_SECRET = settings.STRIPE_WEBHOOK_SECRET
 
 
@@ -25,7 +27,8 @@ def stripe_webhook(request):
     sig_header = request.META.get("HTTP_STRIPE_SIGNATURE", "")
 
     try:
-        event = stripe.Webhook.construct_event(payload, sig_header, WH_SECRET)
+        event = get_gateway().construct_event(
+            payload, sig_header, WH_SECRET)
     except ValueError as err:
         logger.warning("Stripe webhook: invalid JSON payload (%s)", err)
         return HttpResponse(status=400)
@@ -39,16 +42,6 @@ def stripe_webhook(request):
     logger.info("Stripe webhook received: id=%s type=%s",
                 event.get("id"), event.get("type"))
 
-    # 2) Dispatch
-    handler = StripeWH_Handler(request)
-    event_map = {
-        "payment_intent.succeeded": handler.handle_payment_intent_succeeded,
-        "payment_intent.payment_failed": (
-            handler.handle_payment_intent_payment_failed
-        ),
-        "checkout.session.completed": (
-            handler.handle_checkout_session_completed
-        ),
-    }
-    fn = event_map.get(event.get("type"), handler.handle_event)
-    return fn(event)
+    # 2) Queue it; process_webhooks runs the handlers off the request path
+    ingest(event, payload, json.loads(payload))
+    return HttpResponse(status=200)
@@ -5,7 +5,7 @@ and management actions."""
 
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Newsletter, Contact, FAQ, NewsletterEmail
+from .models import Newsletter, Contact, FAQ, NewsletterEmail, OutboundEmail
 
 
 @admin.register(Newsletter)
@@ -21,7 +21,10 @@ class NewsletterEmailAdmin(admin.ModelAdmin):
         "subject", "status_badge", "recipient_count", "created_at", "sent_at")
     list_filter = ("status", "created_at", "sent_at")
     search_fields = ("subject",)
-    readonly_fields = ("sent_at", "recipient_count", "created_at")
+    readonly_fields = (
+        "sent_at", "recipient_count", "created_at", "started_at",
+        "sent_count", "failed_count", "last_subscriber_id",
+        "progress_updated_at")
     fields = (
         "subject",
         "body",
@@ -29,7 +32,12 @@ class NewsletterEmailAdmin(admin.ModelAdmin):
         "scheduled_at",
         "created_at",
         "sent_at",
-        "recipient_count"
+        "recipient_count",
+        "started_at",
+        "sent_count",
+        "failed_count",
+        "last_subscriber_id",
+        "progress_updated_at",
         )
 
     def status_badge(self, obj):
@@ -37,6 +45,7 @@ class NewsletterEmailAdmin(admin.ModelAdmin):
         colors = {
             "draft": "#FFC107",
             "scheduled": "#17A2B8",
+            "sending": "#007BFF",
             "sent": "#28A745",
         }
         color = colors.get(obj.status, "#6C757D")
@@ -68,3 +77,14 @@ class FAQAdmin(admin.ModelAdmin):
     list_editable = ("order",)
     ordering = ("order",)
     search_fields = ("question", "answer")
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        "subject", "to_email", "category", "status", "attempts",
+        "created_at", "sent_at")
+    list_filter = ("status", "category")
+    search_fields = ("to_email", "subject")
+    readonly_fields = ("created_at", "sent_at", "last_error")
+    ordering = ("-created_at",)
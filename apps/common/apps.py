@@ -10,3 +10,6 @@ class CommonConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.common"
     verbose_name = "Common Utilities"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,140 @@
+"""Whole-page caching for anonymous visitors.
+
+Cached entries are keyed on the current *generation* of every namespace
+they depend on. Writes bump a namespace's generation with one atomic
+cache increment, so stale entries are never looked up again and simply
+age out; nothing has to be scanned or deleted."""
+
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_PREFIX = "page"
+GENERATION_PREFIX = "gen"
+
+
+def _generation_key(namespace):
+    return f"{GENERATION_PREFIX}:{namespace}"
+
+
+def _seed():
+    # A counter that was evicted restarts above every value it could have
+    # reached before, so old keys can't come back into use.
+    return time.time_ns() // 1_000_000
+
+
+def get_generations(namespaces):
+    """Return ``{namespace: generation}`` using a single cache read."""
+    keys = {_generation_key(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(keys)
+    generations = {}
+    for key, namespace in keys.items():
+        if key not in found:
+            # add() keeps whichever worker's seed landed first.
+            cache.add(key, _seed(), None)
+            found[key] = cache.get(key, _seed())
+        generations[namespace] = found[key]
+    return generations
+
+
+def bump_generation(*namespaces):
+    """Invalidate everything cached under ``namespaces``.
+
+    ``incr`` is atomic on Redis; the ``add`` fallback covers a counter
+    that has not been created yet (or was evicted).
+    """
+    for namespace in namespaces:
+        key = _generation_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, _seed(), None):
+                cache.incr(key)
+
+
+def bump_on_commit(*namespaces):
+    """Bump once the current transaction commits.
+
+    Bumping earlier would let a concurrent request re-cache the old rows
+    under the new generation before the write becomes visible.
+    """
+    transaction.on_commit(lambda: bump_generation(*namespaces))
+
+
+def versioned_key(base, namespaces):
+    """Build a cache key for ``base`` tied to the given namespaces."""
+    generations = get_generations(namespaces)
+    version = ".".join(
+        f"{namespace}={generations[namespace]}"
+        for namespace in sorted(namespaces)
+    )
+    digest = hashlib.md5(version.encode(), usedforsecurity=False).hexdigest()
+    return f"{base}:{digest}"
+
+
+def page_cache_key(request, namespaces):
+    """Cache key for ``request``; querystring order does not matter."""
+    query = urlencode(sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        for value in values
+    ))
+    digest = hashlib.md5(
+        f"{request.path}?{query}".encode(), usedforsecurity=False
+    ).hexdigest()
+    return versioned_key(f"{KEY_PREFIX}:{digest}", namespaces)
+
+
+class CachedAnonymousPageMixin:
+    """Serve GET pages to anonymous visitors from the cache.
+
+    Only plain 200 responses that set no cookies are stored, and requests
+    with pending flash messages always render fresh so they see them.
+    """
+
+    cache_namespaces = ()
+    cache_timeout = None
+
+    def get_cache_namespaces(self):
+        return self.cache_namespaces
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return settings.PAGE_CACHE_TIMEOUT
+
+    def can_use_page_cache(self, request):
+        return (
+            request.method in ("GET", "HEAD")
+            and not request.user.is_authenticated
+            and not len(get_messages(request))
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.can_use_page_cache(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = page_cache_key(request, self.get_cache_namespaces())
+        response = cache.get(key)
+        if response is not None:
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200 or response.cookies:
+            return response
+
+        def store(rendered):
+            # Rendering the CSRF token means the page is per-visitor.
+            if not request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+                cache.set(key, rendered, self.get_cache_timeout())
+
+        if hasattr(response, "add_post_render_callback"):
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
@@ -83,6 +83,16 @@ class NewsletterEmailForm(forms.ModelForm):
             }),
         }
 
+    # "sending" and "sent" are set by the send path, never by hand
+    EDITABLE_STATUSES = ("draft", "scheduled")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["status"].choices = [
+            choice for choice in self.fields["status"].choices
+            if choice[0] in self.EDITABLE_STATUSES
+        ]
+
     def clean(self):
         cleaned_data = super().clean()
         status = cleaned_data.get("status")
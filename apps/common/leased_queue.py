@@ -0,0 +1,143 @@
+"""Database-backed work queues claimed under a lease.
+
+The webhook inbox, the outbound mail queue and the car photo uploads all
+keep their work as rows with ``status``, ``attempts``, ``available_at``,
+``locked_until`` and ``last_error`` fields (plus a ``(status,
+available_at)`` index). ``LeasedQueue`` holds the parts they share:
+
+* ``claim()`` leases a batch of due rows to one worker, using
+  ``skip_locked`` so several workers can claim in parallel;
+* a row whose lease runs out before it is finished is due again, which
+  makes delivery at-least-once;
+* ``record_failure()`` re-queues a failed row with jittered exponential
+  backoff, or marks it failed once it has used up its attempts.
+
+``QueueWorkerCommand`` is the polling loop their management commands
+run: ``--once``, ``--batch-size`` and ``--idle-sleep``."""
+
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+class LeasedQueue:
+    """Claim and retry rows of ``model``; one instance per queue.
+
+    ``claimed`` is the status a leased row carries (the model's
+    ``Status`` choices must also have ``PENDING`` and ``FAILED``).
+    """
+
+    def __init__(self, model, claimed, batch_size, lease_seconds,
+                 max_attempts, retry_base_seconds, retry_max_seconds,
+                 select_related=()):
+        self.model = model
+        self.pending = model.Status.PENDING
+        self.claimed = claimed
+        self.failed = model.Status.FAILED
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.select_related = select_related
+
+    def due(self, now=None):
+        """Rows waiting for a worker, including expired leases."""
+        now = now or timezone.now()
+        return self.model.objects.filter(
+            Q(status=self.pending, available_at__lte=now)
+            | Q(status=self.claimed, locked_until__lt=now)
+        )
+
+    def claim(self, limit=None, lease=None):
+        """Lease up to ``limit`` due rows to this worker, oldest first."""
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                self.due(now)
+                .select_for_update(skip_locked=True)
+                .order_by("available_at")
+                .values_list("pk", flat=True)[:limit or self.batch_size]
+            )
+            if not ids:
+                return []
+            self.model.objects.filter(pk__in=ids).update(
+                status=self.claimed,
+                locked_until=now + timedelta(
+                    seconds=lease or self.lease_seconds),
+                attempts=F("attempts") + 1,
+            )
+        rows = self.model.objects.filter(pk__in=ids)
+        if self.select_related:
+            rows = rows.select_related(*self.select_related)
+        return list(rows.order_by("available_at"))
+
+    def retry_delay(self, attempts):
+        cap = min(
+            self.retry_max_seconds,
+            self.retry_base_seconds * 2 ** (attempts - 1))
+        return timedelta(seconds=random.uniform(cap / 2, cap))
+
+    def record_failure(self, row, err):
+        """Re-queue ``row`` after ``err``, or fail it for good once it has
+        had ``max_attempts``; returns whether it failed for good."""
+        given_up = row.attempts >= self.max_attempts
+        if given_up:
+            row.status = self.failed
+        else:
+            row.status = self.pending
+            row.available_at = timezone.now() + self.retry_delay(
+                row.attempts)
+        row.last_error = f"{type(err).__name__}: {err}"
+        row.locked_until = None
+        row.save(update_fields=[
+            "status", "available_at", "last_error", "locked_until"])
+        return given_up
+
+
+class QueueWorkerCommand(BaseCommand):
+    """Poll a queue until stopped: ``process_batch()`` runs one batch and
+    returns ``(done, failed)``; the loop sleeps whenever a pass finds
+    nothing to do."""
+
+    batch_size = 50
+    idle_sleep = 1.0
+    # Plural noun for the help text, e.g. "Events".
+    items = "Items"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Process one batch and exit.")
+        parser.add_argument(
+            "--batch-size", type=int, default=self.batch_size,
+            help=f"{self.items} claimed per batch.")
+        parser.add_argument(
+            "--idle-sleep", type=float, default=self.idle_sleep,
+            help="Seconds to wait when there is nothing to do.")
+
+    def process_batch(self, batch_size):
+        raise NotImplementedError
+
+    def report(self, done, failed, elapsed):
+        raise NotImplementedError
+
+    def idle(self):
+        """Called before sleeping on an empty queue."""
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            done, failed = self.process_batch(options["batch_size"])
+            if done or failed:
+                self.report(done, failed, time.monotonic() - started)
+            if options["once"]:
+                return
+            if not (done or failed):
+                self.idle()
+                time.sleep(options["idle_sleep"])
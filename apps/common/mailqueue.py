@@ -0,0 +1,109 @@
+"""Outbound mail queue.
+
+Requests call ``enqueue_email()``, which only inserts ``OutboundEmail``
+rows (inside the caller's transaction, so a rolled-back request sends
+nothing). The ``process_email_queue`` worker claims due rows under a
+lease and delivers them over one reused SMTP connection, retrying
+failures with backoff (see ``leased_queue``) and recording the outcome
+on each row."""
+
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.utils import timezone
+
+from .leased_queue import LeasedQueue
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+
+# A claimed message not finished within this many seconds is re-queued.
+LEASE_SECONDS = 300
+
+MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 60 * 60
+
+queue = LeasedQueue(
+    OutboundEmail, claimed=OutboundEmail.Status.SENDING,
+    batch_size=BATCH_SIZE, lease_seconds=LEASE_SECONDS,
+    max_attempts=MAX_ATTEMPTS, retry_base_seconds=RETRY_BASE_SECONDS,
+    retry_max_seconds=RETRY_MAX_SECONDS)
+claim_batch = queue.claim
+
+
+def enqueue_email(subject, body, recipient_list, from_email=None,
+                  html_body="", category=""):
+    """Queue one message per recipient; returns the created rows.
+
+    ``recipient_list`` may be any iterable, e.g. a queryset iterator.
+    """
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+    return OutboundEmail.objects.bulk_create([
+        OutboundEmail(
+            category=category,
+            to_email=to_email,
+            from_email=from_email,
+            subject=subject,
+            body=body,
+            html_body=html_body,
+        )
+        for to_email in recipient_list
+    ], batch_size=BATCH_SIZE * 10)
+
+
+def build_message(email, connection=None):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=[email.to_email],
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def _record_failure(email, err):
+    logger.warning(
+        "Email %s to %s failed on attempt %s: %s",
+        email.pk, email.to_email, email.attempts, err)
+    queue.record_failure(email, err)
+
+
+def deliver(emails, connection):
+    """Send claimed messages over ``connection``; returns (sent, failed).
+
+    Messages go out one at a time on the open connection so each row
+    gets its own outcome. After an error the connection is dropped and
+    reopened for the next message.
+    """
+    sent = failed = 0
+    for email in emails:
+        try:
+            connection.open()
+            connection.send_messages([build_message(email, connection)])
+        except Exception as err:
+            _record_failure(email, err)
+            connection.close()
+            failed += 1
+            continue
+        # Marked straight away so a crash later in the batch can't
+        # resend this one when the lease runs out.
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            status=OutboundEmail.Status.SENT,
+            sent_at=timezone.now(),
+            locked_until=None,
+            last_error="",
+        )
+        sent += 1
+    return sent, failed
+
+
+def process_pending(connection, limit=BATCH_SIZE):
+    """Claim and deliver one batch; returns ``(sent, failed)``."""
+    return deliver(claim_batch(limit), connection)
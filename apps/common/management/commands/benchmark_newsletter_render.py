@@ -0,0 +1,78 @@
+"""Management command that times newsletter rendering.
+
+Renders a campaign (or a sample body) for a number of synthetic
+recipients through the compiled renderer the send worker uses, and
+optionally through Django's template engine for comparison. Nothing is
+sent or written."""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template import Context, Template
+
+from apps.common.models import NewsletterEmail
+from apps.common.newsletter_render import CompiledNewsletter
+
+SAMPLE_SUBJECT = "New arrivals for {{ email }}"
+SAMPLE_BODY = (
+    "<h1>This month at Modern Classics</h1>\n"
+    + "<p>Fresh stock, restored and road-ready. Sent to {{ email }}.</p>\n"
+    * 20
+    + '<p><a href="{{ unsubscribe_url }}">Unsubscribe</a></p>'
+)
+
+
+class Command(BaseCommand):
+    help = "Time per-recipient newsletter rendering."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--recipients", type=int, default=100_000,
+            help="Number of recipients to render.")
+        parser.add_argument(
+            "--newsletter", type=int, default=None,
+            help="Render this campaign instead of the sample body.")
+        parser.add_argument(
+            "--base-url", default="https://example.com",
+            help="Site URL used in unsubscribe links.")
+        parser.add_argument(
+            "--compare", action="store_true",
+            help="Also time Django's template engine on the same body.")
+
+    def handle(self, *args, **options):
+        subject, body = SAMPLE_SUBJECT, SAMPLE_BODY
+        if options["newsletter"] is not None:
+            try:
+                newsletter = NewsletterEmail.objects.get(
+                    pk=options["newsletter"])
+            except NewsletterEmail.DoesNotExist:
+                raise CommandError(
+                    f"Newsletter {options['newsletter']} does not exist.")
+            subject, body = newsletter.subject, newsletter.body
+        count = options["recipients"]
+
+        started = time.perf_counter()
+        compiled = CompiledNewsletter(subject, body, options["base_url"])
+        for n in range(count):
+            compiled.render(n, f"subscriber{n}@example.com")
+        self.report("compiled", count, time.perf_counter() - started)
+
+        if options["compare"]:
+            started = time.perf_counter()
+            subject_template = Template(subject)
+            body_template = Template(body)
+            for n in range(count):
+                context = Context({
+                    "email": f"subscriber{n}@example.com",
+                    "unsubscribe_url": compiled.unsubscribe_url(n),
+                })
+                subject_template.render(context)
+                body_template.render(context)
+            self.report(
+                "django template", count, time.perf_counter() - started)
+
+    def report(self, label, count, elapsed):
+        rate = count / elapsed if elapsed else float("inf")
+        self.stdout.write(
+            f"{label}: {count} recipients in {elapsed:.2f}s "
+            f"({rate:,.0f}/s)")
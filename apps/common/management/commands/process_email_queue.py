@@ -0,0 +1,34 @@
+"""Management command that delivers the outbound mail queue.
+
+Run it as a worker process (see the Procfile). While there is mail to
+send it keeps one SMTP connection open across batches; it closes the
+connection and sleeps when the queue is empty. Use ``--once`` to send a
+single batch."""
+
+from django.core.mail import get_connection
+
+from apps.common.leased_queue import QueueWorkerCommand
+from apps.common.mailqueue import BATCH_SIZE, process_pending
+
+
+class Command(QueueWorkerCommand):
+    help = "Deliver queued outbound email."
+    batch_size = BATCH_SIZE
+    idle_sleep = 2.0
+    items = "Messages"
+
+    def handle(self, *args, **options):
+        self.connection = get_connection(fail_silently=False)
+        try:
+            super().handle(*args, **options)
+        finally:
+            self.connection.close()
+
+    def process_batch(self, batch_size):
+        return process_pending(self.connection, batch_size)
+
+    def report(self, sent, failed, elapsed):
+        self.stdout.write(f"Sent {sent} email(s), {failed} failed.")
+
+    def idle(self):
+        self.connection.close()
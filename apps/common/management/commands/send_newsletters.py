@@ -0,0 +1,62 @@
+"""Management command that schedules and sends newsletter campaigns.
+
+Run it as a worker process (see the Procfile). Each pass it starts any
+scheduled campaigns that have fallen due (within the send window), then
+claims a sending campaign and dispatches it batch by batch over one
+mail connection; an interrupted campaign is picked up again from its
+last checkpoint once its lease expires. Use ``--once`` for a single
+pass, e.g. from cron."""
+
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from apps.common.newsletters import (
+    claim_campaign, dispatch, lease_seconds, start_due_campaigns,
+)
+
+
+class Command(BaseCommand):
+    help = "Start due scheduled newsletters and send pending campaigns."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Send at most one campaign and exit.")
+        parser.add_argument(
+            "--batch-size", type=int, default=None,
+            help="Subscribers per checkpoint (default from settings).")
+        parser.add_argument(
+            "--idle-sleep", type=float, default=5.0,
+            help="Seconds to wait when nothing is due.")
+
+    def handle(self, *args, **options):
+        connection = get_connection(fail_silently=False)
+        try:
+            while True:
+                for started in start_due_campaigns():
+                    self.stdout.write(
+                        f"Started scheduled newsletter '{started.subject}'.")
+                newsletter = claim_campaign(
+                    lease_seconds(options["batch_size"]))
+                if newsletter is not None:
+                    dispatch(
+                        newsletter, connection,
+                        batch_size=options["batch_size"])
+                    if newsletter.status == "sent":
+                        self.stdout.write(
+                            f"Sent '{newsletter.subject}': "
+                            f"{newsletter.sent_count} sent, "
+                            f"{newsletter.failed_count} queued for retry.")
+                    else:
+                        self.stderr.write(
+                            f"Stopped '{newsletter.subject}': another "
+                            "worker took it over.")
+                if options["once"]:
+                    return
+                if newsletter is None:
+                    connection.close()
+                    time.sleep(options["idle_sleep"])
+        finally:
+            connection.close()
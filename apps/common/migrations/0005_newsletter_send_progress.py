@@ -0,0 +1,48 @@
+# Generated by Django 5.2.2 on 2026-10-18 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0004_outbound_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsletteremail',
+            name='failed_count',
+            field=models.PositiveIntegerField(default=0, help_text='Handed to the mail queue for retry'),
+        ),
+        migrations.AddField(
+            model_name='newsletteremail',
+            name='last_subscriber_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='newsletteremail',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='newsletteremail',
+            name='progress_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='newsletteremail',
+            name='sent_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='newsletteremail',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='newsletteremail',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('scheduled', 'Scheduled'), ('sending', 'Sending'), ('sent', 'Sent')], default='draft', max_length=10),
+        ),
+    ]
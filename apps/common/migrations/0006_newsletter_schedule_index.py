@@ -0,0 +1,17 @@
+# Generated by Django 5.2.2 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0005_newsletter_send_progress'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newsletteremail',
+            index=models.Index(fields=['status', 'scheduled_at'], name='newsletter_status_scheduled'),
+        ),
+    ]
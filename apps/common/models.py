@@ -30,6 +30,7 @@ class NewsletterEmail(models.Model):
     STATUS_CHOICES = [
         ("draft", "Draft"),
         ("scheduled", "Scheduled"),
+        ("sending", "Sending"),
         ("sent", "Sent"),
     ]
 
@@ -47,8 +48,24 @@ class NewsletterEmail(models.Model):
         default=0,
         help_text="Number of subscribers who received it")
 
+    # Send progress, checkpointed after every batch so an interrupted
+    # send resumes after the last subscriber it reached.
+    started_at = models.DateTimeField(null=True, blank=True)
+    last_subscriber_id = models.BigIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(
+        default=0, help_text="Handed to the mail queue for retry")
+    progress_updated_at = models.DateTimeField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # The scheduler's "due campaigns" poll
+            models.Index(
+                fields=["status", "scheduled_at"],
+                name="newsletter_status_scheduled"),
+        ]
 
     def __str__(self):
         return f"{self.subject} ({self.get_status_display()})"
@@ -57,6 +74,17 @@ class NewsletterEmail(models.Model):
     def is_sent(self) -> bool:
         return self.status == "sent"
 
+    @property
+    def has_started(self) -> bool:
+        return self.status in ("sending", "sent")
+
+    @property
+    def progress_percent(self) -> int:
+        if not self.recipient_count:
+            return 0
+        done = self.sent_count + self.failed_count
+        return min(100, done * 100 // self.recipient_count)
+
 
 # Contact
 class Contact(models.Model):
@@ -86,3 +114,39 @@ class FAQ(models.Model):
 
     def __str__(self):
         return self.question
+
+
+# Outbound mail queue (delivered by ``process_email_queue``)
+class OutboundEmail(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENDING = "sending", "Sending"
+        SENT = "sent", "Sent"
+        FAILED = "failed", "Failed"
+
+    category = models.CharField(
+        max_length=30, blank=True, help_text="e.g. receipt, newsletter")
+    to_email = models.EmailField()
+    from_email = models.CharField(max_length=254)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ("created_at",)
+        indexes = [
+            models.Index(
+                fields=["status", "available_at"],
+                name="outbound_status_available"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {self.to_email} ({self.status})"
@@ -0,0 +1,144 @@
+"""Per-recipient rendering for newsletter campaigns.
+
+A campaign's subject and body are compiled once into lists of literal
+chunks and placeholder names (``{{ email }}``, ``{{ unsubscribe_url }}``)
+for a plain-text and an HTML part, and the compiled form is kept in a
+small LRU cache. Rendering a recipient is then a join over those chunks,
+with no template engine involved, so a 100k-subscriber send spends its
+time on SMTP rather than on rendering (see ``benchmark_newsletter_render``).
+
+Unsubscribe links carry a signed subscriber id; ``unsubscribe_token()``
+and ``read_unsubscribe_token()`` are the only places that know the
+format."""
+
+import functools
+import html
+import re
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core import signing
+from django.core.mail import EmailMultiAlternatives
+from django.urls import reverse
+from django.utils.html import linebreaks, strip_tags
+
+PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# Variables a newsletter body may use; other {{ names }} stay as typed.
+VARIABLES = ("email", "unsubscribe_url")
+
+UNSUBSCRIBE_SALT = "newsletter-unsubscribe"
+
+TEXT_FOOTER = "\n\n--\nUnsubscribe: {{ unsubscribe_url }}\n"
+HTML_FOOTER = (
+    '<p style="font-size:12px;color:#6c757d">'
+    '<a href="{{ unsubscribe_url }}">Unsubscribe</a></p>'
+)
+
+_signer = signing.Signer(salt=UNSUBSCRIBE_SALT)
+
+
+def unsubscribe_token(subscriber_id):
+    return _signer.sign(str(subscriber_id))
+
+
+def read_unsubscribe_token(token):
+    """The subscriber id in ``token``; raises ``signing.BadSignature``."""
+    return int(_signer.unsign(token))
+
+
+def site_url():
+    scheme = "http" if settings.DEBUG else "https"
+    return f"{scheme}://{Site.objects.get_current().domain}"
+
+
+class CompiledTemplate:
+    """Literal chunks interleaved with variable names, ready to join."""
+
+    def __init__(self, source):
+        self.chunks = []
+        position = 0
+        for match in PLACEHOLDER.finditer(source):
+            if match.group(1) not in VARIABLES:
+                continue
+            self.chunks.append(source[position:match.start()])
+            self.chunks.append(match.group(1))
+            position = match.end()
+        self.chunks.append(source[position:])
+
+    def render(self, values):
+        parts = self.chunks[:]
+        # Odd positions hold variable names.
+        for i in range(1, len(parts), 2):
+            parts[i] = values[parts[i]]
+        return "".join(parts)
+
+
+def looks_like_html(body):
+    return bool(re.search(r"<[a-zA-Z][^>]*>", body))
+
+
+class CompiledNewsletter:
+    """A campaign's subject, text and HTML parts, compiled once."""
+
+    def __init__(self, subject, body, base_url):
+        self.base_url = base_url
+        self.unsubscribe_path = reverse(
+            "common:newsletter_unsubscribe", kwargs={"token": "TOKEN"})
+        if looks_like_html(body):
+            html_source = body
+            text_source = strip_tags(body)
+        else:
+            html_source = linebreaks(html.escape(body, quote=False))
+            text_source = body
+        if "unsubscribe_url" not in PLACEHOLDER.findall(body):
+            html_source += HTML_FOOTER
+            text_source += TEXT_FOOTER
+        self.subject = CompiledTemplate(subject)
+        self.text = CompiledTemplate(text_source)
+        self.html = CompiledTemplate(html_source)
+
+    def unsubscribe_url(self, subscriber_id):
+        return self.base_url + self.unsubscribe_path.replace(
+            "TOKEN", unsubscribe_token(subscriber_id))
+
+    def render(self, subscriber_id, email):
+        """``(subject, text, html, unsubscribe_url)`` for one recipient."""
+        url = self.unsubscribe_url(subscriber_id)
+        values = {"email": email, "unsubscribe_url": url}
+        escaped = {
+            "email": html.escape(email), "unsubscribe_url": html.escape(url)}
+        return (
+            self.subject.render(values),
+            self.text.render(values),
+            self.html.render(escaped),
+            url,
+        )
+
+    def message(self, subscriber_id, email, from_email, connection=None):
+        subject, text, html_body, url = self.render(subscriber_id, email)
+        message = EmailMultiAlternatives(
+            subject=subject,
+            body=text,
+            from_email=from_email,
+            to=[email],
+            connection=connection,
+            headers={
+                "List-Unsubscribe": f"<{url}>",
+                "List-Unsubscribe-Post": "List-Unsubscribe=One-Click",
+            },
+        )
+        message.attach_alternative(html_body, "text/html")
+        return message
+
+
+@functools.lru_cache(maxsize=16)
+def _compile(subject, body, base_url):
+    return CompiledNewsletter(subject, body, base_url)
+
+
+def compile_newsletter(newsletter, base_url=None):
+    """The compiled form of a campaign, shared while its text is unchanged.
+    """
+    return _compile(newsletter.subject, newsletter.body,
+                    base_url or site_url())
@@ -0,0 +1,280 @@
+"""Newsletter send engine.
+
+``start_campaign()`` marks a campaign as sending, either from the send
+view or, for scheduled campaigns, from ``start_due_campaigns()`` once
+their time comes (inside ``NEWSLETTER_SEND_WINDOW``). The
+``send_newsletters`` worker then claims it and walks the subscriber
+table in primary-key order, one batch at a time, sending over a single
+open mail connection at a bounded rate. Progress is written to the
+campaign after every batch, so the list page shows it live and a
+restarted worker carries on from the last checkpoint (re-sending at
+most the batch in flight). The lease is sized to cover a batch at the
+send rate, and every checkpoint is conditional on still holding it, so
+a worker that overran its lease and was replaced stops instead of
+sending alongside the new one. Each recipient gets their own copy, rendered
+from the campaign compiled once by ``newsletter_render``. Addresses the
+mail server rejects are handed to the outbound mail queue, with that
+rendered copy, for retry instead of failing the campaign."""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Newsletter, NewsletterEmail, OutboundEmail
+from .newsletter_render import compile_newsletter
+
+logger = logging.getLogger(__name__)
+
+NEWSLETTER_FROM_EMAIL = "noreply@modernclassics.com"
+
+# Shortest lease on a campaign; a worker that hasn't checkpointed by the
+# end of its lease loses the campaign to the next one to claim it.
+LEASE_SECONDS = 300
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` sends per second, bursting to
+    ``burst``."""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic,
+                 sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.burst
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.rate:
+            return
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                self.sleep((1 - self.tokens) / self.rate)
+                self.updated = self.clock()
+                self.tokens = 0.0
+            else:
+                self.tokens -= 1
+
+
+def subscriber_batches(after_id=0, batch_size=None):
+    """Yield lists of ``(pk, email)`` in pk order, starting after
+    ``after_id``; each batch is one indexed range query."""
+    batch_size = batch_size or settings.NEWSLETTER_BATCH_SIZE
+    while True:
+        batch = list(
+            Newsletter.objects.filter(pk__gt=after_id)
+            .order_by("pk")
+            .values_list("pk", "email")[:batch_size]
+        )
+        if batch:
+            yield batch
+        if len(batch) < batch_size:
+            return
+        after_id = batch[-1][0]
+
+
+def start_campaign(newsletter):
+    """Mark ``newsletter`` as sending; the caller holds its row lock.
+
+    Returns the number of subscribers it will go to.
+    """
+    newsletter.recipient_count = Newsletter.objects.count()
+    newsletter.status = "sending"
+    newsletter.started_at = timezone.now()
+    newsletter.progress_updated_at = newsletter.started_at
+    newsletter.last_subscriber_id = 0
+    newsletter.sent_count = 0
+    newsletter.failed_count = 0
+    newsletter.locked_until = None
+    newsletter.save()
+    return newsletter.recipient_count
+
+
+def parse_window(window):
+    """``"HH:MM-HH:MM"`` to a pair of ``time``s, or ``None`` if empty."""
+    if not window:
+        return None
+    start, end = (
+        datetime.strptime(part.strip(), "%H:%M").time()
+        for part in window.split("-")
+    )
+    return start, end
+
+
+def in_send_window(now=None, window=None):
+    """Whether scheduled campaigns may start at ``now``.
+
+    The window is read on the ``TIME_ZONE`` clock and may wrap past
+    midnight ("22:00-05:00").
+    """
+    bounds = parse_window(
+        settings.NEWSLETTER_SEND_WINDOW if window is None else window)
+    if bounds is None:
+        return True
+    start, end = bounds
+    current = timezone.localtime(now or timezone.now()).time()
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+def start_due_campaigns(now=None, limit=10):
+    """Move scheduled campaigns whose time has come to sending.
+
+    Rows are locked with ``skip_locked`` so several schedulers can poll
+    at once without starting a campaign twice. Returns those started.
+    """
+    now = now or timezone.now()
+    if not in_send_window(now):
+        return []
+    with transaction.atomic():
+        due = list(
+            NewsletterEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status="scheduled", scheduled_at__lte=now)
+            .order_by("scheduled_at")[:limit]
+        )
+        for newsletter in due:
+            start_campaign(newsletter)
+            logger.info(
+                "Newsletter %s scheduled for %s started",
+                newsletter.pk, newsletter.scheduled_at)
+    return due
+
+
+def lease_seconds(batch_size=None, rate=None):
+    """Twice as long as a batch takes at the send rate, with
+    ``LEASE_SECONDS`` as the floor for fast or unlimited rates."""
+    batch_size = batch_size or settings.NEWSLETTER_BATCH_SIZE
+    rate = settings.NEWSLETTER_SEND_RATE if rate is None else rate
+    if not rate:
+        return LEASE_SECONDS
+    return max(LEASE_SECONDS, 2 * batch_size / rate)
+
+
+def claim_campaign(lease=None):
+    """Lease the oldest sending campaign no live worker holds."""
+    lease = lease or lease_seconds()
+    now = timezone.now()
+    with transaction.atomic():
+        newsletter = (
+            NewsletterEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status="sending")
+            .filter(Q(locked_until__isnull=True) | Q(locked_until__lt=now))
+            .order_by("started_at")
+            .first()
+        )
+        if newsletter is None:
+            return None
+        newsletter.locked_until = now + timedelta(seconds=lease)
+        newsletter.save(update_fields=["locked_until"])
+    return newsletter
+
+
+def send_batch(newsletter, batch, connection, limiter, compiled=None):
+    """Send one batch; returns ``(sent, unsaved OutboundEmail retries)``.
+    """
+    compiled = compiled or compile_newsletter(newsletter)
+    sent = 0
+    retry = []
+    for subscriber_id, email in batch:
+        limiter.wait()
+        message = compiled.message(
+            subscriber_id, email, NEWSLETTER_FROM_EMAIL, connection)
+        try:
+            connection.open()
+            connection.send_messages([message])
+        except Exception as err:
+            logger.warning(
+                "Newsletter %s to %s failed: %s", newsletter.pk, email, err)
+            connection.close()
+            retry.append(OutboundEmail(
+                category="newsletter",
+                to_email=email,
+                from_email=NEWSLETTER_FROM_EMAIL,
+                subject=message.subject,
+                body=message.body,
+                html_body=message.alternatives[0].content,
+            ))
+        else:
+            sent += 1
+    return sent, retry
+
+
+def _held(newsletter):
+    # The lease expiry this worker set doubles as its claim on the row.
+    return NewsletterEmail.objects.filter(
+        pk=newsletter.pk, status="sending",
+        locked_until=newsletter.locked_until)
+
+
+def checkpoint(newsletter, last_id, sent, failed, lease=None):
+    """Record progress and renew the lease; ``False`` if another worker
+    has taken the campaign over, in which case nothing is written."""
+    now = timezone.now()
+    locked_until = now + timedelta(seconds=lease or lease_seconds())
+    updated = _held(newsletter).update(
+        last_subscriber_id=last_id,
+        sent_count=F("sent_count") + sent,
+        failed_count=F("failed_count") + failed,
+        progress_updated_at=now,
+        locked_until=locked_until,
+    )
+    if not updated:
+        return False
+    newsletter.locked_until = locked_until
+    newsletter.last_subscriber_id = last_id
+    newsletter.sent_count += sent
+    newsletter.failed_count += failed
+    return True
+
+
+def dispatch(newsletter, connection, limiter=None, batch_size=None):
+    """Send a claimed campaign from its checkpoint to the end.
+
+    Stops early, leaving ``newsletter.status`` as ``"sending"``, if the
+    lease was lost to another worker.
+    """
+    limiter = limiter or RateLimiter(settings.NEWSLETTER_SEND_RATE)
+    lease = lease_seconds(batch_size, limiter.rate)
+    compiled = compile_newsletter(newsletter)
+    for batch in subscriber_batches(
+            newsletter.last_subscriber_id, batch_size):
+        sent, retry = send_batch(
+            newsletter, batch, connection, limiter, compiled)
+        if retry:
+            # The retry rows and the checkpoint commit together.
+            with transaction.atomic():
+                held = checkpoint(
+                    newsletter, batch[-1][0], sent, len(retry), lease)
+                if held:
+                    OutboundEmail.objects.bulk_create(retry)
+        else:
+            held = checkpoint(newsletter, batch[-1][0], sent, 0, lease)
+        if not held:
+            logger.warning(
+                "Newsletter %s: lease lost to another worker after "
+                "subscriber %s; stopping", newsletter.pk, batch[-1][0])
+            return newsletter
+        logger.info(
+            "Newsletter %s: %s sent, %s deferred, up to subscriber %s",
+            newsletter.pk, newsletter.sent_count, newsletter.failed_count,
+            newsletter.last_subscriber_id)
+
+    if _held(newsletter).update(
+            status="sent", sent_at=timezone.now(), locked_until=None):
+        newsletter.status = "sent"
+    return newsletter
@@ -0,0 +1,218 @@
+"""Keyset (cursor) pagination for the project's list views.
+
+Pages are addressed by an opaque token holding the sort key of the last
+row seen, so deep pages cost the same as the first and no COUNT is run."""
+
+import datetime
+import json
+
+from django.conf import settings
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+CURSOR_SALT = "apps.common.pagination.cursor"
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keep full microsecond precision, which DjangoJSONEncoder drops.
+
+    A truncated timestamp would make rows created within the same
+    millisecond compare wrongly against the cursor.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class CursorSerializer:
+    """JSON serializer for signed cursors that copes with Decimal/datetime."""
+
+    def dumps(self, obj):
+        return json.dumps(
+            obj, cls=CursorEncoder, separators=(",", ":")
+        ).encode("latin-1")
+
+    def loads(self, data):
+        return json.loads(data.decode("latin-1"))
+
+
+def get_ordering(queryset):
+    """Return the queryset ordering as ``[(field, descending), ...]``.
+
+    The primary key is appended as a tie-breaker when missing so every
+    row has a unique position.
+    """
+    meta = queryset.model._meta
+    names = list(queryset.query.order_by or meta.ordering)
+    ordering = []
+    for name in names:
+        if not isinstance(name, str) or name == "?":
+            raise ValueError(
+                "Cursor pagination needs plain field names to order by.")
+        descending = name.startswith("-")
+        field = name.lstrip("-")
+        ordering.append((meta.pk.name if field == "pk" else field, descending))
+    if meta.pk.name not in {field for field, _ in ordering}:
+        ordering.append((meta.pk.name, True))
+    return ordering
+
+
+def _value_for(obj, field):
+    for part in field.split("__"):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _keyset_filter(ordering, values, backwards=False):
+    """Build the WHERE clause selecting rows after ``values``.
+
+    Mixed sort directions rule out a single row-value comparison, so the
+    condition is expanded as ``a > x OR (a = x AND b < y) OR ...``.
+    """
+    condition = Q()
+    for index, (field, descending) in enumerate(ordering):
+        lookup = "lt" if descending != backwards else "gt"
+        clause = Q(**{f"{field}__{lookup}": values[index]})
+        for prev_index, (prev_field, _) in enumerate(ordering[:index]):
+            clause &= Q(**{prev_field: values[prev_index]})
+        condition |= clause
+    return condition
+
+
+class CursorPage:
+    """A page of results addressed by cursor rather than page number."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Slice an ordered queryset into keyset pages."""
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = get_ordering(queryset)
+        self.signature = [
+            f"-{field}" if descending else field
+            for field, descending in self.ordering
+        ]
+
+    def encode_cursor(self, obj, backwards=False):
+        payload = {
+            "o": self.signature,
+            "v": [_value_for(obj, field) for field, _ in self.ordering],
+            "b": backwards,
+        }
+        return signing.dumps(
+            payload, salt=CURSOR_SALT, serializer=CursorSerializer,
+            compress=True)
+
+    def decode_cursor(self, token):
+        """Return ``(values, backwards)`` or ``None`` for unusable tokens."""
+        if not token:
+            return None
+        try:
+            payload = signing.loads(
+                token, salt=CURSOR_SALT, serializer=CursorSerializer)
+        except (signing.BadSignature, ValueError):
+            return None
+        # A cursor minted under another sort order would skip rows.
+        if not isinstance(payload, dict) or payload.get("o") != self.signature:
+            return None
+        values = payload.get("v")
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            return None
+        if any(value is None for value in values):
+            return None
+        return values, bool(payload.get("b"))
+
+    def page(self, token=None):
+        cursor = self.decode_cursor(token)
+        queryset = self.queryset
+        backwards = False
+        if cursor:
+            values, backwards = cursor
+            queryset = queryset.filter(
+                _keyset_filter(self.ordering, values, backwards))
+
+        # Walking backwards reads the reversed ordering and flips the rows;
+        # one extra row tells us whether another page follows.
+        rows = list(queryset.order_by(*self._order_by(backwards))[
+            :self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        if not rows:
+            return CursorPage(rows)
+        if backwards:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+        return CursorPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1]) if has_next else None,
+            previous_cursor=(
+                self.encode_cursor(rows[0], backwards=True)
+                if has_previous else None
+            ),
+        )
+
+    def _order_by(self, backwards):
+        return [
+            f"-{field}" if descending != backwards else field
+            for field, descending in self.ordering
+        ]
+
+
+class CursorPaginationMixin:
+    """Opt-in keyset pagination for ``ListView`` subclasses.
+
+    Cursor mode is used when the request carries ``?cursor=`` (an empty
+    value means the first page) or when ``CURSOR_PAGINATION`` is enabled
+    in settings. Otherwise the view keeps Django's numbered pagination.
+    """
+
+    cursor_query_param = "cursor"
+
+    def use_cursor_pagination(self):
+        if self.cursor_query_param in self.request.GET:
+            return True
+        return getattr(settings, "CURSOR_PAGINATION", False)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        page = paginator.page(self.request.GET.get(self.cursor_query_param))
+        return (None, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["cursor_pagination"] = (
+            self.get_paginate_by(self.object_list) is not None
+            and self.use_cursor_pagination()
+        )
+        return ctx
@@ -0,0 +1,16 @@
+"""Signal receivers for the common app.
+
+Keeps cached pages in step with the records they display."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import bump_on_commit
+from .models import FAQ
+
+
+@receiver(post_save, sender=FAQ)
+@receiver(post_delete, sender=FAQ)
+def invalidate_faq_pages(sender, raw=False, **kwargs):
+    if not raw:
+        bump_on_commit("faq")
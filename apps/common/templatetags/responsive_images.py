@@ -0,0 +1,54 @@
+"""Template tags for responsive Cloudinary images.
+
+``{% responsive_img car.image sizes="..." %}`` renders an ``<img>`` with
+a width-bucketed ``srcset`` from ``apps.common.images``. Passing the
+stored metadata (``natural_width``/``natural_height``, ``color`` and a
+``placeholder`` data URI) sizes the box up front and paints the preview
+behind the image until it arrives."""
+
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from apps.common.images import responsive_image
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_img(image, alt="", sizes="100vw", max_width=960,
+                   aspect=None, natural_width=None, natural_height=None,
+                   color="", placeholder="", **attrs):
+    """An ``<img>`` for ``image``; extra keyword arguments become
+    attributes (use ``class_`` for ``class``)."""
+    data = responsive_image(image, max_width=int(max_width), aspect=aspect)
+    height = data["height"]
+    if not height and natural_width and natural_height:
+        height = round(data["width"] * natural_height / natural_width)
+    html_attrs = {
+        "src": data["src"],
+        "alt": alt,
+        "width": data["width"],
+        "loading": "lazy",
+        "decoding": "async",
+    }
+    if height:
+        html_attrs["height"] = height
+    if data["srcset"]:
+        html_attrs["srcset"] = data["srcset"]
+        html_attrs["sizes"] = sizes
+        html_attrs["data-fallback-src"] = responsive_image(None)["src"]
+    for name, value in attrs.items():
+        html_attrs[name.rstrip("_").replace("_", "-")] = value
+    if data["srcset"] and (color or placeholder):
+        html_attrs["style"] = _preview_style(
+            color, placeholder, html_attrs.get("style", ""))
+    return format_html("<img{}>", flatatt(html_attrs))
+
+
+def _preview_style(color, placeholder, style):
+    background = [color] if color else []
+    if placeholder:
+        background.append(f"url({placeholder}) center / cover no-repeat")
+    preview = f"background: {' '.join(background)};"
+    return f"{preview} {style}".strip()
@@ -6,7 +6,7 @@ Maps request paths to view callables and namespaced route names."""
 from django.urls import path
 from .views import (
     ContactView, ContactSuccessView,
-    NewsletterSignupView, NewsletterSuccessView,
+    NewsletterSignupView, NewsletterSuccessView, NewsletterUnsubscribeView,
     NewsletterEmailListView, NewsletterEmailCreateView,
     NewsletterEmailUpdateView,
     NewsletterEmailDeleteView, NewsletterEmailSendView,
@@ -24,6 +24,10 @@ urlpatterns = [
     path(
         "newsletter/success/", NewsletterSuccessView.as_view(),
         name="newsletter_success"),
+    path(
+        "newsletter/unsubscribe/<str:token>/",
+        NewsletterUnsubscribeView.as_view(),
+        name="newsletter_unsubscribe"),
 
     # Newsletter email management (superuser)
     path(
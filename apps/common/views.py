@@ -3,12 +3,14 @@
 Handles HTTP requests, orchestrates domain operations,
 and returns rendered responses."""
 
-from django.http import HttpResponse, JsonResponse
+from django.core import signing
+from django.http import Http404, HttpResponse, JsonResponse
 from django.db import transaction, IntegrityError
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.utils.decorators import method_decorator
-from django.urls import reverse_lazy
+from django.views.decorators.csrf import csrf_exempt
+from django.urls import reverse, reverse_lazy
 from django.views.generic import (
     FormView,
     TemplateView,
@@ -18,8 +20,6 @@ from django.views.generic import (
     DeleteView,
     View,
 )
-from django.core.mail import send_mass_mail
-from django.utils import timezone
 from django.shortcuts import redirect, get_object_or_404
 from .forms import (
     ContactForm,
@@ -28,7 +28,10 @@ from .forms import (
     FAQForm,
     NewsletterEmailForm,
 )
+from .caching import CachedAnonymousPageMixin
 from .models import FAQ, Newsletter, NewsletterEmail
+from .newsletter_render import read_unsubscribe_token
+from .newsletters import start_campaign
 
 """
 In here, we will have the views for both the contact form, FAQs,
@@ -73,6 +76,31 @@ class NewsletterSuccessView(TemplateView):
     template_name = "common/newsletter_success.html"
 
 
+# Exempt so mail clients can POST the one-click List-Unsubscribe link;
+# the signed token in the URL is what authorises the request.
+@method_decorator(csrf_exempt, name="dispatch")
+class NewsletterUnsubscribeView(TemplateView):
+    template_name = "common/newsletter_unsubscribe.html"
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            self.subscriber_id = read_unsubscribe_token(kwargs["token"])
+        except signing.BadSignature:
+            raise Http404("Invalid unsubscribe link.")
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["subscriber"] = Newsletter.objects.filter(
+            pk=self.subscriber_id).first()
+        return context
+
+    def post(self, request, *args, **kwargs):
+        Newsletter.objects.filter(pk=self.subscriber_id).delete()
+        return self.render_to_response(
+            self.get_context_data(unsubscribed=True))
+
+
 # Newsletter email campaign management (superuser only)
 superuser_required = user_passes_test(lambda user: user.is_superuser)
 
@@ -111,7 +139,7 @@ class NewsletterEmailUpdateView(UpdateView):
 
     def form_valid(self, form):
         # Prevent editing of sent newsletters
-        if self.object.is_sent:
+        if self.object.has_started:
             messages.error(
                 self.request,
                 "Cannot edit a newsletter that has already been sent.")
@@ -131,7 +159,7 @@ class NewsletterEmailDeleteView(DeleteView):
     def delete(self, request, *args, **kwargs):
         # Prevent deletion of sent newsletters
         self.object = self.get_object()
-        if self.object.is_sent:
+        if self.object.has_started:
             messages.error(
                 request,
                 "Cannot delete a newsletter that has already been sent.")
@@ -142,62 +170,38 @@ class NewsletterEmailDeleteView(DeleteView):
 
 @method_decorator([login_required, superuser_required], name="dispatch")
 class NewsletterEmailSendView(View):
-    """Send a newsletter email to all subscribers."""
+    """Start sending a newsletter email to all subscribers."""
 
+    @method_decorator(transaction.atomic)
     def post(self, request, pk):
-        newsletter = get_object_or_404(NewsletterEmail, pk=pk)
+        # Locked so a double submit can't start the campaign twice
+        newsletter = get_object_or_404(
+            NewsletterEmail.objects.select_for_update(), pk=pk)
 
-        # Check if already sent
-        if newsletter.is_sent:
+        # Check if already sent (or being sent)
+        if newsletter.has_started:
             messages.error(request, "This newsletter has already been sent.")
             return redirect("common:newsletter_email_list")
 
-        # Get all active subscribers
-        subscribers = Newsletter.objects.values_list("email", flat=True)
-        if not subscribers.exists():
+        if not Newsletter.objects.exists():
             messages.warning(request, "No subscribers to send to.")
             return redirect("common:newsletter_email_list")
 
-        # Build email tuples for send_mass_mail
-        emails = []
-        for subscriber_email in subscribers:
-            emails.append(
-                (
-                    newsletter.subject,
-                    newsletter.body,
-                    "noreply@modernclassics.com",
-                    [subscriber_email],
-                )
-            )
-
-        try:
-            with transaction.atomic():
-                # Send emails
-                send_mass_mail(emails, fail_silently=False)
-
-                # Mark newsletter as sent
-                newsletter.status = "sent"
-                newsletter.sent_at = timezone.now()
-                newsletter.recipient_count = subscribers.count()
-                newsletter.save()
-
-            messages.success(
-                request,
-                f"Newsletter sent to {subscribers.count()} subscriber(s)."
-            )
-        except Exception as e:
-            messages.error(
-                request,
-                f"Error sending newsletter: {str(e)}"
-            )
-
+        # The send_newsletters worker does the sending in batches
+        recipient_count = start_campaign(newsletter)
+        messages.success(
+            request,
+            f"Sending newsletter to {recipient_count} subscriber(s); "
+            "progress is shown below."
+        )
         return redirect("common:newsletter_email_list")
 
 
 # FAQ list view
 
 
-class FAQListView(ListView):
+class FAQListView(CachedAnonymousPageMixin, ListView):
+    cache_namespaces = ("faq",)
     model = FAQ
     template_name = "common/faq_list.html"
     context_object_name = "faqs"
@@ -247,7 +251,7 @@ class FAQDeleteView(DeleteView):
 
 
 def robots_txt(request):
-    sitemap_url = request.build_absolute_uri("/sitemap.xml")
+    sitemap_url = request.build_absolute_uri(reverse("sitemap_index"))
     lines = [
         "User-agent: *",
         "Disallow: /admin/",
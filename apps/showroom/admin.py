@@ -4,7 +4,7 @@ Registers models and customizes list displays, filters,
 and management actions."""
 
 from django.contrib import admin
-from .models import CarMake, CarModel, Car
+from .models import CarMake, CarModel, Car, ImageUpload
 
 
 @admin.register(CarMake)
@@ -22,8 +22,24 @@ class CarModelAdmin(admin.ModelAdmin):
 
 @admin.register(Car)
 class CarAdmin(admin.ModelAdmin):
-    list_display = ("__str__", "year", "price", "condition")
+    list_display = ("__str__", "year", "price", "condition", "image_status")
     list_filter = ("condition", "year", "make")
     search_fields = ("make__name", "model__name", "specifications")
     prepopulated_fields = {"slug": ("make", "model", "year")}
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = ("created_at", "updated_at", "image_status")
+
+
+@admin.register(ImageUpload)
+class ImageUploadAdmin(admin.ModelAdmin):
+    list_display = (
+        "car", "original_name", "status", "attempts", "available_at",
+        "processed_at")
+    list_filter = ("status",)
+    search_fields = ("car__slug", "original_name")
+    readonly_fields = (
+        "car", "staged_name", "original_name", "attempts", "locked_until",
+        "created_at", "processed_at", "last_error")
+
+    def get_queryset(self, request):
+        # Staged photos are megabytes each; the admin never shows them.
+        return super().get_queryset(request).defer("data")
@@ -10,3 +10,6 @@ class ShowroomConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.showroom"
     verbose_name = "Car Showroom"
+
+    def ready(self):
+        from . import signals  # noqa: F401
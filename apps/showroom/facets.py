@@ -0,0 +1,164 @@
+"""Facet counts for the showroom app.
+
+Maintains the CarFacetCount table from Car writes and reads it back as
+the per-filter counts shown on the showroom page."""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+# Fields whose values decide which facet rows a car is counted under.
+FACET_SOURCE_FIELDS = frozenset(
+    {"make", "model", "condition", "year", "is_sold"})
+
+
+def decade_of(year):
+    return year // 10 * 10
+
+
+def snapshot(car):
+    """The facet-relevant state of ``car``, comparable between saves."""
+    return (car.make_id, car.model_id, car.condition,
+            decade_of(car.year), car.is_sold)
+
+
+def _facet_values(state):
+    make_id, model_id, condition, decade, _ = state
+    return [
+        ("make", str(make_id)),
+        ("model", str(model_id)),
+        ("condition", condition),
+        ("decade", str(decade)),
+    ]
+
+
+def _facet_rows(car):
+    """Return ``(facet, value, parent_value, label)`` rows for ``car``."""
+    decade = decade_of(car.year)
+    return [
+        ("make", str(car.make_id), "", car.make.name),
+        ("model", str(car.model_id), str(car.make_id),
+         f"{car.make.name} {car.model.name}"),
+        ("condition", car.condition, "", car.get_condition_display()),
+        ("decade", str(decade), "", f"{decade}s"),
+    ]
+
+
+def add_car(car):
+    """Count ``car`` under each of its facet values."""
+    from .models import CarFacetCount
+
+    for facet, value, parent_value, label in _facet_rows(car):
+        rows = CarFacetCount.objects.filter(
+            facet=facet, value=value, is_sold=car.is_sold)
+        if rows.update(count=F("count") + 1, label=label):
+            continue
+        try:
+            with transaction.atomic():
+                CarFacetCount.objects.create(
+                    facet=facet, value=value, parent_value=parent_value,
+                    label=label, is_sold=car.is_sold, count=1)
+        except IntegrityError:
+            # Another writer created the row first; add to theirs.
+            rows.update(count=F("count") + 1)
+
+
+def remove_state(state):
+    """Uncount a car previously recorded with ``snapshot()`` ``state``.
+
+    Only ids are needed, so this is safe while related rows are being
+    deleted in a cascade.
+    """
+    from .models import CarFacetCount
+
+    is_sold = state[-1]
+    for facet, value in _facet_values(state):
+        CarFacetCount.objects.filter(
+            facet=facet, value=value, is_sold=is_sold, count__gt=0
+        ).update(count=F("count") - 1)
+
+
+def refresh_labels(make=None, model=None):
+    """Rewrite stored labels after a make or model is renamed."""
+    from .models import CarFacetCount, CarModel
+
+    if make is not None:
+        CarFacetCount.objects.filter(
+            facet="make", value=str(make.pk)).update(label=make.name)
+        models = CarModel.objects.filter(make=make)
+    else:
+        models = [model]
+    for car_model in models:
+        CarFacetCount.objects.filter(
+            facet="model", value=str(car_model.pk)
+        ).update(label=f"{car_model.make.name} {car_model.name}")
+
+
+def rebuild_facets(car_model=None, facet_model=None):
+    """Recompute every facet row from the Car table.
+
+    Used for backfills and after bulk writes that bypass model signals.
+    Migrations pass their historical models in.
+    """
+    if car_model is None or facet_model is None:
+        from .models import Car as car_model, CarFacetCount as facet_model
+
+    conditions = dict(car_model._meta.get_field("condition").choices)
+    grouped = (
+        car_model.objects.values(
+            "make_id", "make__name", "model_id", "model__name",
+            "condition", "year", "is_sold")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    totals = {}
+    for row in grouped:
+        decade = decade_of(row["year"])
+        keys = [
+            ("make", str(row["make_id"]), "", row["make__name"]),
+            ("model", str(row["model_id"]), str(row["make_id"]),
+             f"{row['make__name']} {row['model__name']}"),
+            ("condition", row["condition"], "",
+             conditions.get(row["condition"], row["condition"])),
+            ("decade", str(decade), "", f"{decade}s"),
+        ]
+        for facet, value, parent_value, label in keys:
+            key = (facet, value, row["is_sold"])
+            if key in totals:
+                totals[key].count += row["total"]
+            else:
+                totals[key] = facet_model(
+                    facet=facet, value=value, parent_value=parent_value,
+                    label=label, is_sold=row["is_sold"], count=row["total"])
+
+    with transaction.atomic():
+        facet_model.objects.all().delete()
+        facet_model.objects.bulk_create(totals.values(), batch_size=500)
+
+
+def get_facet_counts():
+    """Return facet counts keyed by facet name, read with one query.
+
+    Each entry is a dict with ``value``, ``parent_value``, ``label``,
+    ``available``, ``sold`` and ``total`` keys.
+    """
+    from .models import CarFacetCount
+
+    merged = {}
+    for row in CarFacetCount.objects.filter(count__gt=0).values(
+            "facet", "value", "parent_value", "label", "is_sold", "count"):
+        entry = merged.setdefault((row["facet"], row["value"]), {
+            "value": row["value"],
+            "parent_value": row["parent_value"],
+            "label": row["label"],
+            "available": 0,
+            "sold": 0,
+        })
+        entry["sold" if row["is_sold"] else "available"] += row["count"]
+
+    facets = {facet: [] for facet, _ in CarFacetCount.FACET_CHOICES}
+    for (facet, _), entry in merged.items():
+        entry["total"] = entry["available"] + entry["sold"]
+        facets[facet].append(entry)
+    for entries in facets.values():
+        entries.sort(key=lambda entry: entry["label"])
+    return facets
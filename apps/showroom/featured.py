@@ -0,0 +1,82 @@
+"""Featured-inventory snapshot for the home page carousel.
+
+The newest unsold cars are materialised as plain dicts (names, links and
+image URLs already resolved) and cached under the ``home`` and
+``catalog`` generations, so a warm carousel renders without queries."""
+
+from django.core.cache import cache
+from django.templatetags.static import static
+
+from apps.common.caching import versioned_key
+
+FEATURED_LIMIT = 10
+
+# Seconds a snapshot may live without a bump; generations do the real work.
+FEATURED_TIMEOUT = 60 * 60
+
+FEATURED_NAMESPACES = ("home", "catalog")
+
+# Matches the transformation the hero template used to request.
+FEATURED_IMAGE_OPTIONS = {
+    "width": 1600,
+    "height": 540,
+    "crop": "fill",
+    "gravity": "auto",
+    "quality": "auto",
+    "fetch_format": "auto",
+    "dpr": "auto",
+    "secure": True,
+}
+
+# Car fields shown in the carousel; writes touching only others skip it.
+FEATURED_SOURCE_FIELDS = frozenset(
+    {"make", "model", "year", "image", "image_color", "image_placeholder",
+     "is_sold", "slug", "created_at"})
+
+
+def featured_queryset():
+    from .models import Car
+
+    return (
+        Car.objects
+        .filter(is_sold=False)
+        .exclude(image="placeholder")
+        .order_by("-created_at")
+    )
+
+
+def image_url(image):
+    if not image:
+        return static("images/placeholder-car.svg")
+    return image.build_url(**FEATURED_IMAGE_OPTIONS)
+
+
+def build_featured_snapshot(limit=FEATURED_LIMIT):
+    """Read the featured cars in one query and flatten them for caching."""
+    cars = (
+        featured_queryset()
+        .select_related("make", "model")
+        .only(
+            "slug", "year", "image", "image_color", "image_placeholder",
+            "make__name", "model__name")
+    )[:limit]
+    return [
+        {
+            "title": f"{car.make.name} {car.model.name} ({car.year})",
+            "url": car.get_absolute_url(),
+            "image_url": image_url(car.image),
+            "color": car.image_color,
+            "placeholder": car.image_placeholder,
+        }
+        for car in cars
+    ]
+
+
+def get_featured_cars():
+    """Return the cached snapshot, rebuilding it after a generation bump."""
+    key = versioned_key("featured", FEATURED_NAMESPACES)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_featured_snapshot()
+        cache.set(key, snapshot, FEATURED_TIMEOUT)
+    return snapshot
@@ -3,8 +3,11 @@
 Defines validation rules and form field behavior for user-submitted data."""
 
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Submit
+from .image_uploads import stage_upload
 from .models import CarMake, CarModel, Car
 
 
@@ -46,3 +49,16 @@ class CarForm(forms.ModelForm):
         self.helper = FormHelper()
         self.helper.form_method = "post"
         self.helper.add_input(Submit("save", "Save Car"))
+
+    def save(self, commit=True):
+        """Save the car, queueing a newly chosen photo for the upload
+        worker instead of sending it to Cloudinary in this request."""
+        upload = self.cleaned_data.get("image")
+        if not commit or not isinstance(upload, UploadedFile):
+            return super().save(commit)
+        # The current photo stays until the worker swaps the new one in.
+        self.instance.image = self.initial.get("image")
+        with transaction.atomic():
+            car = super().save()
+            stage_upload(car, upload)
+        return car
@@ -0,0 +1,189 @@
+"""Background upload pipeline for car photos.
+
+``CarForm`` no longer sends a new photo to Cloudinary inside the request.
+``stage_upload()`` marks the car ``pending`` and queues an
+``ImageUpload`` row holding the file and its metadata, so the worker
+needn't share a disk with the web process (Heroku dynos don't). The
+``process_image_uploads`` worker claims due rows under a lease, hands
+each file to the configured uploader (which also asks for the showroom's
+renditions up front), then swaps the result and its metadata onto the
+car together and empties the row's copy of the file. Failures are
+retried with backoff until ``MAX_ATTEMPTS``, after which the car is
+marked ``failed`` and keeps its previous photo and metadata.
+
+The uploader is a dotted path in ``IMAGE_UPLOADER``: a callable taking
+``(file, name)`` and returning a value for ``Car.image``.
+``LocalUploader`` stands in for Cloudinary in development and tests."""
+
+import logging
+import os
+import uuid
+
+import cloudinary.uploader
+from cloudinary import CloudinaryResource
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from apps.common.images import transformation
+from apps.common.leased_queue import LeasedQueue
+
+from .image_metadata import METADATA_FIELDS, apply_metadata
+from .models import Car, ImageUpload
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10
+
+# Large photos on a slow link can take a while; the lease must cover it.
+LEASE_SECONDS = 600
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 30 * 60
+
+queue = LeasedQueue(
+    ImageUpload, claimed=ImageUpload.Status.PROCESSING,
+    batch_size=BATCH_SIZE, lease_seconds=LEASE_SECONDS,
+    max_attempts=MAX_ATTEMPTS, retry_base_seconds=RETRY_BASE_SECONDS,
+    retry_max_seconds=RETRY_MAX_SECONDS, select_related=["car"])
+claim_batch = queue.claim
+
+# Renditions built at upload time: the grid cards and the detail page.
+EAGER_RENDITIONS = (
+    (320, "16:9"), (480, "16:9"), (640, "16:9"), (960, "16:9"),
+    (960, None), (1600, None),
+)
+
+
+def get_uploader():
+    return import_string(settings.IMAGE_UPLOADER)()
+
+
+class CloudinaryUploader:
+    """Upload to Cloudinary, asking it to pre-build the renditions pages
+    request so the first visitor doesn't wait for them."""
+
+    def __call__(self, file, name):
+        eager = []
+        for width, aspect in EAGER_RENDITIONS:
+            options = transformation(width, aspect)
+            options.pop("secure")
+            eager.append(options)
+        return cloudinary.uploader.upload_resource(
+            file, type="upload", resource_type="image",
+            eager=eager, eager_async=True)
+
+
+class LocalUploader:
+    """Keep "uploaded" files in ``MEDIA_ROOT``; for development and tests.
+    """
+
+    def __init__(self, storage=None):
+        self.storage = storage or FileSystemStorage(
+            location=os.path.join(settings.MEDIA_ROOT, "uploads"))
+
+    def __call__(self, file, name):
+        saved = self.storage.save(name, file)
+        public_id, extension = os.path.splitext(saved)
+        return CloudinaryResource(
+            f"uploads/{public_id}", format=extension.lstrip(".") or None,
+            type="upload", resource_type="image")
+
+
+def stage_upload(car, upload):
+    """Queue ``upload`` as ``car``'s new photo; ``car`` must be saved.
+
+    Call inside the transaction that saves the car: the queue row then
+    commits (or not) with it.
+    """
+    _, extension = os.path.splitext(upload.name)
+    staged = ImageUpload(
+        car=car, original_name=upload.name,
+        staged_name=f"cars/{car.pk}/{uuid.uuid4().hex}{extension.lower()}")
+    # The car keeps its current photo's metadata until the worker swaps
+    # the new one in. Metadata first: it rewinds the file.
+    apply_metadata(staged, upload)
+    staged.data = b"".join(upload.chunks())
+    staged.save()
+    car.image_status = Car.ImageStatus.PENDING
+    car.save(update_fields=["image_status"])
+    return staged
+
+
+def _finish(upload, status, car_status=None):
+    upload.status = status
+    upload.processed_at = timezone.now()
+    upload.locked_until = None
+    upload.data = b""
+    upload.save(update_fields=[
+        "status", "processed_at", "locked_until", "last_error", "data"])
+    if car_status is not None:
+        Car.objects.filter(pk=upload.car_id).update(image_status=car_status)
+
+
+def _record_failure(upload, err):
+    logger.warning(
+        "Image upload %s for car %s failed on attempt %s: %s",
+        upload.pk, upload.car_id, upload.attempts, err)
+    if queue.record_failure(upload, err):
+        with transaction.atomic():
+            _finish(upload, ImageUpload.Status.FAILED, Car.ImageStatus.FAILED)
+
+
+def _is_latest(upload):
+    return not ImageUpload.objects.filter(
+        car_id=upload.car_id, pk__gt=upload.pk).exists()
+
+
+def process_upload(upload, uploader=None):
+    """Upload one claimed file and put it on its car; returns success."""
+    uploader = uploader or get_uploader()
+    upload.last_error = ""
+    if not _is_latest(upload):
+        # A newer photo was staged while this one waited.
+        with transaction.atomic():
+            _finish(upload, ImageUpload.Status.SUPERSEDED)
+        return True
+
+    try:
+        if not upload.data:
+            raise FileNotFoundError("the staged file is missing")
+        name = os.path.basename(upload.staged_name)
+        image = uploader(ContentFile(bytes(upload.data), name=name), name)
+    except Exception as err:
+        _record_failure(upload, err)
+        return False
+
+    with transaction.atomic():
+        car = Car.objects.select_for_update().filter(
+            pk=upload.car_id).first()
+        if car is None:
+            # The car (and with it this row) was deleted meanwhile.
+            return True
+        if _is_latest(upload):
+            car.image = image
+            for name in METADATA_FIELDS:
+                setattr(car, name, getattr(upload, name))
+            car.image_status = Car.ImageStatus.READY
+            # A full save runs the signals that refresh cached pages.
+            car.save()
+            _finish(upload, ImageUpload.Status.DONE)
+        else:
+            _finish(upload, ImageUpload.Status.SUPERSEDED)
+    return True
+
+
+def process_pending(limit=BATCH_SIZE, uploader=None):
+    """Claim and upload one batch; returns ``(done, failed)``."""
+    uploader = uploader or get_uploader()
+    done = failed = 0
+    for upload in claim_batch(limit):
+        if process_upload(upload, uploader):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
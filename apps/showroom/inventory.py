@@ -0,0 +1,260 @@
+"""Bulk inventory import for the showroom.
+
+``InventoryImporter`` reads a CSV, JSON Lines or JSON feed of cars a row
+at a time and writes it in batches, one transaction per batch:
+
+* makes and models are resolved once per name and kept in memory, with
+  any new ones created in bulk;
+* generated slugs are reserved for the whole batch with one
+  ``allocate_slugs()`` call, so no per-row lookups are needed;
+* rows whose ``slug`` matches an existing car update it, and the rest
+  are inserted, with ``bulk_update``/``bulk_create``.
+
+Bulk writes skip the model signals, so ``finish()`` rebuilds the facet
+counts and bumps the cached pages once at the end."""
+
+import csv
+import itertools
+import json
+import time
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from apps.common.caching import bump_generation, bump_on_commit
+
+from .facets import rebuild_facets
+from .models import Car, CarMake, CarModel
+from .search import build_search_text
+from .slugs import allocate_slugs, base_slug
+
+BATCH_SIZE = 1000
+
+FORMATS = ("csv", "jsonl", "json")
+
+REQUIRED_FIELDS = ("make", "model", "year", "condition", "price")
+
+# Car fields an import may set on an existing car.
+UPDATE_FIELDS = [
+    "make", "model", "year", "specifications", "performance", "condition",
+    "price", "is_sold", "search_title", "search_document", "updated_at",
+]
+
+TRUE_VALUES = {"1", "true", "yes", "y", "sold"}
+
+
+class InventoryRowError(ValueError):
+    """A feed row that can't be imported; ``line`` is its position."""
+
+    def __init__(self, line, message):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+def format_for(path):
+    """Guess the feed format from a file name."""
+    name = str(path).lower()
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".json"):
+        return "json"
+    return "csv"
+
+
+def read_feed(stream, format):
+    """Yield ``(line, row dict)`` from an open text stream.
+
+    CSV and JSON Lines are read incrementally; a JSON document has to be
+    parsed whole, so prefer JSON Lines for large feeds.
+    """
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif format == "jsonl":
+        for line, text in enumerate(stream, start=1):
+            if text.strip():
+                yield line, json.loads(text)
+    elif format == "json":
+        for line, row in enumerate(json.load(stream), start=1):
+            yield line, row
+    else:
+        raise ValueError(f"Unknown feed format {format!r}.")
+
+
+def _text(row, name):
+    value = row.get(name)
+    return "" if value is None else str(value).strip()
+
+
+def clean_row(line, row):
+    """Validate one raw row and convert its values."""
+    if not isinstance(row, dict):
+        raise InventoryRowError(line, "expected an object")
+    missing = [name for name in REQUIRED_FIELDS if not _text(row, name)]
+    if missing:
+        raise InventoryRowError(line, f"missing {', '.join(missing)}")
+    condition = _text(row, "condition").lower()
+    if condition not in dict(Car.CONDITION_CHOICES):
+        raise InventoryRowError(line, f"unknown condition {condition!r}")
+    try:
+        year = int(_text(row, "year"))
+        price = int(float(_text(row, "price")))
+    except ValueError:
+        raise InventoryRowError(line, "year and price must be numbers")
+    if price < 0:
+        raise InventoryRowError(line, "price can't be negative")
+    is_sold = row.get("is_sold")
+    if not isinstance(is_sold, bool):
+        is_sold = _text(row, "is_sold").lower() in TRUE_VALUES
+    return {
+        "make": _text(row, "make")[:100],
+        "model": _text(row, "model")[:100],
+        "year": year,
+        "specifications": _text(row, "specifications"),
+        "performance": _text(row, "performance")[:255],
+        "condition": condition,
+        "price": price,
+        "is_sold": is_sold,
+        "slug": slugify(_text(row, "slug"))[:150],
+        "image": _text(row, "image"),
+    }
+
+
+class InventoryImporter:
+    """Import cleaned rows in batches; see the module docstring."""
+
+    def __init__(self, batch_size=BATCH_SIZE, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress
+        self.makes = {}
+        self.models = {}
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+        self.started = time.monotonic()
+
+    @property
+    def processed(self):
+        return self.created + self.updated + len(self.errors)
+
+    def run(self, rows, strict=False):
+        """Import ``(line, raw row)`` pairs, then ``finish()``."""
+        try:
+            for chunk in itertools.batched(rows, self.batch_size):
+                cleaned = []
+                for line, row in chunk:
+                    try:
+                        cleaned.append(clean_row(line, row))
+                    except InventoryRowError as err:
+                        if strict:
+                            raise
+                        self.errors.append(err)
+                if cleaned:
+                    self.write_batch(cleaned)
+                if self.progress:
+                    self.progress(self)
+        finally:
+            # Batches committed before a failure still count.
+            self.finish()
+        return self
+
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.processed / elapsed if elapsed else 0.0
+
+    def resolve_makes(self, names):
+        missing = set(names) - self.makes.keys()
+        if not missing:
+            return
+        CarMake.objects.bulk_create(
+            [CarMake(name=name) for name in missing], ignore_conflicts=True)
+        for make in CarMake.objects.filter(name__in=missing):
+            self.makes[make.name] = make
+
+    def resolve_models(self, pairs):
+        missing = {
+            (self.makes[make].pk, name) for make, name in pairs
+        } - self.models.keys()
+        if not missing:
+            return
+        CarModel.objects.bulk_create(
+            [CarModel(make_id=make_id, name=name)
+             for make_id, name in missing],
+            ignore_conflicts=True)
+        make_ids = {make_id for make_id, _ in missing}
+        names = {name for _, name in missing}
+        for model in CarModel.objects.filter(
+                make_id__in=make_ids, name__in=names):
+            self.models[(model.make_id, model.name)] = model
+
+    def write_batch(self, rows):
+        with transaction.atomic():
+            self.resolve_makes({row["make"] for row in rows})
+            self.resolve_models({(row["make"], row["model"]) for row in rows})
+            given = [row["slug"] for row in rows if row["slug"]]
+            existing = (
+                Car.objects.in_bulk(given, field_name="slug")
+                if given else {})
+            now = timezone.now()
+            new, changed = [], []
+            for row in rows:
+                car = existing.get(row["slug"])
+                if car is None:
+                    car = Car()
+                    new.append(car)
+                else:
+                    changed.append(car)
+                self._fill(car, row, now)
+            self._assign_slugs(new)
+            Car.objects.bulk_create(new, batch_size=self.batch_size)
+            update_fields = UPDATE_FIELDS
+            if any(row["image"] for row in rows if row["slug"] in existing):
+                update_fields = [*UPDATE_FIELDS, "image"]
+            if changed:
+                Car.objects.bulk_update(
+                    changed, update_fields, batch_size=self.batch_size)
+                bump_on_commit(*(f"car:{car.slug}" for car in changed))
+        self.created += len(new)
+        self.updated += len(changed)
+
+    def _fill(self, car, row, now):
+        make = self.makes[row["make"]]
+        model = self.models[(make.pk, row["model"])]
+        car.make = make
+        car.model = model
+        for name in ("year", "specifications", "performance", "condition",
+                     "price", "is_sold"):
+            setattr(car, name, row[name])
+        if row["image"]:
+            car.image = row["image"]
+        car.search_title, car.search_document = build_search_text(
+            make.name, model.name, car.year, car.performance,
+            car.specifications)
+        car.updated_at = now
+        if car.pk is None:
+            car.slug = row["slug"]
+
+    def _assign_slugs(self, cars):
+        # A given slug that matched no car is kept unless an earlier row in
+        # the batch took it; the rest are numbered by the counters, which
+        # must skip the kept ones as they aren't in the table yet.
+        used = set()
+        pending = []
+        for car in cars:
+            if car.slug and car.slug not in used:
+                used.add(car.slug)
+            else:
+                pending.append(car)
+        slugs = allocate_slugs([
+            base_slug(car.make.name, car.model.name, car.year)
+            for car in pending], reserved=used)
+        for car, slug in zip(pending, slugs):
+            car.slug = slug
+
+    def finish(self):
+        """Bring the derived data the signals would have maintained up to
+        date."""
+        rebuild_facets()
+        bump_generation("showroom", "home", "sitemap", "catalog")
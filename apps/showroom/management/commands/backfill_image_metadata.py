@@ -0,0 +1,90 @@
+"""Management command that fills in image metadata for existing cars.
+
+New uploads get their size, colour and preview when saved; this command
+downloads the stored image of every car still missing them, a batch at
+a time in primary-key order. Each batch is written before the next is
+fetched, and only cars without metadata are selected, so an interrupted
+run simply picks up where it stopped (``--after`` skips ahead)."""
+
+import requests
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.common.caching import bump_on_commit
+from apps.showroom.image_metadata import (
+    METADATA_FIELDS, extract_metadata, fetch_image,
+)
+from apps.showroom.models import Car
+
+
+def missing_metadata():
+    return (
+        Car.objects.filter(image_width__isnull=True)
+        .exclude(image__isnull=True)
+        .exclude(image__in=["", "placeholder"])
+        .order_by("pk")
+    )
+
+
+class Command(BaseCommand):
+    help = "Record image size, colour and preview for cars missing them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=50,
+            help="Cars fetched and saved per batch.")
+        parser.add_argument(
+            "--after", type=int, default=0,
+            help="Only cars with a primary key above this.")
+        parser.add_argument(
+            "--limit", type=int, default=None,
+            help="Stop after this many cars.")
+
+    def handle(self, *args, **options):
+        after = options["after"]
+        remaining = options["limit"]
+        done = failed = 0
+        session = requests.Session()
+        try:
+            while remaining is None or remaining > 0:
+                size = options["batch_size"]
+                if remaining is not None:
+                    size = min(size, remaining)
+                batch = list(
+                    missing_metadata().filter(pk__gt=after)
+                    .only("pk", "slug", "image")[:size])
+                if not batch:
+                    break
+                updated, errors = self.process(batch, session)
+                done += updated
+                failed += errors
+                after = batch[-1].pk
+                if remaining is not None:
+                    remaining -= len(batch)
+                self.stdout.write(
+                    f"Up to car {after}: {done} updated, {failed} failed.")
+        finally:
+            session.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled {done} cars ({failed} failed)."))
+
+    def process(self, batch, session):
+        updated = []
+        for car in batch:
+            try:
+                metadata = extract_metadata(
+                    fetch_image(car.image.build_url(secure=True), session))
+            except Exception as err:
+                self.stderr.write(f"Car {car.pk}: {err}")
+                continue
+            for name, value in metadata.items():
+                setattr(car, name, value)
+            updated.append(car)
+        if updated:
+            with transaction.atomic():
+                # bulk_update skips the signals, so bump the pages here.
+                Car.objects.bulk_update(updated, METADATA_FIELDS)
+                bump_on_commit(
+                    "showroom", "home",
+                    *(f"car:{car.slug}" for car in updated))
+        return len(updated), len(batch) - len(updated)
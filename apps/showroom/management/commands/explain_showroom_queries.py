@@ -0,0 +1,139 @@
+"""Management command that checks the showroom query plans.
+
+Runs EXPLAIN on each canonical CarListView/HomeView query and fails when
+one of them falls back to a sequential scan of the car table."""
+
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+
+from apps.showroom.featured import FEATURED_LIMIT, featured_queryset
+from apps.showroom.models import Car, CarMake, CarModel
+from apps.showroom.views import CarListView
+
+# Postgres reports "Seq Scan on showroom_car"; SQLite reports a bare
+# "SCAN showroom_car" when no index is used for the table.
+SEQ_SCAN_PATTERNS = {
+    "postgresql": re.compile(r"Seq Scan on showroom_car\b"),
+    "sqlite": re.compile(r"\bSCAN showroom_car\b(?! USING)"),
+}
+
+PAGE_SIZE = CarListView.paginate_by
+
+
+def find_sequential_scan(plan, vendor):
+    """Return the offending plan line, or ``None`` if the plan is clean."""
+    pattern = SEQ_SCAN_PATTERNS.get(vendor)
+    if pattern is None:
+        return None
+    for line in plan.splitlines():
+        if pattern.search(line):
+            return line.strip()
+    return None
+
+
+def canonical_queries():
+    """Yield ``(label, queryset)`` for the query shapes the site serves."""
+    car = Car.objects.order_by("pk").first()
+    if car is None:
+        raise CommandError(
+            "No cars to explain against; re-run with --seed N.")
+
+    factory = RequestFactory()
+    list_params = [
+        ("list: newest", {}),
+        ("list: price low-high", {"sort": "price_asc"}),
+        ("list: price high-low", {"sort": "price_desc"}),
+        ("list: make", {"make": car.make_id}),
+        ("list: make + model", {"make": car.make_id, "model": car.model_id}),
+        ("list: year range", {
+            "year_from": car.year - 5, "year_to": car.year + 5}),
+        ("list: condition", {"condition": car.condition}),
+    ]
+    for label, params in list_params:
+        view = CarListView()
+        view.setup(factory.get("/showroom/", params))
+        yield label, view.get_queryset()[:PAGE_SIZE]
+
+    yield "home: featured cars", featured_queryset()[:FEATURED_LIMIT]
+
+
+def seed_cars(count, stdout):
+    makes = CarMake.objects.bulk_create(
+        [CarMake(name=f"Seed Make {i}") for i in range(20)])
+    models_ = CarModel.objects.bulk_create([
+        CarModel(make=make, name=f"Seed Model {j}")
+        for make in makes for j in range(10)
+    ])
+    conditions = [code for code, _ in Car.CONDITION_CHOICES]
+    batch = []
+    for i in range(count):
+        model = models_[i % len(models_)]
+        batch.append(Car(
+            make_id=model.make_id, model=model,
+            year=1950 + i % 70,
+            specifications="Seeded for query plan checks",
+            performance="n/a",
+            condition=conditions[i % len(conditions)],
+            price=1000 + (i * 7919) % 250000,
+            slug=f"explain-seed-{i}",
+            is_sold=i % 4 == 0,
+            image=f"seed/{i}",
+        ))
+        if len(batch) == 5000:
+            Car.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Car.objects.bulk_create(batch)
+    stdout.write(f"Seeded {count} cars.")
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the canonical showroom queries and fail if any of them "
+        "sequentially scans the car table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help=(
+                "Insert this many synthetic cars first. They are rolled "
+                "back when the command finishes."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            try:
+                self._explain_all(options["seed"], options["verbosity"])
+            finally:
+                transaction.set_rollback(True)
+
+    def _explain_all(self, seed, verbosity):
+        vendor = connection.vendor
+        if seed:
+            seed_cars(seed, self.stdout)
+            # Fresh statistics so the planner sees the seeded volume.
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "ANALYZE showroom_car" if vendor == "postgresql"
+                    else "ANALYZE")
+
+        failures = []
+        for label, queryset in canonical_queries():
+            plan = queryset.explain()
+            offending = find_sequential_scan(plan, vendor)
+            if offending:
+                failures.append(f"{label}: {offending}")
+                self.stdout.write(self.style.ERROR(f"SEQ SCAN  {label}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok        {label}"))
+            if verbosity > 1:
+                self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(
+                "Sequential scans found:\n" + "\n".join(failures))
@@ -0,0 +1,78 @@
+"""Management command that bulk-imports makes, models and cars.
+
+Reads a CSV, JSON Lines or JSON feed (from a file, or ``-`` for stdin)
+with one car per row: ``make``, ``model``, ``year``, ``condition`` and
+``price`` are required; ``specifications``, ``performance``,
+``is_sold``, ``image`` (a Cloudinary public id) and ``slug`` are
+optional. A row whose ``slug`` matches an existing car updates it. Rows
+that fail validation are reported and skipped unless ``--strict``."""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from apps.showroom.inventory import (
+    BATCH_SIZE, FORMATS, InventoryImporter, InventoryRowError, format_for,
+    read_feed,
+)
+
+# Skipped rows listed individually before the report is summarised.
+MAX_REPORTED_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = "Import cars (creating makes and models) from a CSV/JSON feed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Feed file, or - for stdin.")
+        parser.add_argument(
+            "--format", choices=FORMATS, default=None,
+            help="Feed format (default: from the file extension).")
+        parser.add_argument(
+            "--batch-size", type=int, default=BATCH_SIZE,
+            help="Rows written per transaction.")
+        parser.add_argument(
+            "--strict", action="store_true",
+            help="Stop at the first invalid row.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        feed_format = options["format"] or format_for(path)
+        importer = InventoryImporter(
+            batch_size=options["batch_size"], progress=self.report)
+        try:
+            if path == "-":
+                rows = read_feed(sys.stdin, feed_format)
+                importer.run(rows, strict=options["strict"])
+            else:
+                with open(path, newline="", encoding="utf-8-sig") as stream:
+                    rows = read_feed(stream, feed_format)
+                    importer.run(rows, strict=options["strict"])
+        except OSError as err:
+            raise CommandError(f"Can't read {path}: {err}")
+        except (InventoryRowError, ValueError) as err:
+            raise CommandError(
+                f"Import stopped at {err} after {importer.created} created"
+                f" and {importer.updated} updated.")
+        except DatabaseError as err:
+            raise CommandError(
+                f"Import stopped by a database error ({err}) after "
+                f"{importer.created} created and {importer.updated} updated;"
+                " the batch in progress was rolled back.")
+
+        for err in importer.errors[:MAX_REPORTED_ERRORS]:
+            self.stderr.write(f"Skipped {err}")
+        if len(importer.errors) > MAX_REPORTED_ERRORS:
+            self.stderr.write(
+                f"... and {len(importer.errors) - MAX_REPORTED_ERRORS} more.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.created} new and {importer.updated} updated"
+            f" cars, skipped {len(importer.errors)}, at "
+            f"{importer.rate():,.0f} rows/s."))
+
+    def report(self, importer):
+        self.stdout.write(
+            f"{importer.processed} rows: {importer.created} created, "
+            f"{importer.updated} updated, {len(importer.errors)} skipped "
+            f"({importer.rate():,.0f} rows/s)")
@@ -0,0 +1,29 @@
+"""Management command that uploads staged car photos.
+
+Run it as a worker process (see the Procfile). It claims due uploads in
+batches, sends them through ``IMAGE_UPLOADER`` and sleeps briefly when
+nothing is waiting. Use ``--once`` to process a single batch."""
+
+from apps.common.leased_queue import QueueWorkerCommand
+from apps.showroom.image_uploads import (
+    BATCH_SIZE, get_uploader, process_pending,
+)
+
+
+class Command(QueueWorkerCommand):
+    help = "Upload staged car photos and attach them to their cars."
+    batch_size = BATCH_SIZE
+    idle_sleep = 2.0
+    items = "Uploads"
+
+    def handle(self, *args, **options):
+        self.uploader = get_uploader()
+        super().handle(*args, **options)
+
+    def process_batch(self, batch_size):
+        return process_pending(batch_size, self.uploader)
+
+    def report(self, done, failed, elapsed):
+        self.stdout.write(
+            f"Uploaded {done} image(s), {failed} failed, "
+            f"in {elapsed:.2f}s.")
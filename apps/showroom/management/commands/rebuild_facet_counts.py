@@ -0,0 +1,18 @@
+"""Management command that recomputes the showroom facet counts.
+
+Signals keep the counts current for ordinary saves; run this after bulk
+writes (imports, raw SQL, ``QuerySet.update``) that bypass them."""
+
+from django.core.management.base import BaseCommand
+
+from apps.showroom.facets import rebuild_facets
+from apps.showroom.models import CarFacetCount
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed showroom facet counts from the car table."
+
+    def handle(self, *args, **options):
+        rebuild_facets()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {CarFacetCount.objects.count()} facet counts."))
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.2 on 2026-10-18 10:33
+
+from django.db import migrations, models
+
+from apps.showroom.search import build_search_fields
+
+
+def populate_search_fields(apps, schema_editor):
+    Car = apps.get_model("showroom", "Car")
+    cars = list(Car.objects.select_related("make", "model"))
+    for car in cars:
+        car.search_title, car.search_document = build_search_fields(car)
+    Car.objects.bulk_update(
+        cars, ["search_title", "search_document"], batch_size=500)
+
+
+def create_trigram_index(apps, schema_editor):
+    # pg_trgm lets Postgres answer LIKE '%term%' from a GIN index;
+    # other backends fall back to scanning the single search column.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS showroom_car_search_trgm "
+        "ON showroom_car USING gin (search_document gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS showroom_car_search_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('showroom', '0003_alter_car_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='car',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='car',
+            name='search_title',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(
+            populate_search_fields, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.2 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+from apps.showroom.facets import rebuild_facets
+
+
+def populate_facet_counts(apps, schema_editor):
+    rebuild_facets(
+        apps.get_model("showroom", "Car"),
+        apps.get_model("showroom", "CarFacetCount"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('showroom', '0005_car_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CarFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('make', 'Make'), ('model', 'Model'), ('condition', 'Condition'), ('decade', 'Decade')], max_length=20)),
+                ('value', models.CharField(max_length=50)),
+                ('parent_value', models.CharField(blank=True, max_length=50)),
+                ('label', models.CharField(max_length=255)),
+                ('is_sold', models.BooleanField(default=False)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('facet', 'label'),
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value', 'is_sold'), name='unique_car_facet_value')],
+            },
+        ),
+        migrations.RunPython(
+            populate_facet_counts, migrations.RunPython.noop),
+    ]
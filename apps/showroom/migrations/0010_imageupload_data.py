@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-18 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('showroom', '0009_slug_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageupload',
+            name='data',
+            field=models.BinaryField(default=b''),
+        ),
+    ]
@@ -2,12 +2,17 @@
 
 Declares persisted entities, relationships, and model-level business rules."""
 
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.core.validators import MinValueValidator
 from django.urls import reverse
-from django.utils.text import slugify
+from django.core.files.uploadedfile import UploadedFile
 from cloudinary.models import CloudinaryField
 
+from .image_metadata import METADATA_FIELDS, apply_metadata, clear_metadata
+from .search import build_search_fields
+from .slugs import allocate_slugs, base_slug
+
 
 class CarMake(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -52,20 +57,86 @@ class Car(models.Model):
         )
     condition = models.CharField(max_length=10, choices=CONDITION_CHOICES)
     image = CloudinaryField("image", blank=True, null=True)
+    # Read from the uploaded file by ``image_metadata``; lets templates
+    # reserve the image's box and paint a preview before it loads.
+    image_width = models.PositiveIntegerField(
+        null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(
+        null=True, blank=True, editable=False)
+    image_color = models.CharField(max_length=7, blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False)
+
+    class ImageStatus(models.TextChoices):
+        READY = "ready", "Ready"
+        PENDING = "pending", "Waiting to upload"
+        FAILED = "failed", "Upload failed"
+
+    # A new photo is staged locally and uploaded by the
+    # ``process_image_uploads`` worker; the current ``image`` stays in
+    # place until then.
+    image_status = models.CharField(
+        max_length=10, choices=ImageStatus.choices,
+        default=ImageStatus.READY, editable=False)
     price = models.PositiveIntegerField(validators=[MinValueValidator(0)])
     slug = models.SlugField(max_length=150, unique=True, blank=True)
     is_sold = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Precomputed, normalised text used by the showroom search
+    search_title = models.CharField(max_length=255, blank=True, editable=False)
+    search_document = models.TextField(blank=True, editable=False)
+
+    SEARCH_SOURCE_FIELDS = frozenset(
+        {"make", "model", "year", "performance", "specifications"})
+
     class Meta:
         ordering = ("-year", "make__name", "model__name")
+        # Matched to the CarListView sorts/filters and the HomeView carousel;
+        # `manage.py explain_showroom_queries` checks they are being used.
+        indexes = [
+            models.Index(fields=["-year", "-id"], name="car_year_id_idx"),
+            models.Index(fields=["price", "-id"], name="car_price_id_idx"),
+            models.Index(
+                fields=["-price", "-id"], name="car_price_desc_id_idx"),
+            models.Index(
+                fields=["make", "-year", "-id"], name="car_make_year_idx"),
+            models.Index(
+                fields=["model", "-year", "-id"], name="car_model_year_idx"),
+            models.Index(
+                fields=["condition", "-year", "-id"],
+                name="car_condition_year_idx"),
+            models.Index(
+                fields=["-created_at"],
+                condition=models.Q(is_sold=False),
+                name="car_unsold_recent_idx"),
+        ]
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base = f"{self.make.name}-{self.model.name}-{self.year}"
-            self.slug = slugify(base)[:150]
-        super().save(*args, **kwargs)
+        # Keep the search document in step with the fields it is built from;
+        # partial saves that don't touch those fields skip the rebuild.
+        update_fields = kwargs.get("update_fields")
+        if isinstance(self.image, UploadedFile):
+            apply_metadata(self, self.image)
+        elif not self.image and self.image_status == self.ImageStatus.READY:
+            clear_metadata(self)
+        if update_fields is not None and "image" in update_fields:
+            update_fields = kwargs["update_fields"] = {
+                *update_fields, *METADATA_FIELDS}
+        if update_fields is None:
+            self.search_title, self.search_document = build_search_fields(self)
+        elif self.SEARCH_SOURCE_FIELDS.intersection(update_fields):
+            self.search_title, self.search_document = build_search_fields(self)
+            kwargs["update_fields"] = {
+                *update_fields, "search_title", "search_document"}
+        if self.slug:
+            super().save(*args, **kwargs)
+            return
+        # Hold the slug counter until the car that uses it is written.
+        with transaction.atomic():
+            self.slug, = allocate_slugs([
+                base_slug(self.make.name, self.model.name, self.year)])
+            super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse("showroom:car_detail", kwargs={"slug": self.slug})
@@ -76,3 +147,106 @@ class Car(models.Model):
             f"{self.make.name} {self.model.name} ({self.year}) — "
             f"£{self.price}{sold}"
         )
+
+
+class CarFacetCount(models.Model):
+    """Precomputed number of cars per filter value, split by ``is_sold``.
+
+    Rows are adjusted incrementally from Car save/delete signals (see
+    ``apps.showroom.facets``) so the showroom never has to GROUP BY.
+    """
+
+    FACET_CHOICES = [
+        ("make", "Make"),
+        ("model", "Model"),
+        ("condition", "Condition"),
+        ("decade", "Decade"),
+    ]
+
+    facet = models.CharField(max_length=20, choices=FACET_CHOICES)
+    value = models.CharField(max_length=50)
+    # Model facets keep their make id so links can pre-select the make
+    parent_value = models.CharField(max_length=50, blank=True)
+    label = models.CharField(max_length=255)
+    is_sold = models.BooleanField(default=False)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ("facet", "label")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["facet", "value", "is_sold"],
+                name="unique_car_facet_value"
+            )
+        ]
+
+    def __str__(self):
+        sold = "sold" if self.is_sold else "available"
+        return (
+            f"{self.get_facet_display()}: {self.label} ({sold}) "
+            f"= {self.count}"
+        )
+
+
+class SlugCounter(models.Model):
+    """How many slugs have been handed out for one ``make-model-year``.
+
+    ``apps.showroom.slugs`` locks and bumps the row to number the next
+    car, so same-named cars never race for a slug.
+    """
+
+    base = models.CharField(max_length=150, unique=True)
+    issued = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.base}: {self.issued}"
+
+
+class ImageUpload(models.Model):
+    """A car photo staged in the database, waiting for the upload worker.
+
+    ``CarForm`` inserts the row; ``process_image_uploads`` claims it with
+    a lease, uploads the file with its renditions and swaps it onto the
+    car.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        PROCESSING = "processing", "Processing"
+        DONE = "done", "Done"
+        SUPERSEDED = "superseded", "Superseded"
+        FAILED = "failed", "Failed"
+
+    car = models.ForeignKey(
+        Car, on_delete=models.CASCADE, related_name="image_uploads")
+    # Name the photo is uploaded under, and its bytes until then (kept in
+    # the row so a worker on any machine can read them).
+    staged_name = models.CharField(max_length=255)
+    data = models.BinaryField(default=b"", editable=False)
+    # The new photo's metadata, copied onto the car along with the photo.
+    image_width = models.PositiveIntegerField(
+        null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(
+        null=True, blank=True, editable=False)
+    image_color = models.CharField(max_length=7, blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False)
+    original_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(
+                fields=["status", "available_at"],
+                name="imageupload_status_available"),
+        ]
+
+    def __str__(self):
+        return f"{self.original_name or self.staged_name} ({self.status})"
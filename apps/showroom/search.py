@@ -0,0 +1,93 @@
+"""Search helpers for the showroom app.
+
+Builds the precomputed search document stored on each car and runs
+ranked free-text lookups against it."""
+
+import re
+
+from django.db.models import Case, IntegerField, Value, When
+
+# Long queries add little relevance but cost one LIKE clause per term.
+MAX_TERMS = 6
+
+# Cars whose documents are refreshed per UPDATE when a make/model is renamed.
+REFRESH_BATCH_SIZE = 500
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalise(text):
+    """Lower-case ``text`` and collapse it to single-space separated words.
+
+    The result is padded with a leading and trailing space so word-prefix
+    matches can be expressed as a plain ``LIKE '% term%'``.
+    """
+    words = _WORD_RE.findall((text or "").lower())
+    return f" {' '.join(words)} " if words else ""
+
+
+def query_terms(query):
+    """Split a user query into the normalised terms used for matching."""
+    return normalise(query).split()[:MAX_TERMS]
+
+
+def build_search_fields(car):
+    """Return ``(search_title, search_document)`` for ``car``.
+
+    The title holds the make, model and year so matches on them can rank
+    above matches buried in the performance or specification text.
+    """
+    return build_search_text(
+        car.make.name, car.model.name, car.year,
+        car.performance, car.specifications)
+
+
+def build_search_text(make_name, model_name, year, performance,
+                      specifications):
+    """``build_search_fields`` from plain values, for bulk writers that
+    already hold the make and model names."""
+    title = normalise(f"{make_name} {model_name} {year}")
+    document = normalise(
+        f"{make_name} {model_name} {year} {performance} {specifications}")
+    return title[:255], document
+
+
+def search_cars(queryset, query):
+    """Filter ``queryset`` to cars matching every term in ``query``.
+
+    Results are annotated with ``search_rank``: a term scores 3 when it
+    starts a word in the title, 2 when it starts any word in the document
+    and 1 when it only appears inside a word. On Postgres the substring
+    filters are served by the trigram index on ``search_document``.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return queryset
+
+    rank = Value(0)
+    for term in terms:
+        queryset = queryset.filter(search_document__contains=term)
+        rank = rank + Case(
+            When(search_title__contains=f" {term}", then=Value(3)),
+            When(search_document__contains=f" {term}", then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    return queryset.annotate(search_rank=rank)
+
+
+def refresh_search_documents(queryset):
+    """Rebuild the stored search fields for every car in ``queryset``."""
+    from .models import Car
+
+    cars = queryset.select_related("make", "model").order_by("pk")
+    batch = []
+    for car in cars.iterator(chunk_size=REFRESH_BATCH_SIZE):
+        car.search_title, car.search_document = build_search_fields(car)
+        batch.append(car)
+        if len(batch) >= REFRESH_BATCH_SIZE:
+            Car.objects.bulk_update(
+                batch, ["search_title", "search_document"])
+            batch = []
+    if batch:
+        Car.objects.bulk_update(batch, ["search_title", "search_document"])
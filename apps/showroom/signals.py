@@ -0,0 +1,93 @@
+"""Signal receivers for the showroom app.
+
+Keeps data derived from cars in step when related records change."""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.common.caching import bump_on_commit
+
+from .facets import (
+    FACET_SOURCE_FIELDS, add_car, decade_of, refresh_labels, remove_state,
+    snapshot,
+)
+from .featured import FEATURED_SOURCE_FIELDS
+from .models import Car, CarMake, CarModel
+from .search import refresh_search_documents
+
+
+@receiver(post_save, sender=CarMake)
+def refresh_make_search_documents(sender, instance, created, **kwargs):
+    # A brand new make has no cars yet, so there is nothing to rebuild.
+    if not created:
+        refresh_search_documents(Car.objects.filter(make=instance))
+        refresh_labels(make=instance)
+
+
+@receiver(post_save, sender=CarModel)
+def refresh_model_search_documents(sender, instance, created, **kwargs):
+    if not created:
+        refresh_search_documents(Car.objects.filter(model=instance))
+        refresh_labels(model=instance)
+
+
+@receiver(pre_save, sender=Car)
+def capture_facet_state(sender, instance, update_fields=None, **kwargs):
+    """Remember which facets an existing car was counted under."""
+    instance._facet_state = None
+    if instance.pk is None:
+        return
+    if update_fields is not None:
+        touched = {name.removesuffix("_id") for name in update_fields}
+        if not touched & FACET_SOURCE_FIELDS:
+            return
+    old = (
+        Car.objects.filter(pk=instance.pk)
+        .values_list("make_id", "model_id", "condition", "year", "is_sold")
+        .first()
+    )
+    if old is None:
+        instance._facet_state = False
+    else:
+        make_id, model_id, condition, year, is_sold = old
+        instance._facet_state = (
+            make_id, model_id, condition, decade_of(year), is_sold)
+
+
+@receiver(post_save, sender=Car)
+def update_facet_counts(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_facet_state", None)
+    instance._facet_state = None
+    if created or previous is False:
+        add_car(instance)
+    elif previous and previous != snapshot(instance):
+        remove_state(previous)
+        add_car(instance)
+
+
+@receiver(post_delete, sender=Car)
+def remove_facet_counts(sender, instance, **kwargs):
+    remove_state(snapshot(instance))
+
+
+@receiver(post_save, sender=Car)
+@receiver(post_delete, sender=Car)
+def invalidate_car_pages(sender, instance, raw=False, update_fields=None,
+                         **kwargs):
+    # Every page a car can appear on: the grid, its own detail page, the
+    # home carousel and the sitemap.
+    if raw:
+        return
+    namespaces = ["showroom", f"car:{instance.slug}", "sitemap"]
+    if update_fields is None or FEATURED_SOURCE_FIELDS & set(update_fields):
+        namespaces.append("home")
+    bump_on_commit(*namespaces)
+
+
+@receiver(post_save, sender=CarMake)
+@receiver(post_save, sender=CarModel)
+def invalidate_catalog_pages(sender, raw=False, **kwargs):
+    if not raw:
+        bump_on_commit("catalog")
@@ -0,0 +1,133 @@
+"""XML sitemaps for the site, built from the ``Car`` table.
+
+``/sitemap.xml`` is a sitemap index pointing at a section of static pages
+and at as many car sections as it takes to keep each one within the
+protocol's 50,000-URL limit. Sections are written row by row from a
+``values_list`` iterator straight into a gzip stream, so no model
+instances are built, and the compressed bytes are cached under the
+``sitemap`` generation, which every ``Car`` save or delete bumps."""
+
+import gzip
+import io
+from xml.sax.saxutils import escape
+
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.common.caching import versioned_key
+
+from .models import Car
+
+# Per-file URL limit from sitemaps.org.
+SITEMAP_LIMIT = 50_000
+
+# Seconds a sitemap may live without a bump; generations do the real work.
+SITEMAP_TIMEOUT = 60 * 60 * 24
+
+SITEMAP_NAMESPACES = ("sitemap",)
+
+# URL names of the pages listed in the "pages" section.
+STATIC_PAGES = (
+    "home",
+    "showroom:car_list",
+    "common:faq_list",
+    "common:contact",
+    "common:newsletter",
+)
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def car_page_count(limit=SITEMAP_LIMIT):
+    return max(1, -(-Car.objects.count() // limit))
+
+
+def _static_entries():
+    for name in STATIC_PAGES:
+        yield reverse(name), None
+
+
+def _car_entries(page, limit):
+    rows = (
+        Car.objects.order_by("pk")
+        .values_list("slug", "updated_at")[(page - 1) * limit:page * limit]
+    )
+    for slug, updated_at in rows.iterator(chunk_size=2000):
+        yield reverse("showroom:car_detail", kwargs={"slug": slug}), updated_at
+
+
+SECTIONS = {
+    "pages": lambda page, limit: _static_entries(),
+    "cars": _car_entries,
+}
+
+
+def section_pages(section, limit=SITEMAP_LIMIT):
+    return car_page_count(limit) if section == "cars" else 1
+
+
+def _urlset(base_url, entries):
+    yield XML_HEADER
+    yield f"<urlset {XMLNS}>\n"
+    for path, lastmod in entries:
+        yield f"<url><loc>{escape(base_url + path)}</loc>"
+        if lastmod is not None:
+            yield f"<lastmod>{lastmod.date().isoformat()}</lastmod>"
+        yield "</url>\n"
+    yield "</urlset>\n"
+
+
+def _index(base_url, limit):
+    yield XML_HEADER
+    yield f"<sitemapindex {XMLNS}>\n"
+    for section in SECTIONS:
+        path = reverse("sitemap_section", kwargs={"section": section})
+        for page in range(1, section_pages(section, limit) + 1):
+            loc = base_url + path + (f"?p={page}" if page > 1 else "")
+            yield f"<sitemap><loc>{escape(loc)}</loc></sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def _compress(chunks):
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as stream:
+        for chunk in chunks:
+            stream.write(chunk.encode())
+    return buffer.getvalue()
+
+
+def base_url_for(request):
+    return f"{request.scheme}://{get_current_site(request).domain}"
+
+
+def _cached(name, base_url, build):
+    """Cached gzipped bytes for ``name``; ``build`` returns XML chunks,
+    or ``None`` if there is nothing to serve (which is not cached)."""
+    key = versioned_key(f"sitemap:{name}:{base_url}", SITEMAP_NAMESPACES)
+    content = cache.get(key)
+    if content is None:
+        chunks = build()
+        if chunks is None:
+            return None
+        content = _compress(chunks)
+        cache.set(key, content, SITEMAP_TIMEOUT)
+    return content
+
+
+def sitemap_index(base_url, limit=SITEMAP_LIMIT):
+    """The gzipped sitemap index."""
+    return _cached("index", base_url, lambda: _index(base_url, limit))
+
+
+def sitemap_section(base_url, section, page=1, limit=SITEMAP_LIMIT):
+    """One gzipped section file, or ``None`` if there is no such page."""
+    def build():
+        if section not in SECTIONS:
+            return None
+        if not 1 <= page <= section_pages(section, limit):
+            return None
+        return _urlset(base_url, SECTIONS[section](page, limit))
+
+    return _cached(f"{section}:{page}", base_url, build)
@@ -0,0 +1,119 @@
+"""Unique car slugs without probing for free names.
+
+Cars share a base slug (``make-model-year``); the first gets the base
+itself and later ones ``base-2``, ``base-3``… ``SlugCounter`` keeps how
+many slugs each base has handed out, so allocating is an update of one
+locked counter row per base rather than a lookup per candidate. A base
+seen for the first time is seeded from the cars already using it with a
+single indexed prefix query, and each batch checks its slugs against
+the table once in case a slug was typed in by hand.
+
+``allocate_slugs()`` takes a whole batch of bases at once, which is what
+``Car.save`` (a batch of one) and the inventory importer use. Counter
+rows stay locked until the caller's transaction ends, so concurrent
+requests for the same base queue behind each other instead of racing to
+the unique constraint."""
+
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+SLUG_MAX_LENGTH = 150
+
+
+def base_slug(make_name, model_name, year):
+    """The shared ``make-model-year`` part of a car's slug."""
+    return slugify(f"{make_name}-{model_name}-{year}")[:SLUG_MAX_LENGTH]
+
+
+def build_slug(base, number):
+    """The ``number``-th slug for ``base`` (the first is ``base``)."""
+    if number == 1:
+        return base
+    tail = f"-{number}"
+    return base[:SLUG_MAX_LENGTH - len(tail)] + tail
+
+
+def existing_counts(bases):
+    """How many slugs each base already has on cars, in one query."""
+    from .models import Car
+
+    query = Q()
+    for base in bases:
+        query |= Q(slug=base) | Q(slug__startswith=f"{base}-")
+    counts = dict.fromkeys(bases, 0)
+    patterns = {
+        base: re.compile(rf"{re.escape(base)}(?:-(\d+))?") for base in bases}
+    for slug in Car.objects.filter(query).order_by().values_list(
+            "slug", flat=True):
+        for base, pattern in patterns.items():
+            match = pattern.fullmatch(slug)
+            if match:
+                number = int(match.group(1) or 1)
+                counts[base] = max(counts[base], number)
+    return counts
+
+
+def taken_slugs(slugs):
+    """Which of ``slugs`` cars already use."""
+    from .models import Car
+
+    return set(
+        Car.objects.filter(slug__in=slugs).order_by()
+        .values_list("slug", flat=True))
+
+
+def allocate_slugs(bases, reserved=()):
+    """Reserve a unique slug for every entry in ``bases``, in order.
+
+    Repeated bases get consecutive numbers. ``reserved`` are slugs the
+    caller is about to write itself and must be skipped too. Call it
+    inside the transaction that writes the cars so the counters stay
+    locked until the slugs are in use.
+    """
+    from .models import SlugCounter
+
+    bases = list(bases)
+    reserved = set(reserved)
+    wanted = Counter(bases)
+    if not wanted:
+        return []
+    with transaction.atomic():
+        counters = {
+            counter.base: counter
+            for counter in SlugCounter.objects.select_for_update().filter(
+                base__in=wanted)
+        }
+        missing = wanted.keys() - counters.keys()
+        if missing:
+            seeds = existing_counts(missing)
+            SlugCounter.objects.bulk_create(
+                [SlugCounter(base=base, issued=seeds[base])
+                 for base in missing],
+                ignore_conflicts=True)
+            # Another allocator may have created some first; lock and use
+            # whichever rows won.
+            counters.update(
+                (counter.base, counter)
+                for counter in SlugCounter.objects.select_for_update()
+                .filter(base__in=missing))
+
+        def issue(base):
+            counter = counters[base]
+            counter.issued += 1
+            return build_slug(base, counter.issued)
+
+        slugs = [issue(base) for base in bases]
+        # Slugs typed in by hand (the admin allows it) can sit ahead of a
+        # counter; skip past any number that is already in use.
+        taken = taken_slugs(slugs) | reserved.intersection(slugs)
+        while taken:
+            slugs = [
+                issue(base) if slug in taken else slug
+                for base, slug in zip(bases, slugs)]
+            taken = taken_slugs(slugs) | reserved.intersection(slugs)
+        SlugCounter.objects.bulk_update(counters.values(), ["issued"])
+    return slugs
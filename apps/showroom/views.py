@@ -4,24 +4,35 @@ Handles HTTP requests, orchestrates domain operations,
 and returns rendered responses."""
 
 # apps/showroom/views.py
+import gzip
+
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_vary_headers
 from django.utils.decorators import method_decorator
 from django.urls import reverse_lazy
 from urllib.parse import urlencode
-from django.db.models import Q
 from django.views.generic import (
     ListView, DetailView,
     CreateView, UpdateView, DeleteView,
 )
+from apps.common.caching import CachedAnonymousPageMixin
+from apps.common.pagination import CursorPaginationMixin
 from .models import Car
+from .facets import get_facet_counts
 from .forms import CarForm, CarFilterForm
+from . import sitemaps
+from .search import search_cars
 
 # Only superusers can do create/update/delete
 superuser_required = user_passes_test(lambda u: u.is_superuser)
 
 
-class CarListView(ListView):
+class CarListView(
+        CachedAnonymousPageMixin, CursorPaginationMixin, ListView):
+    # "catalog" covers make/model names shown on every car page
+    cache_namespaces = ("showroom", "catalog")
     model = Car
     template_name = "showroom/list.html"
     context_object_name = "cars"
@@ -46,20 +57,18 @@ class CarListView(ListView):
                 qs = qs.filter(condition=data["condition"])
 
         # ----- free-text search (q) -----
-        q = (self.request.GET.get("q") or "").strip()
+        q = self.get_search_query()
         if q:
-            qs = qs.filter(
-                Q(make__name__icontains=q) |
-                Q(model__name__icontains=q) |
-                Q(year__icontains=q)
-            )
+            qs = search_cars(qs, q)
 
         # ----- sorting -----
-        sort = (self.request.GET.get("sort") or "new").lower()
+        sort = self.get_sort()
         if sort == "price_asc":
             qs = qs.order_by("price", "-id")
         elif sort == "price_desc":
             qs = qs.order_by("-price", "-id")
+        elif sort == "relevance" and q:
+            qs = qs.order_by("-search_rank", "-year", "-id")
         else:  # "new"
             if hasattr(Car, "created"):
                 qs = qs.order_by("-created", "-id")
@@ -69,16 +78,35 @@ class CarListView(ListView):
 
         return qs
 
+    def get_search_query(self):
+        return (self.request.GET.get("q") or "").strip()
+
+    def get_sort(self):
+        # Searches default to best match; plain browsing to newest first.
+        default = "relevance" if self.get_search_query() else "new"
+        return (self.request.GET.get("sort") or default).lower()
+
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        q = (self.request.GET.get("q") or "").strip()
-        sort = (self.request.GET.get("sort") or "new").lower()
+        q = self.get_search_query()
+        sort = self.get_sort()
 
         # Preserve filters across pagination links
         preserved = self.request.GET.copy()
-        if "page" in preserved:
-            preserved.pop("page")
+        for key in ("page", self.cursor_query_param):
+            if key in preserved:
+                preserved.pop(key)
+
+        # Models are only offered once a make is chosen
+        facets = get_facet_counts()
+        selected_make = self.request.GET.get("make", "")
+        facets["model"] = [
+            entry for entry in facets["model"]
+            if selected_make and entry["parent_value"] == selected_make
+        ]
         ctx.update({
+            "facets": facets,
+            "selected_make": selected_make,
             "filter_form": CarFilterForm(self.request.GET),
             "q": q,
             "sort": sort,
@@ -87,10 +115,13 @@ class CarListView(ListView):
         return ctx
 
 
-class CarDetailView(DetailView):
+class CarDetailView(CachedAnonymousPageMixin, DetailView):
     model = Car
     template_name = "showroom/detail.html"
 
+    def get_cache_namespaces(self):
+        return (f"car:{self.kwargs['slug']}", "catalog")
+
 
 @method_decorator([login_required, superuser_required], name="dispatch")
 class CarCreateView(CreateView):
@@ -126,3 +157,33 @@ class CarDeleteView(DeleteView):
         messages.success(
             self.request, f"Car deleted successfully: {car_label}")
         return response
+
+
+def _sitemap_response(request, content):
+    """Serve gzipped sitemap bytes, inflating them for clients that
+    don't accept gzip."""
+    accepts_gzip = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+    if not accepts_gzip:
+        content = gzip.decompress(content)
+    response = HttpResponse(content, content_type="application/xml")
+    if accepts_gzip:
+        response["Content-Encoding"] = "gzip"
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
+
+
+def sitemap_index(request):
+    return _sitemap_response(
+        request, sitemaps.sitemap_index(sitemaps.base_url_for(request)))
+
+
+def sitemap_section(request, section):
+    try:
+        page = int(request.GET.get("p", 1))
+    except ValueError:
+        raise Http404("Invalid sitemap page.")
+    content = sitemaps.sitemap_section(
+        sitemaps.base_url_for(request), section, page)
+    if content is None:
+        raise Http404("No such sitemap.")
+    return _sitemap_response(request, content)
@@ -8,3 +8,6 @@ class TrailerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.trailer"
     verbose_name = "Trailer (Shopping Cart)"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,14 @@
+"""Signal receivers for the trailer app.
+
+Moves an anonymous shopper's session cart into their account on login."""
+
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+
+from .storage import merge_session_cart
+
+
+@receiver(user_logged_in)
+def merge_cart_on_login(sender, request, user, **kwargs):
+    if request is not None and hasattr(request, "session"):
+        merge_session_cart(request, user)
@@ -0,0 +1,164 @@
+"""Cart storage backends for the trailer app.
+
+Anonymous shoppers keep their cart in the session (which may itself be
+the signed-cookie engine); signed-in shoppers use the ``Cart`` and
+``CartItem`` tables. Both expose the same operations so the views don't
+care which one they were given, and neither writes anything just to read
+a cart."""
+
+from django.db import transaction
+from django.http import Http404
+
+from apps.showroom.models import Car
+from .models import Cart, CartItem
+from .summary import CartSummary, summarise_items
+
+SESSION_KEY = "trailer_cart"
+
+
+class SessionCartItem:
+    """A session cart row; ``pk`` is the car id."""
+
+    def __init__(self, car, quantity):
+        self.pk = car.pk
+        self.car = car
+        self.quantity = quantity
+
+
+class SessionCartStorage:
+    """Cart held in the session as ``{"<car id>": quantity}``."""
+
+    def __init__(self, request):
+        self.session = request.session
+
+    def _load(self):
+        return dict(self.session.get(SESSION_KEY, {}))
+
+    def _save(self, data):
+        if data:
+            self.session[SESSION_KEY] = data
+        else:
+            self.session.pop(SESSION_KEY, None)
+
+    def summary(self):
+        data = self._load()
+        if not data:
+            return CartSummary([])
+        wanted = {int(car_id): quantity for car_id, quantity in data.items()}
+        cars = Car.objects.select_related("make", "model").in_bulk(wanted)
+        return CartSummary([
+            SessionCartItem(cars[car_id], quantity)
+            for car_id, quantity in sorted(wanted.items())
+            if car_id in cars
+        ])
+
+    def add(self, car, quantity):
+        """Add ``quantity`` of ``car``; returns ``(new quantity, created)``."""
+        data = self._load()
+        key = str(car.pk)
+        created = key not in data
+        data[key] = data.get(key, 0) + quantity
+        self._save(data)
+        return data[key], created
+
+    def update(self, item_pk, quantity):
+        """Set a row's quantity (removing it below 1); returns the car."""
+        data = self._load()
+        key = str(item_pk)
+        if key not in data:
+            raise Http404("No such cart item.")
+        car = Car.objects.select_related("make", "model").filter(
+            pk=item_pk).first()
+        if quantity < 1 or car is None:
+            del data[key]
+        else:
+            data[key] = quantity
+        self._save(data)
+        if car is None:
+            raise Http404("No such cart item.")
+        return car
+
+    def clear(self):
+        count = len(self._load())
+        self._save({})
+        return count
+
+
+class DatabaseCartStorage:
+    """Cart held in the ``Cart``/``CartItem`` tables for a signed-in user."""
+
+    def __init__(self, user):
+        self.user = user
+
+    def _items(self):
+        return CartItem.objects.filter(cart__user=self.user)
+
+    def summary(self):
+        return summarise_items(self._items())
+
+    def add(self, car, quantity):
+        cart, _ = Cart.objects.get_or_create(user=self.user)
+        item, created = CartItem.objects.get_or_create(
+            cart=cart, car=car, defaults={"quantity": quantity})
+        if not created:
+            item.quantity += quantity
+            item.save(update_fields=["quantity"])
+        return item.quantity, created
+
+    def update(self, item_pk, quantity):
+        item = self._items().select_related(
+            "car__make", "car__model").filter(pk=item_pk).first()
+        if item is None:
+            raise Http404("No such cart item.")
+        if quantity < 1:
+            item.delete()
+        else:
+            item.quantity = quantity
+            item.save(update_fields=["quantity"])
+        return item.car
+
+    def clear(self):
+        count, _ = self._items().delete()
+        return count
+
+
+def get_cart_storage(request):
+    if request.user.is_authenticated:
+        return DatabaseCartStorage(request.user)
+    return SessionCartStorage(request)
+
+
+def merge_session_cart(request, user):
+    """Fold the anonymous session cart into ``user``'s DB cart.
+
+    Quantities for cars already in the DB cart are added together. All
+    rows are written with one ``bulk_update`` and one ``bulk_create``.
+    The session cart is only dropped once those writes have committed,
+    so a failed merge leaves it in place for the next login.
+    """
+    data = request.session.get(SESSION_KEY)
+    if not data:
+        return
+    wanted = {int(car_id): quantity for car_id, quantity in data.items()}
+    car_ids = set(
+        Car.objects.filter(pk__in=wanted).values_list("pk", flat=True))
+    if not car_ids:
+        request.session.pop(SESSION_KEY, None)
+        return
+
+    with transaction.atomic():
+        cart, _ = Cart.objects.get_or_create(user=user)
+        existing = {
+            item.car_id: item
+            for item in cart.items.select_for_update().filter(
+                car_id__in=car_ids)
+        }
+        for car_id, item in existing.items():
+            item.quantity += wanted[car_id]
+        CartItem.objects.bulk_update(existing.values(), ["quantity"])
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, car_id=car_id, quantity=wanted[car_id])
+            for car_id in sorted(car_ids - existing.keys())
+        ])
+        transaction.on_commit(
+            lambda: request.session.pop(SESSION_KEY, None))
@@ -5,7 +5,7 @@ Maps request paths to view callables and namespaced route names."""
 # apps/trailer/urls.py
 from django.urls import path
 from .views import (
-    CartDetailView, AddToCartView,
+    CartDetailView, AddToCartView, CsrfTokenView,
     UpdateCartItemView, ClearCartView,
 )
 app_name = "trailer"
@@ -17,4 +17,5 @@ urlpatterns = [
         "item/<int:item_pk>/edit/", UpdateCartItemView.as_view(),
         name="update_cart_item"),
     path("clear/", ClearCartView.as_view(), name="clear_cart"),
+    path("csrf/", CsrfTokenView.as_view(), name="csrf_token"),
 ]
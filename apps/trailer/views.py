@@ -7,80 +7,83 @@ and returns rendered responses."""
 from django.views import View
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.http import JsonResponse
+from django.middleware.csrf import get_token
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
 
-from apps.common.auth_mixins import LoginRequiredMessageMixin
-from .models import Cart, CartItem
+from apps.showroom.models import Car
 from .forms import AddToCartForm, UpdateCartForm
+from .storage import get_cart_storage
 
 
-class CartDetailView(LoginRequiredMessageMixin, View):
+class CartDetailView(View):
     template_name = "trailer/cart_detail.html"
 
     def get(self, request):
-        cart, _ = Cart.objects.get_or_create(user=request.user)
-        return render(request, self.template_name, {"cart": cart})
+        return render(request, self.template_name, {
+            "summary": get_cart_storage(request).summary(),
+        })
 
 
-class AddToCartView(LoginRequiredMessageMixin, View):
+@method_decorator(never_cache, name="dispatch")
+class CsrfTokenView(View):
+    """The visitor's CSRF token, for forms on shared cached pages.
+
+    Those pages can't carry a per-visitor token, so the buy button reads
+    the ``csrftoken`` cookie before posting and asks here when there is
+    none yet (which also sets the cookie).
+    """
+
+    def get(self, request):
+        return JsonResponse({"token": get_token(request)})
+
+
+class AddToCartView(View):
     form_class = AddToCartForm
 
     def post(self, request, car_pk):
-        cart, _ = Cart.objects.get_or_create(user=request.user)
+        car = get_object_or_404(
+            Car.objects.select_related("make", "model"), pk=car_pk)
         form = self.form_class(request.POST)
         if form.is_valid():
             qty = form.cleaned_data["quantity"]
-            item, created = CartItem.objects.get_or_create(
-                cart=cart,
-                car_id=car_pk,
-                defaults={"quantity": qty},
-            )
+            quantity, created = get_cart_storage(request).add(car, qty)
             if not created:
-                item.quantity += qty
-                item.save()
                 messages.success(
                     request,
-                    f"(Updated quantity of {item.car} in your cart)"
-                    "(now {item.quantity})."
+                    f"(Updated quantity of {car} in your cart)"
+                    f"(now {quantity})."
                 )
             else:
                 messages.success(
                     request,
-                    f"✓ Added {item.car} to your cart."
+                    f"✓ Added {car} to your cart."
                 )
         return redirect("trailer:cart_detail")
 
 
-class UpdateCartItemView(LoginRequiredMessageMixin, View):
+class UpdateCartItemView(View):
     form_class = UpdateCartForm
 
     def post(self, request, item_pk):
-        item = get_object_or_404(
-            CartItem,
-            pk=item_pk,
-            cart__user=request.user
-        )
         try:
             qty = int(request.POST.get("quantity", 1))
         except ValueError:
             qty = 1
 
-        car_name = str(item.car)
+        car = get_cart_storage(request).update(item_pk, qty)
         if qty < 1:
-            item.delete()
-            messages.success(request, f"Removed {car_name} from your cart.")
+            messages.success(request, f"Removed {car} from your cart.")
         else:
-            item.quantity = qty
-            item.save()
-            messages.success(request, f"Updated {car_name} quantity to {qty}.")
+            messages.success(request, f"Updated {car} quantity to {qty}.")
 
         return redirect("trailer:cart_detail")
 
 
-class ClearCartView(LoginRequiredMessageMixin, View):
+class ClearCartView(View):
     def post(self, request):
-        cart, _ = Cart.objects.get_or_create(user=request.user)
-        count = cart.items.count()
-        cart.items.all().delete()
+        count = get_cart_storage(request).clear()
         if count > 0:
             messages.success(
                 request, f"Cleared your cart ({count} item(s) removed).")
@@ -0,0 +1,62 @@
+# core/cache_url.py
+"""Turn a ``CACHE_URL`` string into a Django ``CACHES`` entry.
+
+Supported schemes:
+
+    dummy://                      no caching
+    locmem://[name]               per-process memory
+    file:///absolute/path         shared directory on local disk
+    redis://host:port/db          Redis (or any Redis-protocol server)
+    rediss://host:port/db         Redis over TLS
+
+Cached pages are invalidated by bumping generation counters in the cache
+itself, so every web and worker process has to see the same cache.
+``require_shared()`` rejects URLs that can't give them that.
+"""
+
+from urllib.parse import urlsplit
+
+BACKENDS = {
+    "dummy": "django.core.cache.backends.dummy.DummyCache",
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "rediss": "django.core.cache.backends.redis.RedisCache",
+}
+
+# Caches only the current process sees, and ones only the current host sees.
+PER_PROCESS = {"locmem"}
+PER_HOST = {"file"}
+
+
+def require_shared(url, across_hosts=False):
+    """Raise ``ValueError`` unless ``url`` is shared by every process (and
+    every host, e.g. separate Heroku dynos, with ``across_hosts``)."""
+    scheme = urlsplit(url).scheme.lower()
+    if scheme in PER_PROCESS or (across_hosts and scheme in PER_HOST):
+        raise ValueError(
+            f"CACHE_URL {scheme}:// isn't shared between processes"
+            f"{' on different hosts' if scheme in PER_HOST else ''}; "
+            "use redis:// (or dummy:// to turn caching off).")
+
+
+def parse(url, key_prefix="", timeout=300):
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unsupported CACHE_URL scheme: {scheme!r}")
+
+    cache = {
+        "BACKEND": BACKENDS[scheme],
+        "KEY_PREFIX": key_prefix,
+        "TIMEOUT": timeout,
+    }
+    if scheme == "locmem":
+        cache["LOCATION"] = parts.netloc or "modern-classics"
+    elif scheme == "file":
+        if not parts.path:
+            raise ValueError("file:// CACHE_URL needs an absolute path")
+        cache["LOCATION"] = parts.path
+    elif scheme in ("redis", "rediss"):
+        cache["LOCATION"] = url
+    return cache
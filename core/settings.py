@@ -2,12 +2,15 @@
 
 from pathlib import Path
 import os
+import sys
 from decouple import AutoConfig, Csv
 import dj_database_url
 from datetime import timedelta
 from decimal import Decimal
 from django.urls import reverse_lazy
 
+from core import cache_url
+
 FREE_DELIVERY_THRESHOLD = Decimal("50000.00")
 STANDARD_DELIVERY_PERCENT = Decimal("1.5")
 
@@ -20,6 +23,7 @@ config = AutoConfig(search_path=BASE_DIR)
 ENVIRONMENT = config("ENVIRONMENT", default="development")
 DEBUG = ENVIRONMENT != "production"
 IS_HEROKU = "DYNO" in os.environ
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
 
 # === Security & Hosts ===
 SECRET_KEY = config("SECRET_KEY")
@@ -183,6 +187,12 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# The process_image_uploads worker sends new car photos through this
+# (LocalUploader keeps them under MEDIA_ROOT instead of Cloudinary).
+IMAGE_UPLOADER = config(
+    "IMAGE_UPLOADER",
+    default="apps.showroom.image_uploads.CloudinaryUploader")
+
 DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
 CLOUDINARY_STORAGE = {
     "CLOUD_NAME": config("CLOUDINARY_CLOUD_NAME"),
@@ -221,6 +231,19 @@ STRIPE_SECRET_KEY = os.environ.get("STRIPE_SECRET_KEY", "sk_test_…")
 STRIPE_PUBLISHABLE_KEY = os.environ.get("STRIPE_PUBLISHABLE_KEY", "pk_test_…")
 STRIPE_WEBHOOK_SECRET = os.environ.get("STRIPE_WEBHOOK_SECRET", "whsec_…")
 STRIPE_CURRENCY = os.getenv("STRIPE_CURRENCY", "gbp")
+# Leave STRIPE_API_BASE empty for api.stripe.com; point it at a local
+# fake (e.g. stripe-mock) in development.
+STRIPE_API_BASE = config("STRIPE_API_BASE", default="")
+STRIPE_CONNECT_TIMEOUT = config(
+    "STRIPE_CONNECT_TIMEOUT", default=3.0, cast=float)
+STRIPE_TIMEOUT = config("STRIPE_TIMEOUT", default=10.0, cast=float)
+STRIPE_DEADLINE = config("STRIPE_DEADLINE", default=20.0, cast=float)
+STRIPE_MAX_RETRIES = config("STRIPE_MAX_RETRIES", default=2, cast=int)
+STRIPE_POOL_SIZE = config("STRIPE_POOL_SIZE", default=10, cast=int)
+STRIPE_BREAKER_THRESHOLD = config(
+    "STRIPE_BREAKER_THRESHOLD", default=5, cast=int)
+STRIPE_BREAKER_RESET = config(
+    "STRIPE_BREAKER_RESET", default=30.0, cast=float)
 
 # === E-mail (Yahoo) Configuration ===
 if DEBUG:
@@ -236,6 +259,36 @@ else:
     EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD")
     DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# Newsletter sends: subscribers per checkpointed batch, and a ceiling on
+# messages per second so the SMTP provider doesn't throttle us.
+NEWSLETTER_BATCH_SIZE = config("NEWSLETTER_BATCH_SIZE", default=500, cast=int)
+NEWSLETTER_SEND_RATE = config(
+    "NEWSLETTER_SEND_RATE", default=10.0, cast=float)
+# Scheduled campaigns only start inside this daily window (TIME_ZONE
+# clock, e.g. "01:00-06:00"); empty means any time.
+NEWSLETTER_SEND_WINDOW = config("NEWSLETTER_SEND_WINDOW", default="")
+
+# === Pagination ===
+# Serve list views with keyset cursors instead of numbered pages
+CURSOR_PAGINATION = config("CURSOR_PAGINATION", default=False, cast=bool)
+
+# === Caching ===
+# e.g. redis://localhost:6379/0 or file:///var/tmp/modern-classics-cache.
+# Tests run uncached unless they override CACHES themselves. Production
+# must name a cache every web and worker process shares, otherwise a
+# write in one leaves stale pages in the others.
+if TESTING or DEBUG:
+    CACHE_URL = config(
+        "CACHE_URL", default="dummy://" if TESTING else "locmem://")
+else:
+    CACHE_URL = config("CACHE_URL")
+    cache_url.require_shared(CACHE_URL, across_hosts=IS_HEROKU)
+CACHES = {
+    "default": cache_url.parse(CACHE_URL, key_prefix="mc"),
+}
+# Seconds an anonymous page stays cached between Car/FAQ writes
+PAGE_CACHE_TIMEOUT = config("PAGE_CACHE_TIMEOUT", default=300, cast=int)
+
 # === Default Primary Key Field Type ===
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
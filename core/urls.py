@@ -8,6 +8,7 @@ from django.conf.urls.static import static
 from core.views import HomeView
 
 from apps.common.views import robots_txt
+from apps.showroom.views import sitemap_index, sitemap_section
 
 urlpatterns = [
     # Admin
@@ -48,6 +49,10 @@ urlpatterns = [
 
     # SEO
     path("robots.txt", robots_txt, name="robots_txt"),
+    path("sitemap.xml", sitemap_index, name="sitemap_index"),
+    path(
+        "sitemap-<slug:section>.xml", sitemap_section,
+        name="sitemap_section"),
 ]
 
 if settings.DEBUG:
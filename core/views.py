@@ -1,9 +1,11 @@
 from django.views.generic import TemplateView
 from django.shortcuts import redirect
-from apps.showroom.models import Car
+from apps.common.caching import CachedAnonymousPageMixin
+from apps.showroom.featured import get_featured_cars
 
 
-class HomeView(TemplateView):
+class HomeView(CachedAnonymousPageMixin, TemplateView):
+    cache_namespaces = ("home", "catalog")
     template_name = "home/hero.html"
 
     def dispatch(self, request, *args, **kwargs):
@@ -13,11 +15,5 @@ class HomeView(TemplateView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        qs = (
-            Car.objects
-               .filter(is_sold=False)
-               .exclude(image="placeholder")      # ← key line
-               .order_by("-created_at")
-        )
-        ctx["featured_cars"] = qs[:10]
+        ctx["featured_cars"] = get_featured_cars()
         return ctx
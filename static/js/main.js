@@ -48,6 +48,38 @@
 		}
 	});
 
+	// Cached pages are shared between visitors, so their forms can't carry a
+	// CSRF token. Forms with data-csrf-url fill it in on submit from the
+	// csrftoken cookie, fetching the token first when there is no cookie yet.
+	const readCookie = (name) => {
+		const match = document.cookie.match(new RegExp(`(?:^|; )${name}=([^;]*)`));
+		return match ? decodeURIComponent(match[1]) : "";
+	};
+
+	document.querySelectorAll("form[data-csrf-url]").forEach((form) => {
+		form.addEventListener("submit", async (event) => {
+			const field = form.querySelector("input[name='csrfmiddlewaretoken']");
+			if (!field || field.value) {
+				return;
+			}
+			event.preventDefault();
+			let token = readCookie("csrftoken");
+			if (!token) {
+				try {
+					const resp = await fetch(form.dataset.csrfUrl, {
+						credentials: "same-origin",
+					});
+					token = (await resp.json()).token;
+				} catch (err) {
+					console.error(err);
+					return;
+				}
+			}
+			field.value = token;
+			form.submit();
+		});
+	});
+
 	document.querySelectorAll(".alert").forEach((alertEl) => {
 		if (alertEl.classList.contains("alert-danger")) {
 			return;
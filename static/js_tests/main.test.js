@@ -24,4 +24,22 @@ describe('global frontend behavior', () => {
 
     expect(image.getAttribute('src')).toContain('/static/images/placeholder-car.svg');
   });
+
+  test('fills a cached form\'s CSRF token from the cookie before submitting', () => {
+    document.cookie = 'csrftoken=cookie-token; path=/';
+    document.body.innerHTML = `
+      <form id="buy" method="post" action="/trailer/add/1/" data-csrf-url="/trailer/csrf/">
+        <input type="hidden" name="csrfmiddlewaretoken" value="">
+      </form>
+    `;
+    const form = document.getElementById('buy');
+    form.submit = jest.fn();
+
+    require('../js/main.js');
+    form.dispatchEvent(new Event('submit', { cancelable: true }));
+
+    expect(form.querySelector('input').value).toBe('cookie-token');
+    expect(form.submit).toHaveBeenCalled();
+    document.cookie = 'csrftoken=; Max-Age=0; path=/';
+  });
 });
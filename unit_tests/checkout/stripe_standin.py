@@ -0,0 +1,83 @@
+"""A tiny in-process HTTP server answering the PaymentIntent endpoints
+the payment gateway uses, so it can be exercised without Stripe."""
+
+import http.server
+import json
+import threading
+from urllib.parse import parse_qs
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    # Keep-alive, so tests can see the gateway reusing its connection.
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.respond()
+
+    def do_POST(self):
+        self.respond()
+
+    def respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else ""
+        server = self.server
+        with server.lock:
+            server.requests.append({
+                "method": self.command,
+                "path": self.path,
+                "params": parse_qs(body),
+                "idempotency_key": self.headers.get("Idempotency-Key"),
+                "client_port": self.client_address[1],
+            })
+            status = server.failures.pop(0) if server.failures else 200
+
+        if status == 200:
+            intent_id = self.path.rsplit("/", 1)[-1]
+            if intent_id == "payment_intents":
+                intent_id = "pi_new"
+            payload = {
+                "id": intent_id,
+                "object": "payment_intent",
+                "status": "requires_payment_method",
+                "client_secret": f"{intent_id}_secret_x",
+            }
+        else:
+            payload = {"error": {
+                "type": "api_error", "message": f"status {status}"}}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StripeStandIn(http.server.ThreadingHTTPServer):
+    """Start with ``with StripeStandIn() as server: server.url``.
+
+    Append HTTP status codes to ``failures`` to fail the next requests.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.failures = []
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
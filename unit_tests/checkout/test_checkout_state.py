@@ -0,0 +1,142 @@
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+import stripe
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.checkout.models import Order, OrderLineItem
+from apps.checkout.payments import PaymentGatewayError
+from apps.showroom.models import CarMake, CarModel, Car
+from core import cache_url
+
+User = get_user_model()
+
+
+@override_settings(
+    CACHES={"default": cache_url.parse("locmem://checkout-state")},
+    STRIPE_SECRET_KEY="sk_test_x",
+    STRIPE_PUBLISHABLE_KEY="pk_test_x",
+)
+class CheckoutStateCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="state", password="x", email="state@example.com")
+        make = CarMake.objects.create(name="Jaguar")
+        model = CarModel.objects.create(make=make, name="E-Type")
+        cls.car = Car.objects.create(
+            make=make, model=model, year=1968,
+            specifications="Spec", performance="Perf",
+            condition="good", price=Decimal("50.00")
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.order = Order.objects.create(
+            user=self.user, original_trailer={"items": []},
+            stripe_pid="pi_state")
+        OrderLineItem.objects.create(
+            order=self.order, car=self.car, quantity=1,
+            unit_price=self.car.price)
+        self.url = reverse(
+            "checkout:checkout", kwargs={"order_id": self.order.pk})
+
+    def get(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get(self.url)
+
+    @patch("apps.checkout.payments.PaymentGateway.retrieve_intent")
+    def test_repeat_get_skips_writes_and_stripe(self, mock_retrieve):
+        mock_retrieve.return_value = {
+            "status": "requires_payment_method", "client_secret": "sec_1"}
+        self.get()
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.get()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["client_secret"], "sec_1")
+        self.assertEqual(resp.context["total"], Decimal("50.00"))
+        self.assertEqual(mock_retrieve.call_count, 1)
+        writes = [
+            q["sql"] for q in ctx.captured_queries
+            if q["sql"].split()[0].upper() in ("INSERT", "UPDATE", "DELETE")
+        ]
+        self.assertEqual(writes, [])
+
+    @patch("apps.checkout.payments.PaymentGateway.retrieve_intent")
+    def test_line_item_change_invalidates_state(self, mock_retrieve):
+        mock_retrieve.return_value = {
+            "status": "requires_payment_method", "client_secret": "sec_1"}
+        self.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            line = self.order.lineitems.get()
+            line.quantity = 2
+            line.save()
+        resp = self.get()
+
+        self.assertEqual(mock_retrieve.call_count, 2)
+        self.assertEqual(resp.context["total"], Decimal("100.00"))
+        self.assertEqual(resp.context["line_items"][0]["quantity"], 2)
+
+    @patch("apps.checkout.payments.PaymentGateway.retrieve_intent")
+    def test_unrelated_order_write_keeps_state(self, mock_retrieve):
+        mock_retrieve.return_value = {
+            "status": "requires_payment_method", "client_secret": "sec_1"}
+        self.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.full_name = "New Name"
+            self.order.save(update_fields=["full_name"])
+        self.get()
+
+        self.assertEqual(mock_retrieve.call_count, 1)
+
+    @patch("apps.checkout.payments.PaymentGateway.retrieve_intent")
+    def test_paid_order_redirects_without_stripe(self, mock_retrieve):
+        Order.objects.filter(pk=self.order.pk).update(
+            status=Order.PaymentStatus.PAID)
+        resp = self.get()
+
+        self.assertRedirects(
+            resp, reverse("checkout:success",
+                          kwargs={"order_id": self.order.pk}),
+            fetch_redirect_response=False)
+        mock_retrieve.assert_not_called()
+
+    @patch("apps.checkout.payments.PaymentGateway.create_intent")
+    @patch("apps.checkout.payments.PaymentGateway.retrieve_intent")
+    def test_transient_retrieve_failure_keeps_the_intent(
+            self, mock_retrieve, mock_create):
+        mock_retrieve.side_effect = PaymentGatewayError(
+            "Stripe is down", retryable=True)
+        resp = self.get()
+
+        self.assertRedirects(
+            resp, reverse("trailer:cart_detail"),
+            fetch_redirect_response=False)
+        mock_create.assert_not_called()
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.stripe_pid, "pi_state")
+
+    @patch("apps.checkout.payments.PaymentGateway.create_intent")
+    @patch("apps.checkout.payments.PaymentGateway.retrieve_intent")
+    def test_missing_intent_is_replaced(self, mock_retrieve, mock_create):
+        mock_retrieve.side_effect = PaymentGatewayError(
+            "No such payment_intent",
+            original=stripe.error.InvalidRequestError(
+                "No such payment_intent", "intent", http_status=404))
+        mock_create.return_value = Mock(
+            id="pi_new", client_secret="sec", status="requires_payment_method")
+        resp = self.get()
+
+        self.assertEqual(resp.status_code, 200)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.stripe_pid, "pi_new")
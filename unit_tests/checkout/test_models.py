@@ -50,3 +50,65 @@ class CheckoutModelTests(TestCase):
         order.status = Order.PaymentStatus.PAID
         order.save(update_fields=["status"])
         self.assertTrue(order.is_paid)
+
+
+class OrderTotalsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="totals", password="x", email="totals@example.com")
+        make = CarMake.objects.create(name="Jaguar")
+        model = CarModel.objects.create(make=make, name="XJS")
+        cls.car = Car.objects.create(
+            make=make, model=model, year=1985,
+            specifications="Spec", performance="Perf",
+            condition="good", price=Decimal("100.00")
+        )
+
+    def make_order(self):
+        order = Order.objects.create(
+            user=self.user, original_trailer={"items": []},
+            delivery_cost=Decimal("5.00"))
+        for quantity in (1, 2):
+            OrderLineItem.objects.create(
+                order=order, car=self.car, quantity=quantity,
+                unit_price=Decimal("100.00"))
+        return order
+
+    def test_new_order_keeps_given_totals_in_one_insert(self):
+        with self.assertNumQueries(1):
+            order = Order.objects.create(
+                user=self.user, original_trailer={"items": []},
+                order_total=Decimal("50.00"), delivery_cost=Decimal("2.00"))
+        self.assertEqual(order.grand_total, Decimal("52.00"))
+
+    def test_line_item_writes_keep_order_totals_current(self):
+        order = self.make_order()
+        order.refresh_from_db()
+        self.assertEqual(order.order_total, Decimal("300.00"))
+        self.assertEqual(order.grand_total, Decimal("305.00"))
+
+        order.lineitems.first().delete()
+        order.refresh_from_db()
+        self.assertEqual(order.order_total, Decimal("200.00"))
+
+    def test_full_save_is_one_aggregate_and_one_write(self):
+        order = self.make_order()
+        with self.assertNumQueries(2):
+            order.save()
+        self.assertEqual(order.grand_total, Decimal("305.00"))
+
+    def test_prefetched_line_items_skip_the_aggregate(self):
+        self.make_order()
+        order = Order.objects.prefetch_related("lineitems").get()
+        order.delivery_cost = Decimal("0.00")
+        with self.assertNumQueries(1):
+            order.save(update_fields=["delivery_cost"])
+        order.refresh_from_db()
+        self.assertEqual(order.grand_total, Decimal("300.00"))
+
+    def test_unrelated_partial_save_leaves_totals_alone(self):
+        order = self.make_order()
+        order.status = Order.PaymentStatus.FAILED
+        with self.assertNumQueries(1):
+            order.save(update_fields=["status"])
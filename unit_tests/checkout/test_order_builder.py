@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.checkout.models import Order
+from apps.checkout.order_builder import OrderBuilder
+from apps.checkout.utils import compute_delivery
+from apps.showroom.models import CarMake, CarModel, Car
+from apps.trailer.models import Cart, CartItem
+
+User = get_user_model()
+
+
+class OrderBuilderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make = CarMake.objects.create(name="MG")
+        model = CarModel.objects.create(make=make, name="MGB")
+        cls.cars = [
+            Car.objects.create(
+                make=make, model=model, year=1962 + i,
+                specifications="Spec", performance="Perf",
+                condition="good", price=Decimal("9000.00") + i,
+            )
+            for i in range(6)
+        ]
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="buyer", password="x", email="buyer@example.com")
+        self.cart = Cart.objects.create(user=self.user)
+
+    def fill_cart(self, cars):
+        for car in cars:
+            CartItem.objects.create(cart=self.cart, car=car, quantity=1)
+
+    def create_order(self):
+        builder = OrderBuilder(self.cart)
+        return builder.create(self.user)
+
+    def test_totals_snapshot_and_line_items(self):
+        self.fill_cart(self.cars[:2])
+        order = self.create_order()
+        order.refresh_from_db()
+        subtotal = Decimal("18001.00")
+        self.assertEqual(order.order_total, subtotal)
+        self.assertEqual(order.delivery_cost, compute_delivery(subtotal))
+        self.assertEqual(
+            order.grand_total, subtotal + compute_delivery(subtotal))
+        self.assertEqual(
+            [line["name"] for line in order.original_trailer["items"]],
+            [str(Car.objects.get(pk=car.pk)) for car in self.cars[:2]])
+        self.assertEqual(
+            sorted(order.lineitems.values_list("lineitem_total", flat=True)),
+            [Decimal("9000.00"), Decimal("9001.00")])
+
+    def test_statement_count_is_independent_of_cart_size(self):
+        self.fill_cart(self.cars[:1])
+        with CaptureQueriesContext(connection) as one:
+            self.create_order()
+        CartItem.objects.all().delete()
+        self.fill_cart(self.cars)
+        with CaptureQueriesContext(connection) as six:
+            self.create_order()
+        self.assertEqual(len(six), len(one))
+
+    def test_view_rejects_empty_cart_without_touching_orders(self):
+        Order.objects.create(
+            user=self.user, original_trailer={"items": []})
+        self.client.force_login(self.user)
+        resp = self.client.post(reverse("checkout:create_order"))
+        self.assertRedirects(
+            resp, reverse("trailer:cart_detail"),
+            fetch_redirect_response=False)
+        self.assertEqual(Order.objects.count(), 1)
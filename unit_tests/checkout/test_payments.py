@@ -0,0 +1,129 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from apps.checkout.payments import (
+    CircuitBreaker, CircuitOpenError, PaymentGateway, PaymentGatewayError,
+    get_gateway,
+)
+
+from .stripe_standin import StripeStandIn
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class PaymentGatewayTests(SimpleTestCase):
+    def setUp(self):
+        self.server = StripeStandIn().__enter__()
+        self.addCleanup(self.server.__exit__)
+        self.clock = FakeClock()
+        self.sleeps = []
+        self.gateway = PaymentGateway(
+            "sk_test_x",
+            api_base=self.server.url,
+            max_retries=2,
+            breaker=CircuitBreaker(
+                threshold=3, reset_timeout=30, clock=self.clock),
+            sleep=self.sleeps.append,
+        )
+        self.addCleanup(self.gateway.session.close)
+
+    def test_calls_reuse_one_keep_alive_connection(self):
+        self.gateway.retrieve_intent("pi_1")
+        self.gateway.retrieve_intent("pi_2")
+        intent = self.gateway.create_intent(amount=100, currency="gbp")
+
+        self.assertEqual(intent["client_secret"], "pi_new_secret_x")
+        ports = {r["client_port"] for r in self.server.requests}
+        self.assertEqual(len(ports), 1)
+
+    def test_transient_failures_are_retried_with_one_idempotency_key(self):
+        self.server.failures.extend([503, 500])
+        intent = self.gateway.create_intent(amount=100, currency="gbp")
+
+        self.assertEqual(intent["id"], "pi_new")
+        keys = {r["idempotency_key"] for r in self.server.requests}
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len(keys), 1)
+        self.assertIsNotNone(keys.pop())
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertTrue(all(0 <= delay <= 2.0 for delay in self.sleeps))
+
+    def test_retries_are_bounded(self):
+        self.server.failures.extend([503] * 5)
+        with self.assertRaises(PaymentGatewayError) as caught:
+            self.gateway.retrieve_intent("pi_1")
+
+        self.assertTrue(caught.exception.retryable)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_client_errors_are_not_retried(self):
+        self.server.failures.append(400)
+        with self.assertRaises(PaymentGatewayError) as caught:
+            self.gateway.retrieve_intent("pi_1")
+
+        self.assertFalse(caught.exception.retryable)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.gateway.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_breaker_opens_then_lets_a_trial_through(self):
+        self.server.failures.extend([503] * 3)
+        with self.assertRaises(PaymentGatewayError):
+            self.gateway.retrieve_intent("pi_1")
+        self.assertEqual(self.gateway.breaker.state, CircuitBreaker.OPEN)
+
+        with self.assertRaises(CircuitOpenError):
+            self.gateway.retrieve_intent("pi_1")
+        self.assertEqual(len(self.server.requests), 3)
+
+        self.clock.now += 30
+        self.gateway.retrieve_intent("pi_1")
+        self.assertEqual(self.gateway.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_latency_metrics_per_operation(self):
+        self.server.failures.append(503)
+        self.gateway.retrieve_intent("pi_1")
+        self.gateway.modify_intent("pi_1", metadata={"order_id": 1})
+
+        stats = self.gateway.metrics.snapshot()
+        self.assertEqual(stats["payment_intents.retrieve"]["calls"], 2)
+        self.assertEqual(stats["payment_intents.retrieve"]["errors"], 1)
+        self.assertEqual(stats["payment_intents.update"]["calls"], 1)
+        self.assertIsNotNone(stats["payment_intents.update"]["p95_ms"])
+
+    def test_settings_override_rebuilds_the_gateway(self):
+        with override_settings(
+                STRIPE_API_BASE=self.server.url,
+                STRIPE_SECRET_KEY="sk_test_x"):
+            get_gateway().retrieve_intent("pi_9")
+        self.assertEqual(
+            self.server.requests[-1]["path"], "/v1/payment_intents/pi_9")
+
+
+class PaymentMetricsViewTests(TestCase):
+    def test_superuser_sees_gateway_latencies(self):
+        url = reverse("checkout:payment_metrics")
+        user = get_user_model().objects.create_user(
+            username="u", password="x")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        admin = get_user_model().objects.create_superuser(
+            username="admin", password="x", email="a@example.com")
+        self.client.force_login(admin)
+        with StripeStandIn() as server, override_settings(
+                STRIPE_API_BASE=server.url,
+                STRIPE_SECRET_KEY="sk_test_x"):
+            get_gateway().retrieve_intent("pi_1")
+            resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 200)
+        stats = resp.json()["payment_intents.retrieve"]
+        self.assertEqual(stats["calls"], 1)
+        self.assertEqual(stats["errors"], 0)
@@ -1,11 +1,13 @@
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase, RequestFactory, override_settings
 from django.utils import timezone
 
-from apps.checkout.models import Order
+from apps.checkout.models import Order, ProcessedWebhookEvent
 from apps.checkout.webhook_handler import StripeWH_Handler
+from apps.common.models import OutboundEmail
 
 User = get_user_model()
 
@@ -130,3 +132,49 @@ class StripeWebhookHandlerTests(TestCase):
         self.assertEqual(response.status_code, 200)
         order.refresh_from_db()
         self.assertEqual(order.status, Order.PaymentStatus.FAILED)
+
+
+@override_settings(DEFAULT_FROM_EMAIL="noreply@example.com")
+class ProcessedWebhookEventTests(TestCase):
+    def setUp(self):
+        self.order = Order.objects.create(
+            email="buyer@example.com", original_trailer={"items": []})
+        self.handler = StripeWH_Handler(None)
+
+    def event(self, event_type, event_id="evt_1"):
+        return {
+            "id": event_id,
+            "type": event_type,
+            "data": {"object": {
+                "id": "pi_1",
+                "amount_received": 100,
+                "currency": "gbp",
+                "metadata": {"order_id": str(self.order.pk)},
+            }},
+        }
+
+    def test_redelivered_session_event_sends_one_receipt(self):
+        event = self.event("checkout.session.completed")
+        for _ in range(2):
+            self.handler.handle_checkout_session_completed(event)
+
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+        self.assertEqual(ProcessedWebhookEvent.objects.count(), 1)
+
+    def test_duplicate_is_answered_with_one_lookup(self):
+        event = self.event("payment_intent.succeeded")
+        self.handler.handle_payment_intent_succeeded(event)
+
+        with self.assertNumQueries(1):
+            response = self.handler.handle_payment_intent_succeeded(event)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+    def test_failed_handler_leaves_event_unmarked(self):
+        event = self.event("payment_intent.succeeded")
+        with patch.object(Order, "save", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.handler.handle_payment_intent_succeeded(event)
+
+        self.assertFalse(ProcessedWebhookEvent.objects.exists())
+        self.assertFalse(OutboundEmail.objects.exists())
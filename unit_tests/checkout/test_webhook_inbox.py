@@ -0,0 +1,140 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.checkout.models import Order, WebhookEvent
+from apps.checkout.webhook_inbox import (
+    MAX_ATTEMPTS, claim_batch, inbox_metrics, ingest, process_pending,
+)
+
+User = get_user_model()
+
+
+def succeeded_event(order, event_id="evt_1"):
+    return {
+        "id": event_id,
+        "type": "payment_intent.succeeded",
+        "data": {"object": {
+            "id": "pi_1",
+            "amount_received": 1000,
+            "currency": "gbp",
+            "metadata": {"order_id": order.pk},
+        }},
+    }
+
+
+def queue(event):
+    payload = json.dumps(event).encode()
+    ingest(event, payload, json.loads(payload))
+
+
+class WebhookInboxTests(TestCase):
+    def setUp(self):
+        self.order = Order.objects.create(
+            user=None, email="buyer@example.com",
+            original_trailer={"items": []})
+
+    def test_redelivered_event_is_stored_once(self):
+        queue(succeeded_event(self.order))
+        queue(succeeded_event(self.order))
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+
+    def test_event_without_id_falls_back_to_body_digest(self):
+        ingest({"type": "x"}, b'{"type": "x"}', {"type": "x"})
+        event = WebhookEvent.objects.get()
+        self.assertTrue(event.event_id.startswith("sha256:"))
+
+    def test_worker_runs_handler_and_marks_done(self):
+        queue(succeeded_event(self.order))
+
+        self.assertEqual(process_pending(), (1, 0))
+
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.status, WebhookEvent.Status.DONE)
+        self.assertEqual(event.attempts, 1)
+        self.assertIsNotNone(event.processed_at)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.PaymentStatus.PAID)
+        self.assertEqual(process_pending(), (0, 0))
+
+    def test_failure_is_rolled_back_and_retried_later(self):
+        queue(succeeded_event(self.order))
+
+        with patch.object(Order, "save", side_effect=OSError("db down")):
+            self.assertEqual(process_pending(), (0, 1))
+
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.status, WebhookEvent.Status.PENDING)
+        self.assertGreater(event.available_at, timezone.now())
+        self.assertIn("db down", event.last_error)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.PaymentStatus.PENDING)
+        # Not due yet, so the next pass leaves it alone.
+        self.assertEqual(process_pending(), (0, 0))
+
+    def test_gives_up_after_max_attempts(self):
+        queue(succeeded_event(self.order))
+        WebhookEvent.objects.update(attempts=MAX_ATTEMPTS - 1)
+
+        with patch.object(Order, "save", side_effect=OSError("db down")):
+            process_pending()
+
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.status, WebhookEvent.Status.FAILED)
+
+    def test_expired_lease_is_claimed_again(self):
+        queue(succeeded_event(self.order))
+        self.assertEqual(len(claim_batch()), 1)
+        self.assertEqual(claim_batch(), [])
+
+        WebhookEvent.objects.update(
+            locked_until=timezone.now() - timedelta(seconds=1))
+        claimed = claim_batch()
+
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(claimed[0].attempts, 2)
+
+    def test_metrics_report_depth_and_throughput(self):
+        queue(succeeded_event(self.order, "evt_1"))
+        queue(succeeded_event(self.order, "evt_2"))
+        process_pending(limit=1)
+
+        metrics = inbox_metrics()
+
+        self.assertEqual(metrics["counts"]["done"], 1)
+        self.assertEqual(metrics["counts"]["pending"], 1)
+        self.assertEqual(metrics["due"], 1)
+        self.assertEqual(metrics["processed_in_window"], 1)
+        self.assertIsNotNone(metrics["avg_lag_seconds"])
+
+    def test_command_processes_one_batch(self):
+        queue(succeeded_event(self.order))
+        out = StringIO()
+
+        call_command("process_webhooks", "--once", stdout=out)
+
+        self.assertIn("Processed 1 webhook event(s)", out.getvalue())
+        self.assertEqual(
+            WebhookEvent.objects.get().status, WebhookEvent.Status.DONE)
+
+
+class WebhookMetricsViewTests(TestCase):
+    def test_superuser_only(self):
+        url = reverse("checkout:webhook_metrics")
+        user = User.objects.create_user(username="u", password="x")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        admin = User.objects.create_superuser(
+            username="admin", password="x", email="a@example.com")
+        self.client.force_login(admin)
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["due"], 0)
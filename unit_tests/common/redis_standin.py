@@ -0,0 +1,151 @@
+"""A tiny in-process server speaking enough of the Redis protocol for
+Django's ``RedisCache`` so the backend can be exercised without Redis."""
+
+import socketserver
+import threading
+import time
+
+
+class _Store:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}
+        self.expires = {}
+
+    def alive(self, key):
+        expiry = self.expires.get(key)
+        if expiry is not None and expiry <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            command = self.read_command()
+            if command is None:
+                return
+            with self.server.store.lock:
+                reply = self.dispatch(command)
+            self.wfile.write(reply)
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:])
+        args = []
+        for _ in range(count):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def dispatch(self, args):
+        name = args[0].decode().upper()
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            return f"-ERR unknown command '{name}'\r\n".encode()
+        return handler(self.server.store, *args[1:])
+
+    @staticmethod
+    def bulk(value):
+        if value is None:
+            return b"_\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    @staticmethod
+    def integer(value):
+        return b":%d\r\n" % value
+
+    def cmd_hello(self, store, *args):
+        # redis-py negotiates RESP3, so replies below use RESP3 nulls.
+        return b"%1\r\n$5\r\nproto\r\n:3\r\n"
+
+    def cmd_ping(self, store):
+        return b"+PONG\r\n"
+
+    def cmd_get(self, store, key):
+        return self.bulk(store.data[key] if store.alive(key) else None)
+
+    def cmd_mget(self, store, *keys):
+        values = [self.bulk(store.data[k] if store.alive(k) else None)
+                  for k in keys]
+        return b"*%d\r\n" % len(keys) + b"".join(values)
+
+    def cmd_set(self, store, key, value, *options):
+        options = [option.upper() for option in options]
+        if b"NX" in options and store.alive(key):
+            return b"_\r\n"
+        store.data[key] = value
+        store.expires.pop(key, None)
+        if b"EX" in options:
+            seconds = int(options[options.index(b"EX") + 1])
+            store.expires[key] = time.monotonic() + seconds
+        return b"+OK\r\n"
+
+    def cmd_mset(self, store, *pairs):
+        for key, value in zip(pairs[::2], pairs[1::2]):
+            store.data[key] = value
+            store.expires.pop(key, None)
+        return b"+OK\r\n"
+
+    def cmd_del(self, store, *keys):
+        removed = 0
+        for key in keys:
+            if store.alive(key):
+                removed += 1
+                del store.data[key]
+                store.expires.pop(key, None)
+        return self.integer(removed)
+
+    def cmd_exists(self, store, *keys):
+        return self.integer(sum(store.alive(key) for key in keys))
+
+    def cmd_incrby(self, store, key, delta):
+        value = int(store.data[key]) if store.alive(key) else 0
+        value += int(delta)
+        store.data[key] = str(value).encode()
+        return self.integer(value)
+
+    def cmd_incr(self, store, key):
+        return self.cmd_incrby(store, key, b"1")
+
+    def cmd_expire(self, store, key, seconds):
+        if not store.alive(key):
+            return self.integer(0)
+        store.expires[key] = time.monotonic() + int(seconds)
+        return self.integer(1)
+
+    def cmd_persist(self, store, key):
+        return self.integer(
+            int(store.alive(key) and store.expires.pop(key, None) is not None))
+
+    def cmd_flushdb(self, store, *args):
+        store.data.clear()
+        store.expires.clear()
+        return b"+OK\r\n"
+
+
+class RedisStandIn(socketserver.ThreadingTCPServer):
+    """Start with ``with RedisStandIn() as server: server.url``."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.store = _Store()
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,190 @@
+import importlib.util
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from apps.common.caching import (
+    bump_generation, get_generations, page_cache_key, versioned_key,
+)
+from apps.common.models import FAQ
+from apps.showroom.models import CarMake, CarModel, Car
+from core import cache_url
+
+from .redis_standin import RedisStandIn
+
+User = get_user_model()
+
+LOCMEM = {"default": cache_url.parse("locmem://page-tests")}
+
+
+class CacheUrlTests(SimpleTestCase):
+    def test_locmem_and_dummy(self):
+        self.assertTrue(
+            cache_url.parse("locmem://")["BACKEND"].endswith("LocMemCache"))
+        self.assertTrue(
+            cache_url.parse("dummy://")["BACKEND"].endswith("DummyCache"))
+
+    def test_file_backend_uses_path(self):
+        config = cache_url.parse("file:///tmp/mc-cache")
+        self.assertTrue(config["BACKEND"].endswith("FileBasedCache"))
+        self.assertEqual(config["LOCATION"], "/tmp/mc-cache")
+
+    def test_redis_keeps_full_url(self):
+        config = cache_url.parse("redis://cache:6379/1", key_prefix="mc")
+        self.assertTrue(config["BACKEND"].endswith("RedisCache"))
+        self.assertEqual(config["LOCATION"], "redis://cache:6379/1")
+        self.assertEqual(config["KEY_PREFIX"], "mc")
+
+    def test_require_shared_rejects_per_process_caches(self):
+        with self.assertRaisesMessage(ValueError, "locmem://"):
+            cache_url.require_shared("locmem://")
+        cache_url.require_shared("file:///tmp/mc-cache")
+        with self.assertRaisesMessage(ValueError, "different hosts"):
+            cache_url.require_shared(
+                "file:///tmp/mc-cache", across_hosts=True)
+        cache_url.require_shared("redis://cache:6379/1", across_hosts=True)
+        cache_url.require_shared("dummy://", across_hosts=True)
+
+    def test_unknown_scheme_is_rejected(self):
+        with self.assertRaises(ValueError):
+            cache_url.parse("memcached://localhost")
+
+
+@skipUnless(importlib.util.find_spec("redis"), "redis client not installed")
+class RedisBackendTests(SimpleTestCase):
+    def test_round_trip_against_stand_in(self):
+        with RedisStandIn() as server:
+            config = {"default": cache_url.parse(server.url)}
+            with override_settings(CACHES=config):
+                redis_cache = caches["default"]
+                redis_cache.set("car", {"price": 1}, 30)
+                self.assertEqual(redis_cache.get("car"), {"price": 1})
+                self.assertTrue(redis_cache.add("new", 1))
+                self.assertFalse(redis_cache.add("new", 2))
+                self.assertEqual(redis_cache.incr("new"), 2)
+                redis_cache.delete_many(["car", "new"])
+                self.assertIsNone(redis_cache.get("car"))
+                redis_cache.close()
+
+
+@override_settings(CACHES=LOCMEM)
+class GenerationTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_advances_only_that_namespace(self):
+        before = get_generations(["showroom", "faq"])
+        bump_generation("showroom")
+        after = get_generations(["showroom", "faq"])
+        self.assertEqual(after["showroom"], before["showroom"] + 1)
+        self.assertEqual(after["faq"], before["faq"])
+
+    def test_bump_seeds_missing_counter(self):
+        bump_generation("home")
+        self.assertIsNotNone(cache.get("gen:home"))
+
+    def test_versioned_key_changes_after_bump(self):
+        key = versioned_key("fragment", ["home", "catalog"])
+        self.assertEqual(key, versioned_key("fragment", ["catalog", "home"]))
+        bump_generation("catalog")
+        self.assertNotEqual(
+            key, versioned_key("fragment", ["home", "catalog"]))
+
+
+@override_settings(CACHES=LOCMEM)
+class PageCacheKeyTests(SimpleTestCase):
+    def test_querystring_order_is_ignored(self):
+        factory = RequestFactory()
+        first = factory.get("/showroom/", {"sort": "new", "make": "1"})
+        second = factory.get("/showroom/?make=1&sort=new")
+        other = factory.get("/showroom/", {"make": "2"})
+        namespaces = ("showroom",)
+        self.assertEqual(
+            page_cache_key(first, namespaces),
+            page_cache_key(second, namespaces))
+        self.assertNotEqual(
+            page_cache_key(first, namespaces),
+            page_cache_key(other, namespaces))
+
+
+@override_settings(CACHES=LOCMEM)
+class CachedPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.make = CarMake.objects.create(name="Porsche")
+        model = CarModel.objects.create(make=cls.make, name="911")
+        cls.car = Car.objects.create(
+            make=cls.make, model=model, year=1989,
+            specifications="Spec", performance="Perf",
+            condition="good", price=50000,
+        )
+        cls.other = Car.objects.create(
+            make=cls.make, model=model, year=1990,
+            specifications="Spec", performance="Perf",
+            condition="good", price=60000,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_list_is_served_without_queries(self):
+        url = reverse("showroom:car_list")
+        self.client.get(url, {"sort": "new"})
+        with self.assertNumQueries(0):
+            resp = self.client.get(url, {"sort": "new"})
+        self.assertContains(resp, "Porsche 911")
+
+    def test_detail_and_home_are_cached(self):
+        for url in (self.car.get_absolute_url(), reverse("home")):
+            self.client.get(url)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_car_write_invalidates_showroom_pages(self):
+        url = reverse("showroom:car_list")
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.car.price = 42000
+            self.car.save()
+        self.assertContains(self.client.get(url), "42,000")
+
+    def test_sold_flip_only_invalidates_that_detail_page(self):
+        url, other_url = (
+            self.car.get_absolute_url(), self.other.get_absolute_url())
+        self.client.get(url)
+        self.client.get(other_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.car.is_sold = True
+            self.car.save(update_fields=["is_sold"])
+        with self.assertNumQueries(0):
+            self.client.get(other_url)
+        self.assertContains(self.client.get(url), "(SOLD)")
+
+    def test_make_rename_invalidates_detail_pages(self):
+        url = self.other.get_absolute_url()
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make.name = "Porsche AG"
+            self.make.save()
+        self.assertContains(self.client.get(url), "Porsche AG")
+
+    def test_faq_write_invalidates_faq_pages(self):
+        url = reverse("common:faq_list")
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            FAQ.objects.create(question="Do you ship?", answer="Yes")
+        self.assertContains(self.client.get(url), "Do you ship?")
+
+    def test_logged_in_users_bypass_cache(self):
+        url = reverse("showroom:car_list")
+        self.client.get(url)
+        user = User.objects.create_user(
+            username="buyer", password="x", email="buyer@example.com")
+        self.client.force_login(user)
+        resp = self.client.get(url)
+        self.assertContains(resp, "Porsche 911")
+        self.assertNotContains(resp, "/accounts/login/")
@@ -0,0 +1,87 @@
+from django.template import Context, Template
+from django.test import SimpleTestCase
+from unittest import mock
+
+from cloudinary import CloudinaryResource
+
+from apps.common import images
+from apps.common.images import bucket_width, responsive_image
+
+
+class ResponsiveImageTests(SimpleTestCase):
+    def setUp(self):
+        images._srcset.cache_clear()
+        self.image = CloudinaryResource(
+            "cars/elan", format="jpg", version="12", type="upload",
+            resource_type="image")
+
+    def test_widths_snap_to_buckets(self):
+        self.assertEqual(bucket_width(300), 320)
+        self.assertEqual(bucket_width(320), 320)
+        self.assertEqual(bucket_width(5000), images.WIDTH_BUCKETS[-1])
+
+    def test_srcset_has_a_negotiated_url_per_bucket(self):
+        data = responsive_image(self.image, max_width=600, aspect="4:3")
+
+        entries = data["srcset"].split(", ")
+        self.assertEqual(
+            [entry.rsplit(" ", 1)[1] for entry in entries],
+            ["160w", "320w", "480w", "640w"])
+        self.assertIn("f_auto", data["src"])
+        self.assertIn("q_auto", data["src"])
+        self.assertIn("ar_4:3,c_fill", data["src"])
+        self.assertIn("w_640", data["src"])
+        self.assertIn("/v12/cars/elan.jpg", data["src"])
+        self.assertEqual((data["width"], data["height"]), (640, 480))
+
+    def test_url_sets_are_memoised_without_network_calls(self):
+        with mock.patch("cloudinary.api.resource") as api:
+            first = responsive_image(self.image)
+            second = responsive_image(self.image)
+
+        self.assertIs(first, second)
+        self.assertEqual(images._srcset.cache_info().hits, 1)
+        api.assert_not_called()
+
+    def test_missing_image_falls_back_to_placeholder(self):
+        for image in (None, "", CloudinaryResource("placeholder")):
+            data = responsive_image(image)
+            self.assertTrue(data["src"].endswith("placeholder-car.svg"))
+            self.assertEqual(data["srcset"], "")
+
+
+class ResponsiveImgTagTests(SimpleTestCase):
+    def render(self, source, **context):
+        return Template(
+            "{% load responsive_images %}" + source).render(Context(context))
+
+    def test_renders_img_with_srcset_and_attributes(self):
+        html = self.render(
+            '{% responsive_img image alt="Elan" sizes="50vw" max_width=320 '
+            'class_="card-img-top" %}',
+            image=CloudinaryResource("cars/elan", format="jpg"))
+
+        self.assertIn('alt="Elan"', html)
+        self.assertIn('sizes="50vw"', html)
+        self.assertIn('class="card-img-top"', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertIn("w_320/", html)
+        self.assertIn(" 320w\"", html.replace(".jpg", ""))
+
+    def test_stored_metadata_sizes_the_box_and_paints_a_preview(self):
+        html = self.render(
+            "{% responsive_img image max_width=1600 natural_width=4000 "
+            'natural_height=3000 color="#112233" placeholder="data:x" %}',
+            image=CloudinaryResource("cars/elan", format="jpg"))
+
+        self.assertIn('width="1600"', html)
+        self.assertIn('height="1200"', html)
+        self.assertIn(
+            'style="background: #112233 url(data:x) center / cover '
+            'no-repeat;"', html)
+
+    def test_placeholder_has_no_srcset(self):
+        html = self.render("{% responsive_img image %}", image=None)
+
+        self.assertNotIn("srcset", html)
+        self.assertIn("placeholder-car.svg", html)
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.common.leased_queue import LeasedQueue
+from apps.common.models import OutboundEmail
+
+
+class LeasedQueueTests(TestCase):
+    def setUp(self):
+        self.queue = LeasedQueue(
+            OutboundEmail, claimed=OutboundEmail.Status.SENDING,
+            batch_size=2, lease_seconds=60, max_attempts=2,
+            retry_base_seconds=10, retry_max_seconds=15)
+        for n in range(3):
+            OutboundEmail.objects.create(
+                to_email=f"q{n}@example.com", subject="S", body="B")
+
+    def test_claim_leases_a_batch_once(self):
+        claimed = self.queue.claim()
+
+        self.assertEqual(len(claimed), 2)
+        self.assertTrue(all(
+            row.status == OutboundEmail.Status.SENDING and row.attempts == 1
+            for row in claimed))
+        self.assertEqual(len(self.queue.claim()), 1)
+        self.assertEqual(self.queue.claim(), [])
+
+    def test_expired_lease_is_due_again(self):
+        row = self.queue.claim(limit=1)[0]
+        OutboundEmail.objects.filter(pk=row.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1))
+
+        self.assertIn(row.pk, [r.pk for r in self.queue.claim(limit=3)])
+
+    def test_failures_back_off_then_give_up(self):
+        row = self.queue.claim(limit=1)[0]
+
+        self.assertFalse(self.queue.record_failure(row, OSError("busy")))
+        row.refresh_from_db()
+        self.assertEqual(row.status, OutboundEmail.Status.PENDING)
+        self.assertEqual(row.last_error, "OSError: busy")
+        delay = row.available_at - timezone.now()
+        self.assertTrue(timedelta(seconds=4) < delay <= timedelta(seconds=10))
+
+        row.attempts = 2
+        self.assertTrue(self.queue.record_failure(row, OSError("busy")))
+        row.refresh_from_db()
+        self.assertEqual(row.status, OutboundEmail.Status.FAILED)
+
+    def test_retry_delay_is_capped(self):
+        delay = self.queue.retry_delay(10)
+        self.assertTrue(
+            timedelta(seconds=7.5) <= delay <= timedelta(seconds=15))
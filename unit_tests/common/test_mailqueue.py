@@ -0,0 +1,109 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.common.mailqueue import (
+    MAX_ATTEMPTS, claim_batch, enqueue_email, process_pending,
+)
+from apps.common.models import OutboundEmail
+
+
+class FlakyConnection:
+    """Counts opens and fails sends to chosen addresses."""
+
+    def __init__(self, fail_for=()):
+        self.fail_for = set(fail_for)
+        self.opens = 0
+        self.is_open = False
+        self.sent = []
+
+    def open(self):
+        if self.is_open:
+            return False
+        self.is_open = True
+        self.opens += 1
+        return True
+
+    def close(self):
+        self.is_open = False
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to[0] in self.fail_for:
+                raise OSError("mailbox unavailable")
+            self.sent.append(message)
+        return len(messages)
+
+
+class MailQueueTests(TestCase):
+    def test_enqueue_only_writes_rows(self):
+        enqueue_email("Hi", "Body", ["a@example.com", "b@example.com"])
+
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+        self.assertEqual(mail.outbox, [])
+
+    def test_batch_is_sent_over_one_connection(self):
+        enqueue_email(
+            "Hi", "Body", ["a@example.com", "b@example.com"],
+            html_body="<p>Body</p>")
+        connection = FlakyConnection()
+
+        self.assertEqual(process_pending(connection), (2, 0))
+
+        self.assertEqual(connection.opens, 1)
+        self.assertEqual(
+            connection.sent[0].alternatives[0][1], "text/html")
+        self.assertFalse(OutboundEmail.objects.exclude(
+            status=OutboundEmail.Status.SENT).exists())
+
+    def test_failed_message_is_retried_later(self):
+        enqueue_email("Hi", "Body", ["bad@example.com", "ok@example.com"])
+        connection = FlakyConnection(fail_for=["bad@example.com"])
+
+        self.assertEqual(process_pending(connection), (1, 1))
+
+        bad = OutboundEmail.objects.get(to_email="bad@example.com")
+        self.assertEqual(bad.status, OutboundEmail.Status.PENDING)
+        self.assertGreater(bad.available_at, timezone.now())
+        self.assertIn("mailbox unavailable", bad.last_error)
+        # The connection was reopened for the message after the failure.
+        self.assertEqual(connection.opens, 2)
+        self.assertEqual(process_pending(connection), (0, 0))
+
+    def test_gives_up_after_max_attempts(self):
+        enqueue_email("Hi", "Body", ["bad@example.com"])
+        OutboundEmail.objects.update(attempts=MAX_ATTEMPTS - 1)
+
+        process_pending(FlakyConnection(fail_for=["bad@example.com"]))
+
+        self.assertEqual(
+            OutboundEmail.objects.get().status, OutboundEmail.Status.FAILED)
+
+    def test_expired_lease_is_claimed_again(self):
+        enqueue_email("Hi", "Body", ["a@example.com"])
+        self.assertEqual(len(claim_batch()), 1)
+        self.assertEqual(claim_batch(), [])
+
+        OutboundEmail.objects.update(
+            locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(claim_batch()), 1)
+
+    def test_command_delivers_with_configured_backend(self):
+        enqueue_email("Hi", "Body", ["a@example.com"])
+        out = StringIO()
+
+        call_command("process_email_queue", "--once", stdout=out)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["a@example.com"])
+        self.assertIn("Sent 1 email(s)", out.getvalue())
+
+    def test_locmem_connection_works_directly(self):
+        enqueue_email("Hi", "Body", ["a@example.com"])
+        process_pending(get_connection())
+        self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,108 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.common.models import Newsletter
+from apps.common.newsletter_render import (
+    CompiledNewsletter, read_unsubscribe_token, unsubscribe_token,
+)
+
+BASE_URL = "https://shop.example.com"
+
+
+class CompiledNewsletterTests(TestCase):
+    def test_html_body_renders_both_parts_per_recipient(self):
+        compiled = CompiledNewsletter(
+            "Hi {{ email }}",
+            '<p>For {{email}}</p><a href="{{ unsubscribe_url }}">x</a>',
+            BASE_URL)
+
+        subject, text, html, url = compiled.render(7, "a&b@example.com")
+
+        self.assertEqual(subject, "Hi a&b@example.com")
+        self.assertIn("For a&b@example.com", text)
+        self.assertNotIn("<p>", text)
+        self.assertIn("<p>For a&amp;b@example.com</p>", html)
+        self.assertTrue(url.startswith(BASE_URL + "/"))
+        self.assertEqual(
+            read_unsubscribe_token(url.rstrip("/").rsplit("/", 1)[1]), 7)
+        # The body links to unsubscribe itself, so no footer is added.
+        self.assertEqual(html.count("unsubscribe"), 1)
+
+    def test_plain_body_gets_escaped_html_and_an_unsubscribe_footer(self):
+        compiled = CompiledNewsletter(
+            "News", "Cars & parts\n\nSee you {{ email }}", BASE_URL)
+
+        _, text, html, url = compiled.render(1, "x@example.com")
+
+        self.assertTrue(text.startswith("Cars & parts"))
+        self.assertIn("Unsubscribe: " + url, text)
+        self.assertIn("<p>Cars &amp; parts</p>", html)
+        self.assertIn(f'href="{url}"', html)
+
+    def test_unknown_placeholders_are_left_alone(self):
+        compiled = CompiledNewsletter(
+            "{{ missing }}", "Hello {{ name }}", BASE_URL)
+
+        subject, text, _, _ = compiled.render(1, "x@example.com")
+
+        self.assertEqual(subject, "{{ missing }}")
+        self.assertTrue(text.startswith("Hello {{ name }}"))
+
+    def test_message_is_multipart_with_list_unsubscribe_headers(self):
+        compiled = CompiledNewsletter("News", "Hello", BASE_URL)
+
+        message = compiled.message(3, "x@example.com", "from@example.com")
+
+        self.assertEqual(message.to, ["x@example.com"])
+        self.assertEqual(message.alternatives[0].mimetype, "text/html")
+        self.assertEqual(
+            message.extra_headers["List-Unsubscribe"],
+            f"<{compiled.unsubscribe_url(3)}>")
+        self.assertIn(
+            "One-Click", message.extra_headers["List-Unsubscribe-Post"])
+
+
+class NewsletterUnsubscribeViewTests(TestCase):
+    def setUp(self):
+        self.subscriber = Newsletter.objects.create(email="s@example.com")
+        self.url = reverse(
+            "common:newsletter_unsubscribe",
+            kwargs={"token": unsubscribe_token(self.subscriber.pk)})
+
+    def test_get_asks_for_confirmation(self):
+        response = self.client.get(self.url)
+
+        self.assertContains(response, "s@example.com")
+        self.assertTrue(Newsletter.objects.exists())
+
+    def test_one_click_post_without_csrf_token_unsubscribes(self):
+        client = self.client_class(enforce_csrf_checks=True)
+
+        response = client.post(
+            self.url, {"List-Unsubscribe": "One-Click"})
+
+        self.assertContains(response, "You're unsubscribed")
+        self.assertFalse(Newsletter.objects.exists())
+
+    def test_tampered_token_is_rejected(self):
+        url = reverse(
+            "common:newsletter_unsubscribe",
+            kwargs={"token": f"{self.subscriber.pk}:forged"})
+
+        self.assertEqual(self.client.post(url).status_code, 404)
+        self.assertTrue(Newsletter.objects.exists())
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_reports_render_rate(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_newsletter_render", recipients=50, compare=True,
+            stdout=out)
+
+        self.assertIn("compiled: 50 recipients", out.getvalue())
+        self.assertIn("django template: 50 recipients", out.getvalue())
@@ -0,0 +1,237 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.sites.models import Site
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.common.forms import NewsletterEmailForm
+from apps.common.models import Newsletter, NewsletterEmail, OutboundEmail
+from apps.common.newsletters import (
+    LEASE_SECONDS, RateLimiter, claim_campaign, dispatch, in_send_window,
+    lease_seconds, start_campaign, start_due_campaigns,
+)
+
+from .test_mailqueue import FlakyConnection
+
+User = get_user_model()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class RateLimiterTests(TestCase):
+    def test_sends_are_spaced_after_the_burst(self):
+        clock = FakeClock()
+        limiter = RateLimiter(
+            rate=2, burst=2, clock=clock, sleep=clock.sleep)
+
+        for _ in range(6):
+            limiter.wait()
+
+        # Two from the burst, then one every half second.
+        self.assertAlmostEqual(clock.now, 2.0)
+
+
+@override_settings(NEWSLETTER_SEND_RATE=0)
+class NewsletterDispatchTests(TestCase):
+    def setUp(self):
+        for n in range(7):
+            Newsletter.objects.create(email=f"s{n}@example.com")
+        self.newsletter = NewsletterEmail.objects.create(
+            subject="News", body="Hello")
+        # Unsubscribe links need the site; look it up outside the
+        # counted queries.
+        Site.objects.clear_cache()
+        Site.objects.get_current()
+
+    def claim(self):
+        start_campaign(self.newsletter)
+        return claim_campaign()
+
+    def test_sends_every_subscriber_in_checkpointed_batches(self):
+        connection = FlakyConnection()
+        newsletter = self.claim()
+
+        # One read and one checkpoint per batch, then the finish.
+        with self.assertNumQueries(3 * 2 + 1):
+            dispatch(newsletter, connection, batch_size=3)
+
+        self.assertEqual(len(connection.sent), 7)
+        self.assertEqual(connection.opens, 1)
+        first = connection.sent[0]
+        self.assertEqual(first.alternatives[0].mimetype, "text/html")
+        self.assertIn("/newsletter/unsubscribe/", first.body)
+        self.assertNotEqual(first.body, connection.sent[1].body)
+        self.newsletter.refresh_from_db()
+        self.assertEqual(self.newsletter.status, "sent")
+        self.assertEqual(self.newsletter.sent_count, 7)
+        self.assertEqual(self.newsletter.progress_percent, 100)
+        self.assertIsNotNone(self.newsletter.sent_at)
+
+    def test_resumes_after_the_last_checkpoint(self):
+        newsletter = self.claim()
+        third = Newsletter.objects.order_by("pk")[2]
+        NewsletterEmail.objects.filter(pk=newsletter.pk).update(
+            last_subscriber_id=third.pk, sent_count=3)
+        newsletter.refresh_from_db()
+        connection = FlakyConnection()
+
+        dispatch(newsletter, connection, batch_size=3)
+
+        self.assertEqual(len(connection.sent), 4)
+        self.assertNotIn(
+            ["s0@example.com"], [m.to for m in connection.sent])
+        self.newsletter.refresh_from_db()
+        self.assertEqual(self.newsletter.sent_count, 7)
+
+    def test_rejected_addresses_go_to_the_mail_queue(self):
+        connection = FlakyConnection(fail_for=["s4@example.com"])
+
+        dispatch(self.claim(), connection, batch_size=3)
+
+        self.newsletter.refresh_from_db()
+        self.assertEqual(self.newsletter.sent_count, 6)
+        self.assertEqual(self.newsletter.failed_count, 1)
+        retry = OutboundEmail.objects.get()
+        self.assertEqual(retry.to_email, "s4@example.com")
+        self.assertEqual(retry.category, "newsletter")
+        self.assertIn("/newsletter/unsubscribe/", retry.html_body)
+
+    def test_worker_that_lost_its_lease_stops(self):
+        newsletter = self.claim()
+        # The lease ran out mid-batch and another worker re-claimed it.
+        NewsletterEmail.objects.filter(pk=newsletter.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1))
+        rival = claim_campaign()
+        connection = FlakyConnection(fail_for=["s1@example.com"])
+
+        dispatch(newsletter, connection, batch_size=3)
+
+        self.assertEqual(len(connection.sent), 2)
+        self.assertEqual(newsletter.status, "sending")
+        self.assertFalse(OutboundEmail.objects.exists())
+        self.newsletter.refresh_from_db()
+        self.assertEqual(self.newsletter.status, "sending")
+        self.assertEqual(self.newsletter.last_subscriber_id, 0)
+        self.assertEqual(self.newsletter.locked_until, rival.locked_until)
+
+    @override_settings(NEWSLETTER_SEND_RATE=2)
+    def test_lease_covers_a_batch_at_the_send_rate(self):
+        self.assertEqual(lease_seconds(100), LEASE_SECONDS)
+        self.assertEqual(lease_seconds(1000), 1000)
+
+    def test_claimed_campaign_is_not_claimed_twice(self):
+        self.assertIsNotNone(self.claim())
+        self.assertIsNone(claim_campaign())
+
+    def test_command_sends_one_campaign(self):
+        start_campaign(self.newsletter)
+        out = StringIO()
+
+        call_command("send_newsletters", "--once", stdout=out)
+
+        self.assertEqual(len(mail.outbox), 7)
+        self.assertIn("7 sent", out.getvalue())
+
+
+class NewsletterSendViewTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser(
+            username="admin", password="x", email="admin@example.com")
+        self.client.force_login(admin)
+        for n in range(3):
+            Newsletter.objects.create(email=f"s{n}@example.com")
+        self.newsletter = NewsletterEmail.objects.create(
+            subject="News", body="Hello")
+
+    def test_send_starts_the_campaign_without_sending(self):
+        url = reverse(
+            "common:newsletter_email_send", kwargs={"pk": self.newsletter.pk})
+
+        self.client.post(url)
+        self.client.post(url)
+
+        self.assertEqual(mail.outbox, [])
+        self.newsletter.refresh_from_db()
+        self.assertEqual(self.newsletter.status, "sending")
+        self.assertEqual(self.newsletter.recipient_count, 3)
+
+        resp = self.client.get(reverse("common:newsletter_email_list"))
+        self.assertContains(resp, "Sending 0%")
+
+
+@override_settings(NEWSLETTER_SEND_RATE=0, NEWSLETTER_SEND_WINDOW="")
+class NewsletterSchedulerTests(TestCase):
+    def setUp(self):
+        Newsletter.objects.create(email="s@example.com")
+        self.now = timezone.now()
+
+    def scheduled(self, offset):
+        return NewsletterEmail.objects.create(
+            subject="Later", body="Hello", status="scheduled",
+            scheduled_at=self.now + offset)
+
+    def test_only_due_campaigns_start(self):
+        due = self.scheduled(timedelta(minutes=-1))
+        future = self.scheduled(timedelta(hours=1))
+
+        started = start_due_campaigns(self.now)
+
+        self.assertEqual([n.pk for n in started], [due.pk])
+        due.refresh_from_db()
+        future.refresh_from_db()
+        self.assertEqual(due.status, "sending")
+        self.assertEqual(due.recipient_count, 1)
+        self.assertEqual(future.status, "scheduled")
+        self.assertEqual(start_due_campaigns(self.now), [])
+
+    def test_send_window_wraps_midnight(self):
+        late = timezone.make_aware(datetime(2026, 1, 1, 23, 30))
+        noon = timezone.make_aware(datetime(2026, 1, 1, 12, 0))
+        early = timezone.make_aware(datetime(2026, 1, 2, 4, 59))
+
+        self.assertTrue(in_send_window(late, "22:00-05:00"))
+        self.assertTrue(in_send_window(early, "22:00-05:00"))
+        self.assertFalse(in_send_window(noon, "22:00-05:00"))
+        self.assertTrue(in_send_window(noon, "09:00-17:00"))
+        self.assertTrue(in_send_window(noon, ""))
+
+    def test_due_campaign_waits_for_the_window(self):
+        noon = timezone.make_aware(datetime(2026, 1, 1, 12, 0))
+        self.now = noon
+        campaign = self.scheduled(timedelta(hours=-1))
+
+        with override_settings(NEWSLETTER_SEND_WINDOW="01:00-06:00"):
+            self.assertEqual(start_due_campaigns(noon), [])
+            night = noon + timedelta(hours=14)
+            self.assertEqual(len(start_due_campaigns(night)), 1)
+
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, "sending")
+
+    def test_worker_pass_starts_and_sends_due_campaigns(self):
+        self.scheduled(timedelta(minutes=-1))
+
+        call_command("send_newsletters", "--once", stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(NewsletterEmail.objects.get().status, "sent")
+
+    def test_form_cannot_set_send_statuses(self):
+        form = NewsletterEmailForm(data={
+            "subject": "S", "body": "B", "status": "sent"})
+        self.assertFalse(form.is_valid())
+        self.assertIn("status", form.errors)
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.checkout.models import Order
+from apps.common.pagination import CursorPaginator
+from apps.showroom.models import CarMake, CarModel, Car
+
+User = get_user_model()
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make = CarMake.objects.create(name="Jaguar")
+        model = CarModel.objects.create(make=make, name="E-Type")
+        # Repeated prices exercise the id tie-breaker.
+        for i in range(25):
+            Car.objects.create(
+                make=make, model=model, year=1960 + i,
+                specifications="Spec", performance="Perf",
+                condition="good", price=1000 * (i % 5),
+            )
+
+    def _walk(self, queryset, per_page=10):
+        paginator = CursorPaginator(queryset, per_page)
+        page = paginator.page()
+        seen = list(page)
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            seen.extend(page)
+        return seen, page, paginator
+
+    def test_pages_cover_every_row_once_in_order(self):
+        for ordering in (("price", "-id"), ("-price", "-id"), ("-year",)):
+            qs = Car.objects.order_by(*ordering)
+            seen, _, _ = self._walk(qs)
+            self.assertEqual(
+                [c.pk for c in seen], [c.pk for c in qs], ordering)
+
+    def test_previous_cursor_returns_prior_page(self):
+        qs = Car.objects.order_by("price", "-id")
+        paginator = CursorPaginator(qs, 10)
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        back = paginator.page(second.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_cursor_from_other_ordering_falls_back_to_first_page(self):
+        asc = CursorPaginator(Car.objects.order_by("price", "-id"), 10)
+        desc = CursorPaginator(Car.objects.order_by("-price", "-id"), 10)
+        token = asc.page().next_cursor
+        self.assertEqual(
+            list(desc.page(token)),
+            list(Car.objects.order_by("-price", "-id")[:10]))
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        paginator = CursorPaginator(Car.objects.order_by("price", "-id"), 10)
+        self.assertFalse(paginator.page("not-a-cursor").has_previous())
+
+    def test_car_list_cursor_mode_skips_count(self):
+        url = reverse("showroom:car_list")
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url, {"sort": "price_asc", "cursor": ""})
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.context["cursor_pagination"])
+        self.assertFalse(
+            any("COUNT(" in q["sql"].upper() for q in ctx.captured_queries))
+
+        next_cursor = resp.context["page_obj"].next_cursor
+        resp2 = self.client.get(
+            url, {"sort": "price_asc", "cursor": next_cursor})
+        expected = Car.objects.order_by("price", "-id")[10:20]
+        self.assertEqual(list(resp2.context["cars"]), list(expected))
+        preserved = resp2.context["preserved_querystring"]
+        self.assertIn("sort=price_asc", preserved)
+        self.assertNotIn("cursor=", preserved)
+
+
+class OrderHistoryCursorTests(TestCase):
+    def test_order_history_cursor_pages(self):
+        user = User.objects.create_user(
+            username="pager", password="x", email="pager@example.com")
+        for _ in range(12):
+            Order.objects.create(
+                user=user, original_trailer={"items": []},
+                status=Order.PaymentStatus.PAID)
+        self.client.force_login(user)
+
+        url = reverse("checkout:list")
+        first = self.client.get(url, {"cursor": ""})
+        self.assertEqual(len(first.context["orders"]), 10)
+        second = self.client.get(
+            url, {"cursor": first.context["page_obj"].next_cursor})
+        self.assertEqual(len(second.context["orders"]), 2)
+        self.assertFalse(second.context["page_obj"].has_next())
+
+    def test_timestamps_within_one_millisecond_are_not_skipped(self):
+        start = timezone.now().replace(microsecond=500)
+        for offset in range(4):
+            Order.objects.create(
+                original_trailer={"items": []},
+                date=start + timedelta(microseconds=offset))
+        qs = Order.objects.order_by("-date")
+        paginator = CursorPaginator(qs, 2)
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        self.assertEqual(
+            [o.pk for o in list(first) + list(second)],
+            [o.pk for o in qs])
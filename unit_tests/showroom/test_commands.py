@@ -0,0 +1,41 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+
+from apps.showroom.management.commands.explain_showroom_queries import (
+    find_sequential_scan,
+)
+from apps.showroom.models import Car
+
+
+class FindSequentialScanTests(SimpleTestCase):
+    def test_sqlite_full_scan_is_reported(self):
+        plan = "2 0 0 SCAN showroom_car\n5 0 0 USE TEMP B-TREE FOR ORDER BY"
+        self.assertEqual(
+            find_sequential_scan(plan, "sqlite"), "2 0 0 SCAN showroom_car")
+
+    def test_sqlite_index_scan_is_clean(self):
+        plan = "7 0 0 SCAN showroom_car USING INDEX car_year_id_idx"
+        self.assertIsNone(find_sequential_scan(plan, "sqlite"))
+
+    def test_postgres_seq_scan_is_reported(self):
+        plan = "Limit\n  ->  Seq Scan on showroom_car  (cost=0.00..1.10)"
+        self.assertIn("Seq Scan", find_sequential_scan(plan, "postgresql"))
+
+    def test_postgres_index_scan_is_clean(self):
+        plan = "Limit\n  ->  Index Scan using car_year_id_idx on showroom_car"
+        self.assertIsNone(find_sequential_scan(plan, "postgresql"))
+
+
+class ExplainShowroomQueriesCommandTests(TestCase):
+    def test_seeded_run_passes_and_rolls_back(self):
+        out = StringIO()
+        call_command("explain_showroom_queries", seed=3000, stdout=out)
+        self.assertIn("home: featured cars", out.getvalue())
+        self.assertFalse(Car.objects.exists())
+
+    def test_requires_data(self):
+        with self.assertRaises(CommandError):
+            call_command("explain_showroom_queries", stdout=StringIO())
@@ -0,0 +1,104 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.showroom.facets import get_facet_counts
+from apps.showroom.models import CarMake, CarModel, Car, CarFacetCount
+
+
+def counts():
+    return {
+        (row.facet, row.value, row.is_sold): row.count
+        for row in CarFacetCount.objects.filter(count__gt=0)
+    }
+
+
+class FacetCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ford = CarMake.objects.create(name="Ford")
+        cls.vw = CarMake.objects.create(name="Volkswagen")
+        cls.focus = CarModel.objects.create(make=cls.ford, name="Focus")
+        cls.golf = CarModel.objects.create(make=cls.vw, name="Golf")
+
+    def make_car(self, **kwargs):
+        fields = dict(
+            make=self.ford, model=self.focus, year=1995,
+            specifications="Spec", performance="Perf",
+            condition="good", price=10000,
+        )
+        fields.update(kwargs)
+        return Car.objects.create(**fields)
+
+    def test_create_counts_car_under_each_facet(self):
+        self.make_car()
+        self.assertEqual(counts(), {
+            ("make", str(self.ford.pk), False): 1,
+            ("model", str(self.focus.pk), False): 1,
+            ("condition", "good", False): 1,
+            ("decade", "1990", False): 1,
+        })
+
+    def test_update_moves_car_between_facets(self):
+        car = self.make_car()
+        car.make, car.model, car.year, car.is_sold = (
+            self.vw, self.golf, 2001, True)
+        car.save()
+        self.assertEqual(counts(), {
+            ("make", str(self.vw.pk), True): 1,
+            ("model", str(self.golf.pk), True): 1,
+            ("condition", "good", True): 1,
+            ("decade", "2000", True): 1,
+        })
+
+    def test_unrelated_partial_save_skips_facet_work(self):
+        car = self.make_car()
+        car.price = 9000
+        with self.assertNumQueries(1):
+            car.save(update_fields=["price"])
+
+    def test_delete_uncounts_car(self):
+        self.make_car().delete()
+        self.assertEqual(counts(), {})
+
+    def test_rebuild_matches_incremental_counts(self):
+        self.make_car()
+        self.make_car(make=self.vw, model=self.golf, condition="excellent")
+        self.make_car(year=1999, is_sold=True)
+        incremental = counts()
+        CarFacetCount.objects.all().delete()
+        call_command("rebuild_facet_counts", stdout=StringIO())
+        self.assertEqual(counts(), incremental)
+
+    def test_make_rename_updates_labels(self):
+        self.make_car()
+        self.ford.name = "Ford UK"
+        self.ford.save()
+        facets = get_facet_counts()
+        self.assertEqual(facets["make"][0]["label"], "Ford UK")
+        self.assertEqual(facets["model"][0]["label"], "Ford UK Focus")
+
+    def test_get_facet_counts_reads_one_query(self):
+        self.make_car()
+        self.make_car(year=1996, is_sold=True)
+        with self.assertNumQueries(1):
+            facets = get_facet_counts()
+        make = facets["make"][0]
+        self.assertEqual(
+            (make["available"], make["sold"], make["total"]), (1, 1, 2))
+
+    def test_list_view_offers_models_for_selected_make(self):
+        self.make_car()
+        self.make_car(make=self.vw, model=self.golf)
+        url = reverse("showroom:car_list")
+        resp = self.client.get(url)
+        self.assertEqual(len(resp.context["facets"]["make"]), 2)
+        self.assertEqual(resp.context["facets"]["model"], [])
+
+        resp = self.client.get(url, {"make": self.vw.pk})
+        self.assertEqual(
+            [f["label"] for f in resp.context["facets"]["model"]],
+            ["Volkswagen Golf"])
+        self.assertContains(resp, f"?make={self.vw.pk}&amp;model=")
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.test.utils import override_settings
+
+from apps.showroom.featured import build_featured_snapshot, get_featured_cars
+from apps.showroom.models import CarMake, CarModel, Car
+from core import cache_url
+from core.views import HomeView
+
+
+@override_settings(CACHES={"default": cache_url.parse("locmem://featured")})
+class FeaturedSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make = CarMake.objects.create(name="Lotus")
+        model = CarModel.objects.create(make=make, name="Elan")
+        cls.cars = [
+            Car.objects.create(
+                make=make, model=model, year=1962 + i,
+                specifications="Spec", performance="Perf",
+                condition="good", price=30000, image=f"cars/elan-{i}",
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_snapshot_is_built_in_one_query(self):
+        with self.assertNumQueries(1):
+            snapshot = build_featured_snapshot()
+        self.assertEqual(len(snapshot), 3)
+        newest = snapshot[0]
+        self.assertEqual(newest["title"], "Lotus Elan (1964)")
+        self.assertEqual(newest["url"], self.cars[2].get_absolute_url())
+        self.assertIn("c_fill", newest["image_url"])
+        self.assertIn("cars/elan-2", newest["image_url"])
+
+    def test_warm_home_page_context_needs_no_queries(self):
+        get_featured_cars()
+        view = HomeView()
+        view.setup(RequestFactory().get("/"))
+        with self.assertNumQueries(0):
+            ctx = view.get_context_data()
+        self.assertEqual(len(ctx["featured_cars"]), 3)
+
+    def test_sold_car_drops_out_after_commit(self):
+        get_featured_cars()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cars[2].is_sold = True
+            self.cars[2].save(update_fields=["is_sold"])
+        titles = [car["title"] for car in get_featured_cars()]
+        self.assertNotIn("Lotus Elan (1964)", titles)
+
+    def test_price_only_edit_keeps_snapshot(self):
+        get_featured_cars()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cars[0].price = 25000
+            self.cars[0].save(update_fields=["price"])
+        with self.assertNumQueries(0):
+            get_featured_cars()
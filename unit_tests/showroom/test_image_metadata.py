@@ -0,0 +1,108 @@
+import io
+from io import StringIO
+from unittest import mock
+
+from cloudinary import CloudinaryResource
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from PIL import Image
+
+from apps.showroom import image_metadata
+from apps.showroom.models import CarMake, CarModel, Car
+
+
+def png_bytes(size=(40, 20), color=(255, 0, 0)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class ImageMetadataTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make = CarMake.objects.create(name="Triumph")
+        cls.model = CarModel.objects.create(make=make, name="TR6")
+
+    def create_car(self, year=1970, **kwargs):
+        return Car.objects.create(
+            make=self.model.make, model=self.model, year=year,
+            specifications="Spec", performance="Perf",
+            condition="good", price=20000, **kwargs)
+
+    def upload(self):
+        uploaded = []
+
+        def upload_resource(file, **options):
+            uploaded.append(file.read())
+            return CloudinaryResource("cars/tr6", format="png")
+
+        patcher = mock.patch(
+            "cloudinary.uploader.upload_resource", upload_resource)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return uploaded
+
+    def test_extracts_size_colour_and_a_tiny_preview(self):
+        metadata = image_metadata.extract_metadata(io.BytesIO(png_bytes()))
+
+        self.assertEqual(metadata["image_width"], 40)
+        self.assertEqual(metadata["image_height"], 20)
+        self.assertEqual(metadata["image_color"], "#ff0000")
+        self.assertTrue(
+            metadata["image_placeholder"].startswith(
+                "data:image/jpeg;base64,"))
+        self.assertLess(len(metadata["image_placeholder"]), 1500)
+
+    def test_upload_records_metadata_and_sends_the_whole_file(self):
+        content = png_bytes()
+        uploaded = self.upload()
+
+        car = self.create_car(
+            image=SimpleUploadedFile("tr6.png", content, "image/png"))
+
+        car.refresh_from_db()
+        self.assertEqual((car.image_width, car.image_height), (40, 20))
+        self.assertTrue(car.image_placeholder)
+        self.assertEqual(uploaded, [content])
+
+    def test_unreadable_upload_still_saves(self):
+        uploaded = self.upload()
+
+        car = self.create_car(
+            image=SimpleUploadedFile("tr6.png", b"garbage", "image/png"))
+
+        self.assertEqual(uploaded, [b"garbage"])
+        self.assertIsNone(car.image_width)
+
+    def test_clearing_the_image_clears_metadata(self):
+        car = self.create_car(
+            image="cars/tr6", image_width=40, image_height=20,
+            image_color="#ff0000", image_placeholder="data:x")
+
+        car.image = None
+        car.save()
+
+        car.refresh_from_db()
+        self.assertIsNone(car.image_width)
+        self.assertEqual(car.image_color, "")
+
+    def test_backfill_fills_missing_rows_in_batches(self):
+        cars = [self.create_car(year=1969 + n, image=f"cars/tr6-{n}")
+                for n in range(3)]
+        self.create_car(year=1980)
+        out = StringIO()
+
+        with mock.patch(
+                "apps.showroom.management.commands.backfill_image_metadata"
+                ".fetch_image",
+                side_effect=lambda url, session: io.BytesIO(png_bytes())):
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command(
+                    "backfill_image_metadata", batch_size=2,
+                    after=cars[0].pk, stdout=out)
+
+        widths = [
+            Car.objects.get(pk=car.pk).image_width for car in cars]
+        self.assertEqual(widths, [None, 40, 40])
+        self.assertIn("Backfilled 2 cars (0 failed)", out.getvalue())
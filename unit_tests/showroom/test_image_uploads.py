@@ -0,0 +1,207 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.showroom import image_uploads
+from apps.showroom.image_uploads import (
+    MAX_ATTEMPTS, LocalUploader, process_pending,
+)
+from apps.showroom.models import CarMake, CarModel, Car, ImageUpload
+
+from .test_image_metadata import png_bytes
+
+User = get_user_model()
+
+
+class FailingUploader:
+    def __call__(self, file, name):
+        raise ConnectionError("upload timed out")
+
+
+class ImageUploadPipelineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass")
+        make = CarMake.objects.create(name="Porsche")
+        cls.model = CarModel.objects.create(make=make, name="911")
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings = override_settings(
+            MEDIA_ROOT=media,
+            IMAGE_UPLOADER="apps.showroom.image_uploads.LocalUploader")
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Nothing may reach Cloudinary from the request.
+        patcher = mock.patch(
+            "cloudinary.uploader.upload_resource",
+            side_effect=AssertionError("uploaded inside the request"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client.force_login(self.admin)
+
+    def form_data(self, year, photo=b"photo-bytes"):
+        return {
+            "make": self.model.make_id,
+            "model": self.model.pk,
+            "year": year,
+            "specifications": "Spec",
+            "performance": "Perf",
+            "condition": "good",
+            "price": 60000,
+            "image": SimpleUploadedFile("car.JPG", photo, "image/jpeg"),
+        }
+
+    def create_car(self, year=1973):
+        response = self.client.post(
+            reverse("showroom:car_create"), self.form_data(year))
+        self.assertEqual(response.status_code, 302)
+        return Car.objects.get(year=year)
+
+    def process(self, uploader=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return process_pending(uploader=uploader or LocalUploader())
+
+    def test_create_stages_the_photo_and_returns_at_once(self):
+        car = self.create_car()
+
+        self.assertFalse(car.image)
+        self.assertEqual(car.image_status, Car.ImageStatus.PENDING)
+        upload = ImageUpload.objects.get(car=car)
+        self.assertTrue(upload.staged_name.endswith(".jpg"))
+        self.assertEqual(upload.original_name, "car.JPG")
+        self.assertEqual(bytes(upload.data), b"photo-bytes")
+
+    def test_worker_uploads_and_attaches_the_photo(self):
+        car = self.create_car()
+        upload = ImageUpload.objects.get(car=car)
+
+        self.assertEqual(self.process(), (1, 0))
+
+        car.refresh_from_db()
+        upload.refresh_from_db()
+        self.assertEqual(car.image_status, Car.ImageStatus.READY)
+        self.assertTrue(car.image.public_id.startswith("uploads/"))
+        self.assertEqual(upload.status, ImageUpload.Status.DONE)
+        self.assertEqual(bytes(upload.data), b"")
+
+    def test_edit_keeps_the_current_photo_until_processed(self):
+        car = self.create_car()
+        self.process()
+        car.refresh_from_db()
+        current = car.image.public_id
+
+        self.client.post(
+            reverse("showroom:car_edit", kwargs={"slug": car.slug}),
+            self.form_data(car.year))
+
+        car.refresh_from_db()
+        self.assertEqual(car.image.public_id, current)
+        self.assertEqual(car.image_status, Car.ImageStatus.PENDING)
+        self.process()
+        car.refresh_from_db()
+        self.assertNotEqual(car.image.public_id, current)
+
+    def test_newer_photo_supersedes_a_waiting_one(self):
+        car = self.create_car()
+        self.client.post(
+            reverse("showroom:car_edit", kwargs={"slug": car.slug}),
+            self.form_data(car.year, photo=b"second"))
+
+        self.assertEqual(self.process(), (2, 0))
+
+        first, second = ImageUpload.objects.filter(car=car).order_by("pk")
+        self.assertEqual(first.status, ImageUpload.Status.SUPERSEDED)
+        self.assertEqual(second.status, ImageUpload.Status.DONE)
+        car.refresh_from_db()
+        with LocalUploader().storage.open(
+                car.image.public_id.removeprefix("uploads/") + ".jpg") as f:
+            self.assertEqual(f.read(), b"second")
+
+    def test_failures_retry_then_mark_the_car_failed(self):
+        car = self.create_car()
+        upload = ImageUpload.objects.get(car=car)
+
+        self.assertEqual(self.process(FailingUploader()), (0, 1))
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, ImageUpload.Status.PENDING)
+        self.assertIn("timed out", upload.last_error)
+        self.assertGreater(upload.available_at, upload.created_at)
+
+        ImageUpload.objects.filter(pk=upload.pk).update(
+            attempts=MAX_ATTEMPTS - 1, available_at=upload.created_at)
+        self.process(FailingUploader())
+
+        upload.refresh_from_db()
+        car.refresh_from_db()
+        self.assertEqual(upload.status, ImageUpload.Status.FAILED)
+        self.assertEqual(car.image_status, Car.ImageStatus.FAILED)
+
+    def test_metadata_moves_to_the_car_with_the_photo(self):
+        self.client.post(
+            reverse("showroom:car_create"),
+            self.form_data(1980, photo=png_bytes((40, 20))))
+        car = Car.objects.get(year=1980)
+        self.process()
+        self.client.post(
+            reverse("showroom:car_edit", kwargs={"slug": car.slug}),
+            self.form_data(1980, photo=png_bytes((80, 20))))
+
+        # The old photo is still shown, so its size must be too.
+        car.refresh_from_db()
+        self.assertEqual((car.image_width, car.image_height), (40, 20))
+        self.assertEqual(
+            ImageUpload.objects.latest("pk").image_width, 80)
+
+        self.process()
+        car.refresh_from_db()
+        self.assertEqual((car.image_width, car.image_height), (80, 20))
+
+    def test_failed_upload_keeps_the_old_metadata(self):
+        self.client.post(
+            reverse("showroom:car_create"),
+            self.form_data(1981, photo=png_bytes((40, 20))))
+        car = Car.objects.get(year=1981)
+        self.process()
+        self.client.post(
+            reverse("showroom:car_edit", kwargs={"slug": car.slug}),
+            self.form_data(1981, photo=png_bytes((80, 20))))
+        ImageUpload.objects.filter(status=ImageUpload.Status.PENDING).update(
+            attempts=MAX_ATTEMPTS - 1)
+
+        self.process(FailingUploader())
+
+        car.refresh_from_db()
+        self.assertEqual(car.image_status, Car.ImageStatus.FAILED)
+        self.assertEqual((car.image_width, car.image_height), (40, 20))
+
+    def test_deleted_car_drops_its_upload(self):
+        car = self.create_car()
+        claimed = image_uploads.claim_batch()
+        car.delete()
+
+        self.assertTrue(image_uploads.process_upload(
+            claimed[0], LocalUploader()))
+        self.assertFalse(ImageUpload.objects.exists())
+
+    def test_command_processes_one_batch(self):
+        self.create_car()
+        out = StringIO()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("process_image_uploads", "--once", stdout=out)
+
+        self.assertIn("Uploaded 1 image(s), 0 failed", out.getvalue())
+        self.assertEqual(
+            os.listdir(os.path.join(image_uploads.settings.MEDIA_ROOT)),
+            ["uploads"])
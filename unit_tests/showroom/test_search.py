@@ -0,0 +1,68 @@
+from django.test import TestCase, SimpleTestCase
+from django.urls import reverse
+
+from apps.showroom.models import CarMake, CarModel, Car
+from apps.showroom.search import normalise, query_terms, search_cars
+
+
+class NormaliseTests(SimpleTestCase):
+    def test_lowercases_and_strips_punctuation(self):
+        self.assertEqual(normalise("Ford  Focus-RS!"), " ford focus rs ")
+
+    def test_empty_text(self):
+        self.assertEqual(normalise(""), "")
+        self.assertEqual(normalise(None), "")
+
+    def test_query_terms_are_capped(self):
+        self.assertEqual(len(query_terms("a b c d e f g h")), 6)
+
+
+class SearchCarsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ford = CarMake.objects.create(name="Ford")
+        cls.vw = CarMake.objects.create(name="Volkswagen")
+        cls.focus = CarModel.objects.create(make=cls.ford, name="Focus")
+        cls.golf = CarModel.objects.create(make=cls.vw, name="Golf")
+        cls.focus_car = Car.objects.create(
+            make=cls.ford, model=cls.focus, year=2020,
+            specifications="Hatchback", performance="0-60 in 8s",
+            condition="good", price=10000
+        )
+        cls.golf_car = Car.objects.create(
+            make=cls.vw, model=cls.golf, year=1991,
+            specifications="Fitted with a Ford-sourced stereo",
+            performance="0-60 in 9s", condition="excellent", price=15000
+        )
+
+    def test_document_built_on_save(self):
+        self.assertEqual(self.focus_car.search_title, " ford focus 2020 ")
+        self.assertIn(" hatchback ", self.focus_car.search_document)
+
+    def test_partial_save_of_source_field_refreshes_document(self):
+        self.focus_car.specifications = "Estate"
+        self.focus_car.save(update_fields=["specifications"])
+        self.focus_car.refresh_from_db()
+        self.assertIn(" estate ", self.focus_car.search_document)
+
+    def test_make_rename_refreshes_documents(self):
+        self.vw.name = "VW"
+        self.vw.save()
+        self.golf_car.refresh_from_db()
+        self.assertTrue(self.golf_car.search_title.startswith(" vw golf"))
+
+    def test_every_term_must_match(self):
+        results = search_cars(Car.objects.all(), "ford 2020")
+        self.assertEqual(list(results), [self.focus_car])
+
+    def test_title_matches_rank_above_body_matches(self):
+        results = search_cars(Car.objects.all(), "ford").order_by(
+            "-search_rank")
+        self.assertEqual(list(results), [self.focus_car, self.golf_car])
+
+    def test_list_view_defaults_to_relevance_when_searching(self):
+        resp = self.client.get(reverse("showroom:car_list"), {"q": "ford"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["sort"], "relevance")
+        self.assertEqual(
+            list(resp.context["cars"]), [self.focus_car, self.golf_car])
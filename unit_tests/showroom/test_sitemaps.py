@@ -0,0 +1,95 @@
+import gzip
+
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from apps.showroom import sitemaps
+from apps.showroom.models import CarMake, CarModel, Car
+from core import cache_url
+
+BASE_URL = "https://example.com"
+
+
+@override_settings(CACHES={"default": cache_url.parse("locmem://sitemap")})
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make = CarMake.objects.create(name="Jaguar")
+        cls.model = CarModel.objects.create(make=make, name="E-Type")
+        cls.cars = [cls.create_car(1961 + i) for i in range(3)]
+
+    @classmethod
+    def create_car(cls, year):
+        return Car.objects.create(
+            make=cls.model.make, model=cls.model, year=year,
+            specifications="Spec", performance="Perf",
+            condition="good", price=50000,
+        )
+
+    def setUp(self):
+        cache.clear()
+        Site.objects.clear_cache()
+        Site.objects.get_current()
+
+    def xml(self, content):
+        return gzip.decompress(content).decode()
+
+    def test_car_section_lists_every_car_with_lastmod(self):
+        xml = self.xml(sitemaps.sitemap_section(BASE_URL, "cars"))
+
+        for car in self.cars:
+            self.assertIn(
+                f"<loc>{BASE_URL}{car.get_absolute_url()}</loc>"
+                f"<lastmod>{car.updated_at.date().isoformat()}</lastmod>",
+                xml)
+
+    def test_index_splits_cars_into_limited_sections(self):
+        xml = self.xml(sitemaps.sitemap_index(BASE_URL, limit=2))
+
+        self.assertIn(f"{BASE_URL}/sitemap-pages.xml<", xml)
+        self.assertIn(f"{BASE_URL}/sitemap-cars.xml<", xml)
+        self.assertIn(f"{BASE_URL}/sitemap-cars.xml?p=2<", xml)
+        self.assertNotIn("?p=3", xml)
+        second = self.xml(
+            sitemaps.sitemap_section(BASE_URL, "cars", 2, limit=2))
+        self.assertEqual(second.count("<url>"), 1)
+        self.assertIsNone(
+            sitemaps.sitemap_section(BASE_URL, "cars", 3, limit=2))
+
+    def test_cached_section_needs_no_queries_until_a_car_changes(self):
+        sitemaps.sitemap_section(BASE_URL, "cars")
+        with self.assertNumQueries(0):
+            sitemaps.sitemap_section(BASE_URL, "cars")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            car = self.create_car(1970)
+
+        xml = self.xml(sitemaps.sitemap_section(BASE_URL, "cars"))
+        self.assertIn(car.get_absolute_url(), xml)
+
+    def test_view_serves_gzip_only_when_accepted(self):
+        gzipped = self.client.get(
+            "/sitemap-cars.xml", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        plain = self.client.get("/sitemap-cars.xml")
+
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertEqual(self.xml(gzipped.content), plain.content.decode())
+        self.assertEqual(plain["Content-Type"], "application/xml")
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+    def test_unknown_section_or_page_is_404(self):
+        self.assertEqual(
+            self.client.get("/sitemap-nope.xml").status_code, 404)
+        self.assertEqual(
+            self.client.get("/sitemap-cars.xml?p=x").status_code, 404)
+        self.assertEqual(
+            self.client.get("/sitemap-cars.xml?p=9").status_code, 404)
+
+    def test_index_view_and_robots_point_at_each_other(self):
+        index = self.client.get("/sitemap.xml")
+        robots = self.client.get("/robots.txt")
+
+        self.assertContains(index, "/sitemap-pages.xml")
+        self.assertContains(robots, "/sitemap.xml")
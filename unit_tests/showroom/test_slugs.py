@@ -0,0 +1,55 @@
+from django.test import TestCase
+
+from apps.showroom.models import Car, CarMake, CarModel, SlugCounter
+from apps.showroom.slugs import allocate_slugs, build_slug
+
+
+class SlugAllocationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ford = CarMake.objects.create(name="Ford")
+        cls.focus = CarModel.objects.create(make=cls.ford, name="Focus")
+
+    def create_car(self, **extra):
+        return Car.objects.create(
+            make=self.ford, model=self.focus, year=2020, condition="good",
+            price=10000, **extra)
+
+    def test_same_make_model_and_year_get_numbered_slugs(self):
+        slugs = [self.create_car().slug for _ in range(3)]
+
+        self.assertEqual(
+            slugs, ["ford-focus-2020", "ford-focus-2020-2",
+                    "ford-focus-2020-3"])
+        self.assertEqual(
+            SlugCounter.objects.get(base="ford-focus-2020").issued, 3)
+
+    def test_batch_numbers_repeated_bases_in_order(self):
+        # In a savepoint pair: lock, seed, insert, re-lock, taken check and
+        # update.
+        with self.assertNumQueries(8):
+            slugs = allocate_slugs(["a-1", "b-2", "a-1"])
+
+        self.assertEqual(slugs, ["a-1", "b-2", "a-1-2"])
+        # Known bases skip the seeding queries.
+        with self.assertNumQueries(5):
+            self.assertEqual(allocate_slugs(["a-1"]), ["a-1-3"])
+
+    def test_counters_start_after_existing_slugs(self):
+        self.create_car(slug="ford-focus-2020")
+        self.create_car(slug="ford-focus-2020-7")
+        self.create_car(slug="ford-focus-2020-bis")
+
+        self.assertEqual(self.create_car().slug, "ford-focus-2020-8")
+
+    def test_slugs_taken_by_hand_are_skipped(self):
+        self.create_car()
+        self.create_car(slug="ford-focus-2020-2")
+
+        self.assertEqual(self.create_car().slug, "ford-focus-2020-3")
+
+    def test_numbered_slugs_stay_within_the_field_length(self):
+        base = "x" * 150
+
+        self.assertEqual(build_slug(base, 1), base)
+        self.assertEqual(build_slug(base, 12), "x" * 147 + "-12")
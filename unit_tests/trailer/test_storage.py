@@ -0,0 +1,127 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model, login
+from django.contrib.sessions.backends.db import SessionStore
+from django.db import DatabaseError
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from apps.showroom.models import CarMake, CarModel, Car
+from apps.trailer.models import Cart, CartItem
+from apps.trailer.storage import SESSION_KEY
+
+User = get_user_model()
+
+
+class CartStorageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make = CarMake.objects.create(name="Triumph")
+        model = CarModel.objects.create(make=make, name="Spitfire")
+        cls.cars = [
+            Car.objects.create(
+                make=make, model=model, year=1965 + i,
+                specifications="Spec", performance="Perf",
+                condition="good", price=8000 + i,
+            )
+            for i in range(3)
+        ]
+        cls.user = User.objects.create_user(
+            username="driver", password="pass1234")
+
+    def add_url(self, car):
+        return reverse("trailer:add_to_cart", kwargs={"car_pk": car.pk})
+
+    def test_anonymous_cart_lives_in_session(self):
+        client = Client(enforce_csrf_checks=True)
+        token = client.get(reverse("trailer:csrf_token")).json()["token"]
+        for _ in range(2):
+            client.post(
+                self.add_url(self.cars[0]),
+                {"quantity": 1, "csrfmiddlewaretoken": token})
+        self.assertFalse(Cart.objects.exists())
+        self.assertEqual(
+            client.session[SESSION_KEY], {str(self.cars[0].pk): 2})
+
+        resp = client.get(reverse("trailer:cart_detail"))
+        self.assertContains(resp, "Triumph")
+        self.assertContains(resp, "Sign in to checkout")
+        self.assertEqual(resp.context["summary"].quantity, 2)
+
+    def test_anonymous_remove_and_clear(self):
+        self.client.post(self.add_url(self.cars[0]), {"quantity": 1})
+        self.client.post(self.add_url(self.cars[1]), {"quantity": 1})
+        self.client.post(
+            reverse("trailer:update_cart_item",
+                    kwargs={"item_pk": self.cars[0].pk}),
+            {"quantity": 0})
+        self.assertEqual(
+            list(self.client.session[SESSION_KEY]), [str(self.cars[1].pk)])
+        self.client.post(reverse("trailer:clear_cart"))
+        self.assertNotIn(SESSION_KEY, self.client.session)
+
+    def test_anonymous_add_requires_csrf_token(self):
+        # A cross-site post must not swap in a new session or fill a cart
+        # that is merged into the account at the next login.
+        client = Client(enforce_csrf_checks=True)
+        resp = client.post(self.add_url(self.cars[0]), {"quantity": 1})
+        self.assertEqual(resp.status_code, 403)
+        self.assertNotIn("sessionid", resp.cookies)
+
+    def test_csrf_token_endpoint_sets_cookie_and_is_not_cached(self):
+        resp = self.client.get(reverse("trailer:csrf_token"))
+        self.assertTrue(resp.json()["token"])
+        self.assertIn("csrftoken", resp.cookies)
+        self.assertIn("no-cache", resp["Cache-Control"])
+
+    def test_signed_in_add_still_requires_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        resp = client.post(self.add_url(self.cars[0]), {"quantity": 1})
+        self.assertEqual(resp.status_code, 403)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_viewing_empty_cart_writes_nothing(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(3):
+            # session, user, cart items
+            resp = self.client.get(reverse("trailer:cart_detail"))
+        self.assertContains(resp, "Your cart is empty.")
+        self.assertFalse(Cart.objects.exists())
+
+    def test_login_merges_session_cart(self):
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, car=self.cars[0], quantity=1)
+
+        request = RequestFactory().get("/")
+        request.session = SessionStore()
+        request.session[SESSION_KEY] = {
+            str(self.cars[0].pk): 2,
+            str(self.cars[1].pk): 1,
+            "999999": 1,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            login(request, self.user,
+                  backend="django.contrib.auth.backends.ModelBackend")
+
+        quantities = dict(
+            cart.items.values_list("car_id", "quantity"))
+        self.assertEqual(
+            quantities, {self.cars[0].pk: 3, self.cars[1].pk: 1})
+        self.assertNotIn(SESSION_KEY, request.session)
+
+    def test_failed_merge_keeps_session_cart(self):
+        request = RequestFactory().get("/")
+        request.session = SessionStore()
+        request.session[SESSION_KEY] = {str(self.cars[0].pk): 2}
+
+        with mock.patch.object(
+                CartItem.objects, "bulk_create",
+                side_effect=DatabaseError("disk full")):
+            with self.assertRaises(DatabaseError):
+                login(request, self.user,
+                      backend="django.contrib.auth.backends.ModelBackend")
+
+        self.assertFalse(CartItem.objects.exists())
+        self.assertEqual(
+            request.session[SESSION_KEY], {str(self.cars[0].pk): 2})
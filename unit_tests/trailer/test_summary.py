@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.showroom.models import CarMake, CarModel, Car
+from apps.trailer.models import Cart, CartItem
+from apps.trailer.summary import load_cart_summary
+
+User = get_user_model()
+
+
+class CartSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="buyer", password="pass1234")
+        self.client.force_login(self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        self.make = CarMake.objects.create(name="Alfa Romeo")
+        self.model = CarModel.objects.create(make=self.make, name="Spider")
+
+    def add_cars(self, count, start=0):
+        for i in range(start, start + count):
+            car = Car.objects.create(
+                make=self.make, model=self.model, year=1970 + i,
+                specifications="Spec", performance="Perf",
+                condition="good", price=Decimal("1000.50") * (i + 1),
+            )
+            CartItem.objects.create(cart=self.cart, car=car, quantity=2)
+
+    def test_total_matches_aggregate(self):
+        self.add_cars(3)
+        with self.assertNumQueries(1):
+            summary = load_cart_summary(self.cart)
+        self.assertEqual(summary.total, self.cart.total_amount)
+        self.assertEqual(len(summary), 3)
+        self.assertEqual(summary.quantity, 6)
+
+    def test_empty_cart_is_falsy(self):
+        summary = load_cart_summary(self.cart)
+        self.assertFalse(summary)
+        self.assertEqual(summary.total, 0)
+
+    def test_cart_page_query_count_does_not_grow_with_items(self):
+        url = reverse("trailer:cart_detail")
+        self.add_cars(1)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+        self.add_cars(5, start=1)
+        with CaptureQueriesContext(connection) as large:
+            resp = self.client.get(url)
+        self.assertEqual(len(large), len(small))
+        self.assertContains(resp, "Alfa Romeo")
+        self.assertContains(resp, f"£{self.cart.total_amount:.2f}")